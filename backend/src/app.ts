@@ -5,6 +5,7 @@ import helmet from "helmet";
 import { config } from "@config/env.js";
 import errorHandler from "@middlewares/errorHandler.middleware.js";
 import requestLogger from "@middlewares/requestLogger.middleware.js";
+import requestTracing from "@middlewares/tracing.middleware.js";
 
 // ── Import routes 
 import authRoutes from "@routes/auth.route.js";
@@ -22,8 +23,9 @@ app.use(cookieParser());
 app.use(express.json({ limit: "1mb" }));
 app.use(express.urlencoded({ limit: "1mb", extended: true }));
 
-// ── Logging 
+// ── Logging and tracing
 app.use(requestLogger);
+app.use(requestTracing);
 
 // ── Health check 
 app.get("/health", (_: Request, res: Response) => {
@@ -41,4 +41,10 @@ export const config = {
   logging: {
     level: process.env.LOG_LEVEL || "info",
   },
+
+  tracing: {
+    // "none" | "file" | "memory"
+    exporter: process.env.TRACING_EXPORTER || "none",
+    file: process.env.TRACING_FILE || "logs/traces.jsonl",
+  },
 } as const;
@@ -2,7 +2,15 @@ import { Response } from "express";
 import asyncHandler from "@utils/asyncHandler.util.js";
 import { ApiResponse } from "@utils/apiResponse.util.js";
 import { ApiError } from "@utils/apiError.util.js";
-import { codeSchema, sourceSchema } from "@validations/execution.validation.js";
+import {
+  codeSchema,
+  jobQuerySchema,
+  jobSchema,
+  optimizeSchema,
+  outputRangeSchema,
+  sourceSchema,
+  variableSchema,
+} from "@validations/execution.validation.js";
 import * as executionService from "@services/execution.service.js";
 import { AuthRequest } from "@middlewares/auth.middleware.js";
 
@@ -35,13 +43,23 @@ export const profile = asyncHandler(async (req: AuthRequest, res: Response) => {
   res.status(200).json(new ApiResponse(200, result, "Profiling completed"));
 });
 
-/** POST /api/optimize — suggestions only */
+/** POST /api/optimize — suggestions only; mode "static" skips execution */
 export const optimize = asyncHandler(async (req: AuthRequest, res: Response) => {
-  const input = parseCodeInput(req.body);
+  const parsed = optimizeSchema.safeParse(req.body);
+  if (!parsed.success) {
+    throw new ApiError(400, parsed.error.issues[0]?.message ?? "Invalid input");
+  }
+  const input = parsed.data;
   const result = await executionService.runOptimize(input, req.user!._id);
   res.status(200).json(new ApiResponse(200, result, "Optimization suggestions ready"));
 });
 
+/** POST /api/rescore — score stored analyze runs again, no re-execution */
+export const rescore = asyncHandler(async (req: AuthRequest, res: Response) => {
+  const result = await executionService.rescoreHistory(req.user!._id);
+  res.status(200).json(new ApiResponse(200, result, "Scores recalculated"));
+});
+
 /** POST /api/score — score report only */
 export const score = asyncHandler(async (req: AuthRequest, res: Response) => {
   const input = parseCodeInput(req.body);
@@ -73,4 +91,72 @@ export const parse = asyncHandler(async (req: AuthRequest, res: Response) => {
   res
     .status(200)
     .json(new ApiResponse(200, result, "Code parsed successfully"));
-});
\ No newline at end of file
+});
+
+/** POST /api/variables/:name — full value of one previewed variable */
+export const variable = asyncHandler(async (req: AuthRequest, res: Response) => {
+  const parsed = variableSchema.safeParse({ ...req.body, name: req.params.name });
+  if (!parsed.success) {
+    throw new ApiError(400, parsed.error.issues[0]?.message ?? "Invalid input");
+  }
+
+  const result = await executionService.runVariable(parsed.data, req.user!._id);
+
+  res
+    .status(200)
+    .json(new ApiResponse(200, result, "Variable fetched"));
+});
+
+/** GET /api/outputs/:outputId?offset=&length= — a range of truncated output */
+export const outputRange = asyncHandler(async (req: AuthRequest, res: Response) => {
+  const parsed = outputRangeSchema.safeParse({ ...req.query, outputId: req.params.outputId });
+  if (!parsed.success) {
+    throw new ApiError(400, parsed.error.issues[0]?.message ?? "Invalid input");
+  }
+
+  const result = await executionService.runOutputRange(parsed.data);
+
+  res
+    .status(200)
+    .json(new ApiResponse(200, result, "Output fetched"));
+});
+
+function parseJobQuery(req: AuthRequest) {
+  const parsed = jobQuerySchema.safeParse({ ...req.query, jobId: req.params.jobId });
+  if (!parsed.success) {
+    throw new ApiError(400, parsed.error.issues[0]?.message ?? "Invalid input");
+  }
+  return parsed.data;
+}
+
+/** POST /api/jobs — start a background run, returns its job id at once */
+export const submitJob = asyncHandler(async (req: AuthRequest, res: Response) => {
+  const parsed = jobSchema.safeParse(req.body);
+  if (!parsed.success) {
+    throw new ApiError(400, parsed.error.issues[0]?.message ?? "Invalid input");
+  }
+
+  const result = await executionService.runSubmitJob(parsed.data, req.user!._id);
+
+  res
+    .status(202)
+    .json(new ApiResponse(202, result, "Job submitted"));
+});
+
+/** GET /api/jobs/:jobId?wait= — job status and result, long-polled up to wait seconds */
+export const getJob = asyncHandler(async (req: AuthRequest, res: Response) => {
+  const result = await executionService.runGetJob(parseJobQuery(req));
+
+  res
+    .status(200)
+    .json(new ApiResponse(200, result, "Job fetched"));
+});
+
+/** DELETE /api/jobs/:jobId — stop a running job */
+export const cancelJob = asyncHandler(async (req: AuthRequest, res: Response) => {
+  const result = await executionService.runCancelJob(parseJobQuery(req));
+
+  res
+    .status(200)
+    .json(new ApiResponse(200, result, "Job cancelled"));
+});
@@ -0,0 +1,64 @@
+import { Request, Response, NextFunction, RequestHandler } from "express";
+import {
+  currentSpan,
+  endSpan,
+  formatTraceparent,
+  parseTraceparent,
+  runInSpan,
+  startSpan,
+} from "@utils/tracing.util.js";
+
+/**
+ * Open a span per request, continuing the caller's trace when it sends a
+ * `traceparent` header, and make it the active span for everything the
+ * request runs — including the interpreter call, which forwards it.
+ */
+export const requestTracing = (req: Request, res: Response, next: NextFunction): void => {
+  const span = startSpan(
+    `${req.method} ${req.path}`,
+    { method: req.method, path: req.originalUrl },
+    parseTraceparent(req.header("traceparent")),
+  );
+  if (!span) {
+    next();
+    return;
+  }
+
+  res.setHeader("traceparent", formatTraceparent(span));
+  res.on("finish", () => {
+    span.attributes["status"] = res.statusCode;
+    endSpan(span, res.statusCode >= 500 ? `HTTP ${res.statusCode}` : undefined);
+  });
+  runInSpan(span, next);
+};
+
+/**
+ * Record a middleware as a span that ends when it calls `next` (or when
+ * the response finishes, if it answers the request itself).
+ */
+export const traced = (name: string, middleware: RequestHandler): RequestHandler =>
+  (req, res, next) => {
+    const parent = currentSpan() ?? null;
+    const span = startSpan(name);
+    if (!span) {
+      middleware(req, res, next);
+      return;
+    }
+
+    let ended = false;
+    const finish = (err?: unknown) => {
+      if (ended) return;
+      ended = true;
+      endSpan(span, err instanceof Error ? err : undefined);
+    };
+    res.once("finish", () => finish());
+    runInSpan(span, () =>
+      middleware(req, res, (err?: unknown) => {
+        finish(err);
+        // The rest of the chain belongs to the request span, not this one
+        runInSpan(parent, () => next(err));
+      }),
+    );
+  };
+
+export default requestTracing;
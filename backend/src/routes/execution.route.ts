@@ -2,18 +2,25 @@ import { Router } from "express";
 import * as executionController from "@controllers/execution.controller.js";
 import { verifyJWT } from "@middlewares/auth.middleware.js";
 import { executionLimiter } from "@middlewares/rateLimiter.middleware.js";
+import { traced } from "@middlewares/tracing.middleware.js";
 
 const router: Router = Router();
 
 // All execution routes require auth + rate limiting
-router.use(verifyJWT, executionLimiter);
+router.use(traced("auth", verifyJWT), traced("rate_limit", executionLimiter));
 
 router.post("/execute",  executionController.execute);   // raw run
 router.post("/analyze",  executionController.analyze);   // full pipeline
 router.post("/profile",  executionController.profile);   // profiling only
 router.post("/optimize", executionController.optimize);  // suggestions only
 router.post("/score",    executionController.score);     // score only
+router.post("/rescore",  executionController.rescore);   // stored runs rescored
 router.post("/tokenize", executionController.tokenize); // tokenization
 router.post("/parse",    executionController.parse);    // parsing
+router.post("/variables/:name", executionController.variable); // one full variable
+router.get("/outputs/:outputId", executionController.outputRange); // truncated output
+router.post("/jobs", executionController.submitJob);          // background run
+router.get("/jobs/:jobId", executionController.getJob);       // long-poll status
+router.delete("/jobs/:jobId", executionController.cancelJob); // cancel a run
 
 export default router;
\ No newline at end of file
@@ -1,27 +1,53 @@
 import {
   analyzeCode,
   AnalyzeResult,
+  cancelJob,
+  fetchJob,
+  JobResult,
+  submitJob,
+  AnyProfilingData,
+  ColumnarProfilingData,
   executeCode,
   ExecuteResult,
+  fetchOutputRange,
+  fetchVariable,
   FunctionStats,
   optimizeCode,
   OptimizeResult,
+  OutputRange,
   parseCode,
   ParseResult,
   ProfilingData,
   profileCode,
   ProfileResult,
+  RescoreItem,
+  rescoreResults,
   scoreCode,
   ScoreResult,
   ScoreReport,
   Suggestion,
   tokenizeCode,
   TokenizeResult,
+  VariableResult,
 } from "@services/interpreterClient.service.js";
-import { Execution } from "@models/Execution.model.js";
+import type { AnyBulkWriteOperation } from "mongoose";
+import {
+  Execution,
+  IExecution,
+  IProfilingData,
+} from "@models/Execution.model.js";
 import { ApiError } from "@utils/apiError.util.js";
 import logger from "@utils/logger.util.js";
-import { CodeInput, SourceInput } from "@validations/execution.validation.js";
+import { endSpan, startSpan } from "@utils/tracing.util.js";
+import {
+  CodeInput,
+  JobInput,
+  JobQuery,
+  OptimizeInput,
+  OutputRangeInput,
+  SourceInput,
+  VariableInput,
+} from "@validations/execution.validation.js";
 
 const handleInterpreterError = (err: unknown): never => {
   if (typeof err === "object" && err !== null && "response" in err) {
@@ -36,6 +62,9 @@ const handleInterpreterError = (err: unknown): never => {
         detail || "Interpreter service rate limit exceeded",
       );
     }
+    if (status === 404) {
+      throw new ApiError(404, detail || "Not found");
+    }
     throw new ApiError(
       status === 422 ? 400 : 502,
       detail || "Interpreter service unavailable",
@@ -58,6 +87,38 @@ const normalizeSuggestions = (suggestions: Suggestion[]) =>
     impactScore: suggestion.impact_score,
   }));
 
+const isColumnar = (
+  profiling: AnyProfilingData,
+): profiling is ColumnarProfilingData =>
+  "format" in profiling && profiling.format === "columnar";
+
+// Columnar stats persist as the same per-line documents, read off the arrays
+const normalizeLineColumns = ({ line_stats: columns }: ColumnarProfilingData) =>
+  columns.line.map((line, i) => ({
+    line,
+    count: columns.count[i] ?? 0,
+    totalTimeMs: columns.total_time_ms[i] ?? 0,
+    avgTimeMs: columns.avg_time_ms[i] ?? 0,
+    minTimeMs: columns.min_time_ms[i] ?? 0,
+    maxTimeMs: columns.max_time_ms[i] ?? 0,
+    memoryVars: columns.memory_vars[i] ?? 0,
+    memoryBytes: columns.memory_bytes[i] ?? 0,
+  }));
+
+const normalizeFunctionColumns = ({
+  function_stats: columns,
+}: ColumnarProfilingData) =>
+  columns.name.map((name, i) => ({
+    name,
+    calls: columns.calls[i] ?? 0,
+    totalTimeMs: columns.total_time_ms[i] ?? 0,
+    avgTimeMs: columns.avg_time_ms[i] ?? 0,
+    minTimeMs: columns.min_time_ms[i] ?? 0,
+    maxTimeMs: columns.max_time_ms[i] ?? 0,
+    maxRecursionDepth: columns.max_recursion_depth[i] ?? 0,
+    callers: columns.callers[i] ?? {},
+  }));
+
 const normalizeLineStats = (profiling: ProfilingData) =>
   Object.values(profiling.line_stats).map((lineStat) => ({
     line: lineStat.line ?? undefined,
@@ -84,9 +145,13 @@ const normalizeFunctionStats = (profiling: ProfilingData) =>
     }),
   );
 
-const normalizeProfiling = (profiling: ProfilingData) => ({
-  lineStats: normalizeLineStats(profiling),
-  functionStats: normalizeFunctionStats(profiling),
+const normalizeProfiling = (profiling: AnyProfilingData) => ({
+  lineStats: isColumnar(profiling)
+    ? normalizeLineColumns(profiling)
+    : normalizeLineStats(profiling),
+  functionStats: isColumnar(profiling)
+    ? normalizeFunctionColumns(profiling)
+    : normalizeFunctionStats(profiling),
   totalTimeMs: profiling.total_time_ms,
   totalLinesExecuted: profiling.total_lines_executed,
   totalLines: profiling.total_lines,
@@ -157,9 +222,14 @@ const persistExecution = (
     record["scoreReport"] = normalizeScoreReport(result.score_report);
   }
 
-  Execution.create(record).catch((err) =>
-    logger.error("Failed to persist execution record:", err),
-  );
+  // Fire-and-forget, so this span may end after the request's own span
+  const span = startSpan("mongo.persist", { mode });
+  Execution.create(record)
+    .then(() => endSpan(span))
+    .catch((err) => {
+      endSpan(span, err);
+      logger.error("Failed to persist execution record:", err);
+    });
 };
 
 export const runExecute = async (
@@ -171,6 +241,8 @@ export const runExecute = async (
     userId,
     input.timeout,
     input.enable_profiling,
+    "objects",
+    input.profiling_tier,
   ).catch(handleInterpreterError);
 
   persistExecution(userId, "execute", input.code, result);
@@ -186,6 +258,8 @@ export const runAnalyze = async (
     userId,
     input.timeout,
     input.enable_profiling,
+    "objects",
+    input.profiling_tier,
   ).catch(handleInterpreterError);
 
   persistExecution(userId, "analyze", input.code, result);
@@ -196,19 +270,24 @@ export const runProfile = async (
   input: CodeInput,
   userId: string,
 ): Promise<ProfileResult> => {
-  return profileCode(input.code, userId, input.timeout).catch(
-    handleInterpreterError,
-  );
+  return profileCode(
+    input.code,
+    userId,
+    input.timeout,
+    "objects",
+    input.profiling_tier,
+  ).catch(handleInterpreterError);
 };
 
 /**
  * Suggestions only — no output, no score.
+ * Static mode skips execution, for lint-on-type.
  */
 export const runOptimize = async (
-  input: CodeInput,
+  input: OptimizeInput,
   userId: string,
 ): Promise<OptimizeResult> => {
-  return optimizeCode(input.code, userId, input.timeout).catch(
+  return optimizeCode(input.code, userId, input.timeout, input.mode).catch(
     handleInterpreterError,
   );
 };
@@ -238,3 +317,173 @@ export const runParse = async (
 ): Promise<ParseResult> => {
   return parseCode(input.code, userId).catch(handleInterpreterError);
 };
+
+/**
+ * Full value of a variable the execute/analyze response only previewed.
+ */
+export const runVariable = async (
+  input: VariableInput,
+  userId: string,
+): Promise<VariableResult> => {
+  return fetchVariable(input.symbolTableId, input.name, userId).catch(
+    handleInterpreterError,
+  );
+};
+
+/**
+ * A byte range of output the execute/analyze response truncated.
+ */
+export const runOutputRange = async (
+  input: OutputRangeInput,
+): Promise<OutputRange> => {
+  return fetchOutputRange(input.outputId, input.offset, input.length).catch(
+    handleInterpreterError,
+  );
+};
+
+/**
+ * Start a run in the background; poll runGetJob for its result.
+ */
+export const runSubmitJob = async (
+  input: JobInput,
+  userId: string,
+): Promise<JobResult> => {
+  return submitJob(
+    input.code,
+    input.kind,
+    userId,
+    input.timeout,
+    input.enable_profiling,
+    input.profiling_tier,
+  ).catch(handleInterpreterError);
+};
+
+export const runGetJob = async (input: JobQuery): Promise<JobResult> => {
+  return fetchJob(input.jobId, input.wait).catch(handleInterpreterError);
+};
+
+export const runCancelJob = async (input: JobQuery): Promise<JobResult> => {
+  return cancelJob(input.jobId).catch(handleInterpreterError);
+};
+
+// Items per /rescore request; the interpreter caps a request at 5000
+const RESCORE_BATCH_SIZE = 1000;
+
+// Stored profiling back in the shape the interpreter returned it
+const denormalizeProfiling = (profiling: IProfilingData): ProfilingData => ({
+  line_stats: Object.fromEntries(
+    profiling.lineStats.map((lineStat, index) => [
+      String(lineStat.line ?? index),
+      {
+        line: lineStat.line ?? null,
+        count: lineStat.count,
+        total_time_ms: lineStat.totalTimeMs,
+        avg_time_ms: lineStat.avgTimeMs,
+        min_time_ms: lineStat.minTimeMs,
+        max_time_ms: lineStat.maxTimeMs,
+        memory_vars: lineStat.memoryVars,
+        memory_bytes: lineStat.memoryBytes,
+      },
+    ]),
+  ),
+  function_stats: Object.fromEntries(
+    profiling.functionStats.map((functionStat, index) => [
+      functionStat.name ?? String(index),
+      {
+        name: functionStat.name ?? null,
+        calls: functionStat.calls,
+        total_time_ms: functionStat.totalTimeMs,
+        avg_time_ms: functionStat.avgTimeMs,
+        min_time_ms: functionStat.minTimeMs,
+        max_time_ms: functionStat.maxTimeMs,
+        max_recursion_depth: functionStat.maxRecursionDepth,
+        callers: functionStat.callers,
+      },
+    ]),
+  ),
+  total_time_ms: profiling.totalTimeMs,
+  total_lines_executed: profiling.totalLinesExecuted,
+  total_lines: profiling.totalLines,
+  lines_profiled: profiling.linesProfiled,
+  peak_memory_bytes: profiling.peakMemoryBytes,
+  complexity_estimate: profiling.complexityEstimate,
+  complexity_method: profiling.complexityMethod,
+  complexity_confidence: profiling.complexityConfidence,
+  sampled_lines: profiling.sampledLines,
+  skipped_lines: profiling.skippedLines,
+  line_sampling_rate: profiling.lineSamplingRate,
+  memory_mode: profiling.memoryMode,
+});
+
+// Same count as the interpreter's len(code.splitlines())
+const countSourceLines = (code: string): number =>
+  Math.max(1, code.replace(/(\r\n|\r|\n)$/, "").split(/\r\n|\r|\n/).length);
+
+type StoredExecution = IExecution & { _id: unknown };
+
+const toRescoreItem = (execution: StoredExecution): RescoreItem => ({
+  id: String(execution._id),
+  profiling: execution.profiling
+    ? denormalizeProfiling(execution.profiling)
+    : null,
+  suggestions: execution.suggestions.map((suggestion) => ({
+    line: suggestion.line,
+    pattern: suggestion.pattern,
+    severity: suggestion.severity,
+    description: suggestion.description,
+    suggestion: suggestion.suggestion,
+    impact_score: suggestion.impactScore,
+  })),
+  source_lines: countSourceLines(execution.code),
+  errors: execution.errors,
+});
+
+export interface RescoreHistoryResult {
+  total: number;
+  rescored: number;
+  failed: number;
+}
+
+/**
+ * Score the user's analyzed runs again from their stored profiling and
+ * suggestions, without re-executing them, and update the stored scores.
+ * Used after the scoring weights change.
+ */
+export const rescoreHistory = async (
+  userId: string,
+): Promise<RescoreHistoryResult> => {
+  const executions = (await Execution.find({ userId, mode: "analyze" })
+    .select("code errors profiling suggestions")
+    .lean()) as StoredExecution[];
+
+  let rescored = 0;
+  let failed = 0;
+  for (let start = 0; start < executions.length; start += RESCORE_BATCH_SIZE) {
+    const batch = executions.slice(start, start + RESCORE_BATCH_SIZE);
+    const updates: AnyBulkWriteOperation<IExecution>[] = [];
+    const summary = await rescoreResults(
+      batch.map(toRescoreItem),
+      (item) => {
+        if (!item.score_report) return;
+        updates.push({
+          updateOne: {
+            filter: { _id: item.id, userId },
+            update: {
+              $set: {
+                optimizationScore: item.score_report.score,
+                complexityClass: item.score_report.complexity_class,
+                scoreReport: normalizeScoreReport(item.score_report),
+              },
+            },
+          },
+        });
+      },
+      { userId },
+    ).catch(handleInterpreterError);
+
+    if (updates.length > 0) await Execution.bulkWrite(updates);
+    rescored += updates.length;
+    failed += summary.failed;
+  }
+  return { total: executions.length, rescored, failed };
+};
@@ -1,5 +1,12 @@
-import axios from "axios";
+import axios, { type InternalAxiosRequestConfig } from "axios";
+import type { Readable } from "node:stream";
 import { config } from "@config/env.js";
+import {
+  endSpan,
+  formatTraceparent,
+  startSpan,
+  type Span,
+} from "@utils/tracing.util.js";
 
 const interpreterClient = axios.create({
   baseURL: config.interpreter.url,
@@ -10,6 +17,39 @@ const interpreterClient = axios.create({
   },
 });
 
+// Spans of in-flight interpreter calls, keyed by their request config
+const callSpans = new WeakMap<InternalAxiosRequestConfig, Span>();
+
+interpreterClient.interceptors.request.use((request) => {
+  // The interpreter rate-limits per user; a header spares it parsing the body
+  const userId = (request.data as { user_id?: unknown } | undefined)?.user_id;
+  if (typeof userId === "string" && userId) {
+    request.headers.set("X-User-Id", userId);
+  }
+
+  // One span per call; the interpreter continues the trace from traceparent
+  const span = startSpan(`interpreter ${request.method?.toUpperCase()} ${request.url}`);
+  if (span) {
+    request.headers.set("traceparent", formatTraceparent(span));
+    callSpans.set(request, span);
+  }
+  return request;
+});
+
+interpreterClient.interceptors.response.use(
+  (response) => {
+    const span = callSpans.get(response.config);
+    if (span) span.attributes["status"] = response.status;
+    endSpan(span ?? null);
+    return response;
+  },
+  (err: unknown) => {
+    const request = axios.isAxiosError(err) ? err.config : undefined;
+    endSpan((request && callSpans.get(request)) ?? null, err);
+    return Promise.reject(err);
+  },
+);
+
 export interface TokenResponseItem {
   type: string;
   value: unknown;
@@ -56,6 +96,50 @@ export interface ProfilingData {
   memory_mode: string;
 }
 
+/** profiling_format="columnar": one array per metric; entry i of each is one line. */
+export interface LineStatsColumns {
+  line: number[];
+  count: number[];
+  total_time_ms: number[];
+  avg_time_ms: number[];
+  min_time_ms: number[];
+  max_time_ms: number[];
+  memory_vars: number[];
+  memory_bytes: number[];
+}
+
+/** profiling_format="columnar": entry i of each array is one function. */
+export interface FunctionStatsColumns {
+  name: string[];
+  calls: number[];
+  total_time_ms: number[];
+  avg_time_ms: number[];
+  min_time_ms: number[];
+  max_time_ms: number[];
+  max_recursion_depth: number[];
+  callers: Record<string, number>[];
+}
+
+export interface ColumnarProfilingData
+  extends Omit<ProfilingData, "line_stats" | "function_stats"> {
+  format: "columnar";
+  line_stats: LineStatsColumns;
+  function_stats: FunctionStatsColumns;
+}
+
+export type ProfilingFormat = "objects" | "columnar";
+
+/** Cheapest first; omitted, the service derives it from enable_profiling. */
+export const PROFILING_TIERS = [
+  "off",
+  "functions",
+  "sampled_lines",
+  "full_lines",
+  "full_memory",
+] as const;
+export type ProfilingTier = (typeof PROFILING_TIERS)[number];
+export type AnyProfilingData = ProfilingData | ColumnarProfilingData;
+
 export interface Suggestion {
   line: number;
   pattern: string;
@@ -63,6 +147,8 @@ export interface Suggestion {
   description: string;
   suggestion: string;
   impact_score: number;
+  /** Found without running the code; a run may re-rate or drop it */
+  requires_runtime?: boolean;
 }
 
 export interface DimensionScores {
@@ -87,13 +173,85 @@ export interface ScoreReport {
   cv: number;
 }
 
-export interface ExecuteResult {
+/** A stored run to score again, in the shapes the interpreter returned. */
+export interface RescoreItem {
+  id?: string;
+  profiling?: ProfilingData | null;
+  /** Omitted when the optimizer did not run: partial credit */
+  suggestions?: Suggestion[] | null;
+  source_lines: number;
+  errors: string[];
+}
+
+export interface RescoreItemResult {
+  type: "item";
+  index: number;
+  id: string;
+  success: boolean;
+  score_report?: ScoreReport;
+  error?: string;
+  /** Scored once with an identical earlier item */
+  deduplicated: boolean;
+}
+
+export interface ScoreDistribution {
+  count: number;
+  min: number | null;
+  max: number | null;
+  mean: number | null;
+  median: number | null;
+  stdev: number | null;
+  grades: Record<string, number>;
+}
+
+export interface RescoreSummary {
+  type: "summary";
+  count: number;
+  distinct: number;
+  failed: number;
+  scores: ScoreDistribution;
+  wall_time: number;
+}
+
+/** What a symbol_table preview leaves out; fetch the full value with fetchVariable. */
+export interface VariableInfo {
+  type: string;
+  size_bytes: number;
+  truncated: boolean;
+  length?: number | null;
+}
+
+export interface VariableResult {
+  name: string;
+  value: unknown;
+  type: string;
+  length: number | null;
+  size_bytes: number;
+  timestamp: string;
+}
+
+/** Set when output passed the interpreter's in-memory cap. */
+export interface OutputCapture {
+  output_bytes: number;
+  output_truncated: boolean;
+  output_id: string | null; // fetch the full output with fetchOutputRange
+}
+
+export interface OutputRange {
+  text: string;
+  offset: number;
+  totalBytes: number;
+}
+
+export interface ExecuteResult extends OutputCapture {
   success: boolean;
   output: string;
   errors: string[];
   execution_time: number;
-  profiling: ProfilingData | null;
+  profiling: AnyProfilingData | null;
   symbol_table: Record<string, unknown>;
+  symbol_info: Record<string, VariableInfo>;
+  symbol_table_id: string | null; // set when a preview was truncated; see fetchVariable
   timestamp: string;
 }
 
@@ -101,15 +259,34 @@ export interface ProfileResult {
   success: boolean;
   errors: string[];
   execution_time: number;
-  profiling: ProfilingData | null;
+  profiling: AnyProfilingData | null;
+  timestamp: string;
+}
+
+export type JobKind = "execute" | "profile" | "analyze";
+
+/** A background run; result is the response of the route kind names. */
+export interface JobResult {
+  job_id: string;
+  kind: JobKind;
+  status: "running" | "succeeded" | "failed" | "cancelled";
+  created_at: string;
+  finished_at: string | null;
+  result: ExecuteResult | ProfileResult | AnalyzeResult | null;
+  error: string | null;
   timestamp: string;
 }
 
+export type OptimizeMode = "runtime" | "static";
+
 export interface OptimizeResult {
   success: boolean;
   errors: string[];
   suggestions: Suggestion[];
   suggestion_count: number;
+  mode: OptimizeMode;
+  /** Patterns that need profiling data and were not checked */
+  skipped_patterns: string[];
   timestamp: string;
 }
 
@@ -120,18 +297,56 @@ export interface ScoreResult {
   timestamp: string;
 }
 
-export interface AnalyzeResult {
+export interface AnalyzeResult extends OutputCapture {
   success: boolean;
   output: string;
   errors: string[];
   execution_time: number;
-  profiling: ProfilingData | null;
+  profiling: AnyProfilingData | null;
   symbol_table: Record<string, unknown>;
+  symbol_info: Record<string, VariableInfo>;
+  symbol_table_id: string | null; // set when a preview was truncated; see fetchVariable
   suggestions: Suggestion[];
   score_report: ScoreReport;
   timestamp: string;
 }
 
+export interface ExecutionProgress {
+  elapsed_ms: number;
+  statements_executed: number;
+  current_line: number | null;
+  output_bytes: number;
+  hot_lines?: { line: number; count: number; total_time_ms: number }[];
+}
+
+export interface ExecuteStreamResult {
+  success: boolean;
+  errors: string[];
+  execution_time: number;
+  output_bytes: number;
+  truncated: boolean;
+  profiling: AnyProfilingData | null;
+  symbol_table: Record<string, unknown>;
+  symbol_info: Record<string, VariableInfo>;
+  symbol_table_id: string | null; // set when a preview was truncated; see fetchVariable
+  suggestions: Suggestion[] | null;
+  score_report: ScoreReport | null;
+}
+
+export type ExecutionStreamEvent =
+  | { event: "stdout"; data: { text: string } }
+  | { event: "progress"; data: ExecutionProgress }
+  | { event: "result"; data: ExecuteStreamResult }
+  | { event: "error"; data: { detail: string } };
+
+export interface StreamExecutionOptions {
+  userId?: string;
+  timeout?: number;
+  enableProfiling?: boolean;
+  includeScore?: boolean;
+  signal?: AbortSignal;
+}
+
 export interface TokenizeResult {
   success: boolean;
   tokens: TokenResponseItem[];
@@ -152,8 +367,17 @@ function buildPayload(
   userId?: string,
   timeout = 5,
   enableProfiling = true,
+  profilingFormat: ProfilingFormat = "objects",
+  profilingTier?: ProfilingTier,
 ) {
-  return { code, user_id: userId, timeout, enable_profiling: enableProfiling };
+  return {
+    code,
+    user_id: userId,
+    timeout,
+    enable_profiling: enableProfiling,
+    profiling_format: profilingFormat,
+    profiling_tier: profilingTier,
+  };
 }
 
 export const executeCode = async (
@@ -161,10 +385,19 @@ export const executeCode = async (
   userId?: string,
   timeout = 5,
   enableProfiling = true,
+  profilingFormat: ProfilingFormat = "objects",
+  profilingTier?: ProfilingTier,
 ): Promise<ExecuteResult> => {
   const { data } = await interpreterClient.post<ExecuteResult>(
     "/execute",
-    buildPayload(code, userId, timeout, enableProfiling),
+    buildPayload(
+      code,
+      userId,
+      timeout,
+      enableProfiling,
+      profilingFormat,
+      profilingTier,
+    ),
   );
   return data;
 };
@@ -173,10 +406,19 @@ export const profileCode = async (
   code: string,
   userId?: string,
   timeout = 5,
+  profilingFormat: ProfilingFormat = "objects",
+  profilingTier?: ProfilingTier,
 ): Promise<ProfileResult> => {
   const { data } = await interpreterClient.post<ProfileResult>(
     "/profile",
-    buildPayload(code, userId, timeout, true),
+    buildPayload(
+      code,
+      userId,
+      timeout,
+      true,
+      profilingFormat,
+      profilingTier,
+    ),
   );
   return data;
 };
@@ -185,7 +427,16 @@ export const optimizeCode = async (
   code: string,
   userId?: string,
   timeout = 5,
+  mode: OptimizeMode = "runtime",
 ): Promise<OptimizeResult> => {
+  if (mode === "static") {
+    // Analyzes the AST without running it: no timeout, no profiling
+    const { data } = await interpreterClient.post<OptimizeResult>(
+      "/optimize/static",
+      { code, user_id: userId },
+    );
+    return data;
+  }
   const { data } = await interpreterClient.post<OptimizeResult>(
     "/optimize",
     buildPayload(code, userId, timeout, true),
@@ -210,14 +461,108 @@ export const analyzeCode = async (
   userId?: string,
   timeout = 5,
   enableProfiling = true,
+  profilingFormat: ProfilingFormat = "objects",
+  profilingTier?: ProfilingTier,
 ): Promise<AnalyzeResult> => {
   const { data } = await interpreterClient.post<AnalyzeResult>(
     "/analyze",
-    buildPayload(code, userId, timeout, enableProfiling),
+    buildPayload(
+      code,
+      userId,
+      timeout,
+      enableProfiling,
+      profilingFormat,
+      profilingTier,
+    ),
+  );
+  return data;
+};
+
+/**
+ * Full value of one variable whose symbol_table entry was truncated,
+ * read from the symbol table the run stored under symbolTableId.
+ */
+export const fetchVariable = async (
+  symbolTableId: string,
+  name: string,
+  userId?: string,
+): Promise<VariableResult> => {
+  const { data } = await interpreterClient.post<VariableResult>(
+    `/variables/${encodeURIComponent(name)}`,
+    { symbol_table_id: symbolTableId, user_id: userId },
   );
   return data;
 };
 
+/**
+ * Start a background run; returns at once with the job id.
+ */
+export const submitJob = async (
+  code: string,
+  kind: JobKind,
+  userId?: string,
+  timeout = 5,
+  enableProfiling = true,
+  profilingTier?: ProfilingTier,
+): Promise<JobResult> => {
+  const { data } = await interpreterClient.post<JobResult>("/jobs", {
+    ...buildPayload(
+      code,
+      userId,
+      timeout,
+      enableProfiling,
+      "objects",
+      profilingTier,
+    ),
+    kind,
+  });
+  return data;
+};
+
+/**
+ * A job's status, held up to waitSeconds while it is still running.
+ */
+export const fetchJob = async (
+  jobId: string,
+  waitSeconds = 0,
+): Promise<JobResult> => {
+  const { data } = await interpreterClient.get<JobResult>(
+    `/jobs/${encodeURIComponent(jobId)}`,
+    {
+      params: { wait: waitSeconds },
+      // The long-poll must not race the client's own timeout
+      timeout: config.interpreter.timeout + waitSeconds * 1000,
+    },
+  );
+  return data;
+};
+
+export const cancelJob = async (jobId: string): Promise<JobResult> => {
+  const { data } = await interpreterClient.delete<JobResult>(
+    `/jobs/${encodeURIComponent(jobId)}`,
+  );
+  return data;
+};
+
+/**
+ * A byte range of output that was too large to return inline.
+ */
+export const fetchOutputRange = async (
+  outputId: string,
+  offset = 0,
+  length?: number,
+): Promise<OutputRange> => {
+  const response = await interpreterClient.get<string>(
+    `/outputs/${encodeURIComponent(outputId)}`,
+    { params: { offset, length }, responseType: "text" },
+  );
+  return {
+    text: response.data,
+    offset,
+    totalBytes: Number(response.headers["x-output-total-bytes"] ?? 0),
+  };
+};
+
 export const tokenizeCode = async (
   code: string,
   userId?: string,
@@ -239,3 +584,115 @@ export const parseCode = async (
   });
   return data;
 };
+
+function parseSseMessage(message: string): ExecutionStreamEvent | null {
+  let event = "message";
+  const data: string[] = [];
+  for (const line of message.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+  }
+  if (data.length === 0) return null;
+  return { event, data: JSON.parse(data.join("\n")) } as ExecutionStreamEvent;
+}
+
+/**
+ * Run code on the interpreter's /execute/stream endpoint, calling `onEvent`
+ * for every stdout / progress frame as it arrives. Resolves with the final
+ * result frame; rejects on an error frame or if the stream ends without one.
+ * Aborting `signal` closes the stream, which cancels the run server-side.
+ */
+export const streamExecution = async (
+  code: string,
+  onEvent: (event: ExecutionStreamEvent) => void,
+  {
+    userId,
+    timeout = 5,
+    enableProfiling = true,
+    includeScore = true,
+    signal,
+  }: StreamExecutionOptions = {},
+): Promise<ExecuteStreamResult> => {
+  const response = await interpreterClient.post<Readable>(
+    "/execute/stream",
+    {
+      ...buildPayload(code, userId, timeout, enableProfiling),
+      include_score: includeScore,
+    },
+    {
+      responseType: "stream",
+      headers: { Accept: "text/event-stream" },
+      // The run is bounded server-side; a whole-response timeout would cut
+      // long streams short.
+      timeout: 0,
+      ...(signal ? { signal } : {}),
+    },
+  );
+
+  let buffer = "";
+  response.data.setEncoding("utf8");
+  for await (const chunk of response.data as AsyncIterable<string>) {
+    buffer += chunk;
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const frame = parseSseMessage(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      if (!frame) continue;
+
+      if (frame.event === "result") {
+        response.data.destroy();
+        return frame.data;
+      }
+      if (frame.event === "error") {
+        response.data.destroy();
+        throw new Error(frame.data.detail);
+      }
+      onEvent(frame);
+    }
+  }
+  throw new Error("Interpreter stream ended without a result");
+};
+
+/**
+ * Score stored runs again on the interpreter's /rescore endpoint without
+ * re-executing them, calling `onItem` for every result line as it arrives.
+ * Resolves with the summary line.
+ */
+export const rescoreResults = async (
+  items: RescoreItem[],
+  onItem: (item: RescoreItemResult) => void,
+  { userId, signal }: { userId?: string; signal?: AbortSignal } = {},
+): Promise<RescoreSummary> => {
+  const response = await interpreterClient.post<Readable>(
+    "/rescore",
+    { items, user_id: userId },
+    {
+      responseType: "stream",
+      headers: { Accept: "application/x-ndjson" },
+      timeout: 0,
+      ...(signal ? { signal } : {}),
+    },
+  );
+
+  let buffer = "";
+  response.data.setEncoding("utf8");
+  for await (const chunk of response.data as AsyncIterable<string>) {
+    buffer += chunk;
+    let newline = buffer.indexOf("\n");
+    while (newline !== -1) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      newline = buffer.indexOf("\n");
+      if (!line) continue;
+
+      const result = JSON.parse(line) as RescoreItemResult | RescoreSummary;
+      if (result.type === "summary") {
+        response.data.destroy();
+        return result;
+      }
+      onItem(result);
+    }
+  }
+  throw new Error("Interpreter rescore stream ended without a summary");
+};
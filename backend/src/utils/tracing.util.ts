@@ -0,0 +1,151 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+import { randomBytes } from "node:crypto";
+import { createWriteStream, mkdirSync, type WriteStream } from "node:fs";
+import { dirname } from "node:path";
+import { config } from "@config/env.js";
+import logger from "@utils/logger.util.js";
+
+// ── Types
+
+export interface SpanContext {
+  traceId: string;
+  spanId: string;
+}
+
+export interface Span extends SpanContext {
+  parentId: string | null;
+  name: string;
+  service: string;
+  startTime: number; // epoch milliseconds
+  endTime?: number;
+  status: "ok" | "error";
+  attributes: Record<string, unknown>;
+}
+
+export interface SpanExporter {
+  export(span: Span): void;
+  close?(): void;
+}
+
+// ── Exporters
+
+/** Keeps finished spans in memory — for tests. */
+export class InMemorySpanExporter implements SpanExporter {
+  readonly spans: Span[] = [];
+
+  export(span: Span): void {
+    this.spans.push(span);
+  }
+
+  clear(): void {
+    this.spans.length = 0;
+  }
+}
+
+/** Appends finished spans to a file, one JSON object per line. */
+export class FileSpanExporter implements SpanExporter {
+  private readonly stream: WriteStream;
+
+  constructor(path: string) {
+    mkdirSync(dirname(path), { recursive: true });
+    this.stream = createWriteStream(path, { flags: "a" });
+  }
+
+  export(span: Span): void {
+    const duration = (span.endTime ?? span.startTime) - span.startTime;
+    // Same field names as the interpreter's spans so both files can be merged
+    this.stream.write(
+      JSON.stringify({
+        trace_id: span.traceId,
+        span_id: span.spanId,
+        parent_id: span.parentId,
+        name: span.name,
+        service: span.service,
+        start_time: span.startTime / 1000,
+        end_time: (span.endTime ?? span.startTime) / 1000,
+        duration_ms: duration,
+        status: span.status,
+        attributes: span.attributes,
+      }) + "\n",
+    );
+  }
+
+  close(): void {
+    this.stream.end();
+  }
+}
+
+// ── W3C trace context
+
+const TRACEPARENT = /^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$/;
+
+export const parseTraceparent = (header?: string): SpanContext | null => {
+  const match = header ? TRACEPARENT.exec(header.trim().toLowerCase()) : null;
+  if (!match || !match[1] || !match[2] || /^0+$/.test(match[1]) || /^0+$/.test(match[2])) {
+    return null;
+  }
+  return { traceId: match[1], spanId: match[2] };
+};
+
+export const formatTraceparent = (span: SpanContext): string =>
+  `00-${span.traceId}-${span.spanId}-01`;
+
+// ── Tracer
+
+const SERVICE = "backend";
+const activeSpan = new AsyncLocalStorage<Span>();
+
+let exporter: SpanExporter | null =
+  config.tracing.exporter === "file"
+    ? new FileSpanExporter(config.tracing.file)
+    : config.tracing.exporter === "memory"
+      ? new InMemorySpanExporter()
+      : null;
+
+/** Replace the exporter (e.g. with an in-memory collector in tests); null disables tracing. */
+export const setSpanExporter = (next: SpanExporter | null): void => {
+  exporter?.close?.();
+  exporter = next;
+};
+
+export const currentSpan = (): Span | undefined => activeSpan.getStore();
+
+/**
+ * Start a span under `parent`, or under the active span when omitted.
+ * Returns null while tracing is disabled; every helper accepts that.
+ */
+export const startSpan = (
+  name: string,
+  attributes: Record<string, unknown> = {},
+  parent: SpanContext | null = currentSpan() ?? null,
+): Span | null => {
+  if (!exporter) return null;
+  return {
+    traceId: parent?.traceId ?? randomBytes(16).toString("hex"),
+    spanId: randomBytes(8).toString("hex"),
+    parentId: parent?.spanId ?? null,
+    name,
+    service: SERVICE,
+    startTime: Date.now(),
+    status: "ok",
+    attributes,
+  };
+};
+
+export const endSpan = (span: Span | null, error?: unknown): void => {
+  if (!span || !exporter) return;
+  span.endTime = Date.now();
+  if (error !== undefined) {
+    span.status = "error";
+    span.attributes["error"] = error instanceof Error ? error.message : String(error);
+  }
+  try {
+    exporter.export(span);
+  } catch (err) {
+    logger.warn("Span export failed:", err);
+  }
+};
+
+/** Run `fn` with `span` as the active span, so spans it starts nest under it. */
+export const runInSpan = <T>(span: Span | null, fn: () => T): T =>
+  span ? activeSpan.run(span, fn) : fn();
@@ -1,4 +1,5 @@
 import { z } from "zod";
+import { PROFILING_TIERS } from "@services/interpreterClient.service.js";
 
 export const sourceSchema = z.object({
   code: z
@@ -20,6 +21,33 @@ export const codeSchema = sourceSchema.extend({
     .boolean()
     .optional()
     .default(true),
+  profiling_tier: z.enum(PROFILING_TIERS).optional(),
+});
+
+export const optimizeSchema = codeSchema.extend({
+  mode: z.enum(["runtime", "static"]).optional().default("runtime"),
+});
+
+export const variableSchema = z.object({
+  symbolTableId: z.string().regex(/^[0-9a-f]{32}$/, "Invalid symbol table id"),
+  name: z
+    .string()
+    .regex(/^[A-Za-z_][A-Za-z0-9_]*$/, "Invalid variable name"),
+});
+
+export const jobSchema = codeSchema.extend({
+  kind: z.enum(["execute", "profile", "analyze"]).optional().default("analyze"),
+});
+
+export const jobQuerySchema = z.object({
+  jobId: z.string().regex(/^[0-9a-f]{32}$/, "Invalid job id"),
+  wait: z.coerce.number().min(0).max(30).optional().default(0),
+});
+
+export const outputRangeSchema = z.object({
+  outputId: z.string().regex(/^[0-9a-f]{32}$/, "Invalid output id"),
+  offset: z.coerce.number().int().min(0).optional().default(0),
+  length: z.coerce.number().int().min(1).max(1_000_000).optional(),
 });
 
 export const historyQuerySchema = z.object({
@@ -48,4 +76,9 @@ export const historyQuerySchema = z.object({
 export type CodeInput = z.infer<typeof codeSchema>;
 
 export type SourceInput = z.infer<typeof sourceSchema>;
+export type OptimizeInput = z.infer<typeof optimizeSchema>;
+export type VariableInput = z.infer<typeof variableSchema>;
+export type JobInput = z.infer<typeof jobSchema>;
+export type JobQuery = z.infer<typeof jobQuerySchema>;
+export type OutputRangeInput = z.infer<typeof outputRangeSchema>;
 export type HistoryQuery = z.infer<typeof historyQuerySchema>;
\ No newline at end of file
@@ -1,17 +1,29 @@
+from app.api.routes.admin import router as admin_router
 from app.api.routes.analyze import router as analysis_router
+from app.api.routes.batch import router as batch_router
+from app.api.routes.documents import router as documents_router
 from app.api.routes.execute import router as execution_router
 from app.api.routes.health import router as health_router
+from app.api.routes.jobs import router as jobs_router
 from app.api.routes.language import router as language_router
 from app.api.routes.optimize import router as optimization_router
+from app.api.routes.outputs import router as outputs_router
 from app.api.routes.profile import router as profile_router
 from app.api.routes.score import router as score_router
+from app.api.routes.variables import router as variables_router
 
 __all__ = [
+    "admin_router",
     "analysis_router",
+    "batch_router",
+    "documents_router",
     "execution_router",
     "health_router",
+    "jobs_router",
     "language_router",
     "optimization_router",
+    "outputs_router",
     "profile_router",
     "score_router",
+    "variables_router",
 ]
\ No newline at end of file
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.config import settings
+from app.core.sampler import render_collapsed, service_profiler
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+
+def _require_admin(admin_secret: Optional[str]) -> None:
+    # Switched off unless explicitly enabled with a secret; answer as if the
+    # route did not exist so a scan learns nothing.
+    if not settings.service_profiling_enabled or not settings.admin_api_secret:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if admin_secret is None or not secrets.compare_digest(admin_secret, settings.admin_api_secret):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_service(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    output: Literal["collapsed", "json"] = Query("collapsed", alias="format"),
+    x_admin_secret: Optional[str] = Header(None),
+) -> Response:
+    """
+    Sample the Python stacks of this process, and of jobs its process or
+    sandbox workers run, for ``seconds``. Returns collapsed stacks
+    (``frame;frame;frame count`` per line) for flamegraph.pl or speedscope.
+    """
+    _require_admin(x_admin_secret)
+    seconds = min(seconds, settings.service_profiling_max_seconds)
+    logger.info("Service profile | seconds=%s interval_ms=%s", seconds, interval_ms)
+
+    profile = await asyncio.to_thread(service_profiler.profile, seconds, interval_ms / 1000)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A service profile is already being recorded",
+        )
+
+    if output == "json":
+        return JSONResponse(profile)
+    return PlainTextResponse(
+        render_collapsed(profile["stacks"]),
+        headers={
+            "X-Profile-Seconds": str(profile["seconds"]),
+            "X-Profile-Samples": str(profile["samples"]),
+        },
+    )
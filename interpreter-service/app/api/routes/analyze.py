@@ -2,28 +2,22 @@ from __future__ import annotations
 
 from datetime import datetime
 import logging
+from typing import Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
-import optilang
-from app.core.serialization import (
-    serialize_profiling,
-    serialize_score_report,
-    serialize_suggestions,
-    to_json_safe,
-)
+from app.core.responses import encoded
+from app.core.serialization import shape_profiling
 from app.schemas.requests import ExecuteRequest
 from app.schemas.responses import AnalyzeResponse
-from optilang.lexer import tokenize
-from optilang.parser import parse
-from optilang.utils.errors import OptiLangError
+from app.services.results import run_stages
 
 router = APIRouter(tags=["analysis"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/analyze", response_model=AnalyzeResponse, status_code=status.HTTP_200_OK)
-async def analyze_code(request: ExecuteRequest) -> AnalyzeResponse:
+async def analyze_code(request: ExecuteRequest) -> Union[AnalyzeResponse, Response]:
     """
     Full pipeline — execute + profile + optimize + score in one request.
     This is the primary endpoint for the web IDE experience.
@@ -31,38 +25,24 @@ async def analyze_code(request: ExecuteRequest) -> AnalyzeResponse:
     """
     logger.info("Analyze | user=%s code_len=%s", request.user_id, len(request.code))
     try:
-        result = optilang.execute(
+        stages = await run_stages(
             request.code,
-            timeout_seconds=request.timeout or 5,
-            enable_profiling=request.enable_profiling,
+            request.timeout or 5,
+            request.enable_profiling,
+            ("execution", "suggestions", "score_report"),
+            profiling_tier=request.profiling_tier,
         )
-
-        optimization_report = None
-        suggestions: list = []
-        try:
-            ast = parse(tokenize(request.code))
-            optimization_report = optilang.analyze(ast, result.profiling, result.symbol_table)
-            suggestions = serialize_suggestions(optimization_report)
-        except OptiLangError as exc:
-            logger.info("Analyze — optimization skipped: %s", exc)
-
-        score_report = optilang.calculate_score(
-            profiling_data=result.profiling.to_dict() if result.profiling else None,
-            optimizer_report=optimization_report,
-            source_lines=max(1, len(request.code.splitlines())),
-            errors=result.errors,
-        )
-
-        return AnalyzeResponse(
-            success=len(result.errors) == 0,
-            output=result.output,
-            errors=result.errors,
-            execution_time=result.execution_time,
-            profiling=serialize_profiling(result.profiling),
-            symbol_table=to_json_safe(result.symbol_table),
-            suggestions=suggestions,
-            score_report=serialize_score_report(score_report),
-            timestamp=datetime.utcnow(),
+        execution = stages["execution"]
+        return encoded(
+            AnalyzeResponse(
+                **{
+                    **execution,
+                    "profiling": shape_profiling(execution["profiling"], request.profiling_format),
+                },
+                suggestions=stages["suggestions"],
+                score_report=stages["score_report"],
+                timestamp=datetime.utcnow(),
+            )
         )
     except Exception as exc:
         logger.error("Analyze error: %s", exc, exc_info=True)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+import logging
+
+from fastapi import APIRouter, status
+from fastapi.responses import StreamingResponse
+
+from app.schemas.requests import BatchAnalyzeRequest
+from app.schemas.responses import BatchItemResult
+from app.services.batch import analyze_batch
+
+router = APIRouter(prefix="/batch", tags=["analysis"])
+logger = logging.getLogger(__name__)
+
+
+@router.post(
+    "/analyze",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def analyze_batch_route(request: BatchAnalyzeRequest) -> StreamingResponse:
+    """
+    Run the full pipeline on many programs and stream newline-delimited JSON.
+
+    One ``item`` line (``BatchItemResult``) is written per program in the
+    order the programs finish, then a single ``summary`` line
+    (``BatchSummary``) with the score distribution, failure counts and
+    total execution and CPU time. ``inputs`` are bound as global variables
+    before each program runs; an item's own ``inputs`` and ``timeout``
+    override the batch ones.
+    """
+    logger.info("Batch analyze | user=%s items=%s", request.user_id, len(request.items))
+    results = analyze_batch(request)
+
+    async def lines():
+        try:
+            async for result in results:
+                if result["type"] == "item":
+                    line = BatchItemResult.model_validate(result).model_dump_json(exclude_none=True)
+                else:
+                    line = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+                yield line.encode("utf-8") + b"\n"
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
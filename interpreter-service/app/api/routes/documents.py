@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import logging
+from typing import Union
+
+from fastapi import APIRouter, HTTPException, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.responses import encoded
+from app.schemas.requests import DocumentEditRequest, DocumentOpenRequest
+from app.schemas.responses import DocumentDeltaResponse
+from app.services.documents import DocumentError, VersionConflict, document_store
+
+router = APIRouter(prefix="/documents", tags=["language"])
+logger = logging.getLogger(__name__)
+
+# Sessions live in this process, so lexing runs on the threadpool rather
+# than the execution pool, whose workers may be separate processes.
+
+
+@router.post("", response_model=DocumentDeltaResponse, status_code=status.HTTP_201_CREATED)
+async def open_document(request: DocumentOpenRequest) -> Union[DocumentDeltaResponse, Response]:
+    """Open an incremental session; the response holds every block."""
+    delta = await run_in_threadpool(document_store.open, request.code)
+    return encoded(
+        DocumentDeltaResponse(**delta, timestamp=datetime.now(timezone.utc)),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post(
+    "/{document_id}/edits",
+    response_model=DocumentDeltaResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def edit_document(
+    document_id: str, request: DocumentEditRequest
+) -> Union[DocumentDeltaResponse, Response]:
+    """Apply one range edit and return the re-lexed and re-parsed blocks."""
+    try:
+        delta = await run_in_threadpool(
+            document_store.edit, document_id, **request.model_dump()
+        )
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown or expired document; open it again",
+        ) from exc
+    except VersionConflict as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    except DocumentError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        ) from exc
+    return encoded(DocumentDeltaResponse(**delta, timestamp=datetime.now(timezone.utc)))
+
+
+@router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def close_document(document_id: str) -> None:
+    """Drop an incremental session."""
+    if not document_store.close(document_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown document")
@@ -1,44 +1,97 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+import json
 import logging
+from typing import Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 
-import optilang
-from app.core.serialization import serialize_profiling, to_json_safe
-from app.schemas.requests import ExecuteRequest
-from app.schemas.responses import ExecuteResponse
+from app.core.responses import encoded
+from app.core.serialization import shape_profiling
+from app.schemas.requests import ExecuteRequest, ExecuteStreamRequest
+from app.schemas.responses import ExecuteResponse, ExecuteStreamResult
+from app.services.results import run_stages
+from app.services.streaming import encode_sse, stream_execution
 
 router = APIRouter(tags=["execution"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/execute", response_model=ExecuteResponse, status_code=status.HTTP_200_OK)
-async def execute_code(request: ExecuteRequest) -> ExecuteResponse:
+async def execute_code(request: ExecuteRequest) -> Union[ExecuteResponse, Response]:
     """
     Run OptiLang code and return raw output + profiling.
     No suggestions, no score. Use /analyze for the full pipeline.
     """
     logger.info("Execute | user=%s code_len=%s", request.user_id, len(request.code))
     try:
-        result = optilang.execute(
+        stages = await run_stages(
             request.code,
-            timeout_seconds=request.timeout or 5,
-            enable_profiling=request.enable_profiling,
+            request.timeout or 5,
+            request.enable_profiling,
+            ("execution",),
+            profiling_tier=request.profiling_tier,
         )
-        return ExecuteResponse(
-            success=len(result.errors) == 0,
-            output=result.output,
-            errors=result.errors,
-            execution_time=result.execution_time,
-            profiling=serialize_profiling(result.profiling),
-            symbol_table=to_json_safe(result.symbol_table),
-            timestamp=datetime.now(timezone.utc),
+        execution = stages["execution"]
+        return encoded(
+            ExecuteResponse(
+                **{
+                    **execution,
+                    "profiling": shape_profiling(execution["profiling"], request.profiling_format),
+                },
+                timestamp=datetime.now(timezone.utc),
+            )
         )
     except Exception as exc:
         logger.error("Execute error: %s", exc, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Execution error: {exc}",
-        ) from exc
\ No newline at end of file
+        ) from exc
+
+@router.post(
+    "/execute/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def execute_code_stream(request: ExecuteStreamRequest) -> StreamingResponse:
+    """
+    Run OptiLang code and stream it as Server-Sent Events.
+
+    Events: ``stdout`` ({text}) as output is printed, ``progress``
+    ({elapsed_ms, statements_executed, current_line, output_bytes,
+    hot_lines}) periodically, then one ``result`` (the /execute fields
+    without ``output``, plus ``output_bytes``, ``truncated`` and, with
+    ``include_score``, ``suggestions`` and ``score_report``; see
+    ``ExecuteStreamResult``) or ``error`` ({detail}).
+    """
+    logger.info("Execute stream | user=%s code_len=%s", request.user_id, len(request.code))
+    frames = stream_execution(
+        request.code,
+        request.timeout or 5,
+        request.enable_profiling,
+        request.include_score,
+        request.profiling_tier,
+    )
+
+    async def events():
+        try:
+            async for frame in frames:
+                if frame["event"] == "result":
+                    result = frame["data"]
+                    result["profiling"] = shape_profiling(result["profiling"], request.profiling_format)
+                    data = ExecuteStreamResult.model_validate(result).model_dump_json()
+                else:
+                    data = json.dumps(frame["data"], ensure_ascii=False, separators=(",", ":"))
+                yield encode_sse(frame["event"], data)
+        finally:
+            await frames.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
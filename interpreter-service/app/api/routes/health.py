@@ -1,7 +1,15 @@
 from datetime import datetime, timezone
 from fastapi import APIRouter
-from app.schemas.responses import HealthResponse
+from fastapi.responses import PlainTextResponse
+from app.schemas.responses import HealthResponse, StatsResponse
+from app.core.admission import admission_controller
+from app.core.cache import artifact_index, result_cache, syntax_cache
 from app.core.config import settings
+from app.core.execution import execution_pool
+from app.core import metrics
+from app.services.documents import document_store
+from app.services.jobs import job_store
+from app.services.results import pipeline_flights
 
 router = APIRouter(tags=["health"])
 
@@ -15,6 +23,50 @@ async def health_check() -> HealthResponse:
     )
 
 
+@router.get("/stats", response_model=StatsResponse)
+async def stats() -> StatsResponse:
+    return StatsResponse(
+        execution_pool=execution_pool.stats(),
+        result_cache=result_cache.stats(),
+        syntax_cache=syntax_cache.stats(),
+        artifact_index=artifact_index.stats(),
+        document_sessions=document_store.stats(),
+        admission=admission_controller.stats(),
+        jobs=job_store.stats(),
+        singleflight=pipeline_flights.stats(),
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Counters and latency histograms in the Prometheus text format."""
+    pool = execution_pool.stats()
+    metrics.POOL_WORKERS.set(pool["workers"])
+    metrics.POOL_IN_FLIGHT.set(pool["in_flight"])
+    metrics.POOL_QUEUED.set(pool["queued"])
+    metrics.POOL_UTILISATION.set(pool["in_flight"] / pool["workers"])
+    caches = {
+        "result": result_cache.stats(),
+        "syntax": syntax_cache.stats(),
+        "artifacts": artifact_index.stats(),
+        "documents": document_store.stats(),
+    }
+    for name, cache in caches.items():
+        metrics.CACHE_LOOKUPS.set_total(cache["hits"], name, "hit")
+        metrics.CACHE_LOOKUPS.set_total(cache["misses"], name, "miss")
+        metrics.CACHE_HIT_RATIO.set(cache["hit_ratio"], name)
+        metrics.CACHE_BYTES.set(cache["bytes"], name)
+    admission = admission_controller.stats()
+    for priority, count in admission["shed"].items():
+        metrics.ADMISSION_SHED.set_total(count, priority)
+    metrics.ADMISSION_EXPECTED_WAIT.set(admission["expected_wait_seconds"])
+    metrics.SINGLEFLIGHT_RATIO.set(pipeline_flights.stats()["coalesce_ratio"])
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @router.get("/")
 async def root() -> dict:
     return {
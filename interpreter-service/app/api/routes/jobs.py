@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import logging
+from typing import Union
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from app.core.admission import admission_controller
+from app.core.config import settings
+from app.core.responses import encoded
+from app.schemas.requests import JobRequest
+from app.schemas.responses import JobResponse
+from app.services.jobs import Job, JobTableFull, job_store
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
+
+
+def _find(job_id: str) -> Job:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown or expired job")
+    return job
+
+
+def _respond(job: Job, status_code: int = status.HTTP_200_OK) -> Union[JobResponse, Response]:
+    return encoded(
+        JobResponse(**job.snapshot(), timestamp=datetime.now(timezone.utc)),
+        status_code=status_code,
+    )
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: JobRequest, http_request: Request) -> Union[JobResponse, Response]:
+    """
+    Run a submission in the background and return its ``job_id`` at once.
+    The result, once ready, is the response of the route ``kind`` names.
+    """
+    logger.info(
+        "Job submit | user=%s kind=%s code_len=%s",
+        request.user_id,
+        request.kind,
+        len(request.code),
+    )
+    # The admission ticket covers the run, not this request: the job returns it
+    ticket = getattr(http_request.state, "admission_ticket", None)
+    http_request.state.admission_ticket = None
+    on_done = (lambda: admission_controller.release(ticket)) if ticket is not None else None
+    try:
+        job = job_store.submit(request, on_done)
+    except JobTableFull as exc:
+        if on_done is not None:
+            on_done()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many jobs. Please retry shortly.",
+        ) from exc
+    return _respond(job, status.HTTP_202_ACCEPTED)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0.0, ge=0, description="Seconds to hold the request while the job runs"),
+) -> Union[JobResponse, Response]:
+    """Status of a job and, once it has succeeded, its result; ``wait`` long-polls."""
+    job = await job_store.wait(_find(job_id), min(wait, settings.jobs_max_wait_seconds))
+    return _respond(job)
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str) -> Union[JobResponse, Response]:
+    """Stop a running job and free its worker; a finished job is returned unchanged."""
+    job = await job_store.cancel(_find(job_id))
+    return _respond(job)
@@ -2,42 +2,82 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 import logging
+from typing import Any, Callable, Dict
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
+from pydantic import BaseModel, TypeAdapter
 
+from app.core.cache import source_cache_key, syntax_cache
+from app.core.execution import execution_pool
 from app.core.serialization import serialize_tokens, to_json_safe
 from app.schemas.requests import ParseRequest, TokenizeRequest
 from app.schemas.responses import ParseResponse, TokenizeResponse
-from optilang.lexer import tokenize
-from optilang.parser import parse
+from app.services.pipeline import AnalysisPipeline
 from optilang.utils.errors import OptiLangError
 
 router = APIRouter(tags=["language"])
 logger = logging.getLogger(__name__)
 
+# Encodes the timestamp the way response models do (``...Z``, not ``+00:00``)
+_timestamp = TypeAdapter(datetime)
 
-@router.post("/tokenize", response_model=TokenizeResponse, status_code=status.HTTP_200_OK)
-async def tokenize_code(request: TokenizeRequest) -> TokenizeResponse:
-    """Expose the OptiLang lexer output."""
+
+def _encode_body(response: BaseModel) -> bytes:
+    # Encoded by the response model (non-finite floats become null), but
+    # without the timestamp and closing brace so a fresh one can be appended
+    return response.model_dump_json(exclude={"timestamp"})[:-1].encode("utf-8")
+
+
+def _tokenize_body(code: str) -> bytes:
+    return _encode_body(TokenizeResponse(**_tokenize(code)))
+
+
+def _parse_body(code: str) -> bytes:
+    return _encode_body(ParseResponse(**_parse(code)))
+
+
+async def _cached_body(kind: str, code: str, job: Callable[[str], bytes]) -> Response:
+    """
+    Serve a /tokenize or /parse response from the syntax cache, running
+    ``job`` on the execution pool on a miss. Lexer and parser output depend
+    only on the source, so cached bodies are reused as-is and only the
+    timestamp is per request.
+    """
+    key = source_cache_key(kind, code)
+    body = syntax_cache.get(key)
+    if body is None:
+        body = await execution_pool.run(job, code)
+        syntax_cache.set(key, body, size=len(body))
+    timestamp = _timestamp.dump_json(datetime.now(timezone.utc))
+    return Response(
+        content=b"".join((body, b',"timestamp":', timestamp, b"}")),
+        media_type="application/json",
+    )
+
+
+def _tokenize(code: str) -> Dict[str, Any]:
     try:
-        tokens = tokenize(request.code)
-        serialized_tokens = serialize_tokens(tokens)
-        return TokenizeResponse(
-            success=True,
-            tokens=serialized_tokens,
-            token_count=len(serialized_tokens),
-            errors=[],
-            timestamp=datetime.now(timezone.utc),
-        )
+        tokens = serialize_tokens(AnalysisPipeline(code).tokens)
     except OptiLangError as exc:
         logger.info("Tokenization error: %s", exc)
-        return TokenizeResponse(
-            success=False,
-            tokens=[],
-            token_count=0,
-            errors=[str(exc)],
-            timestamp=datetime.now(timezone.utc),
-        )
+        return {"success": False, "tokens": [], "token_count": 0, "errors": [str(exc)]}
+    return {"success": True, "tokens": tokens, "token_count": len(tokens), "errors": []}
+
+
+def _parse(code: str) -> Dict[str, Any]:
+    try:
+        ast = AnalysisPipeline(code).ast
+    except OptiLangError as exc:
+        logger.info("Parse error: %s", exc)
+        return {"success": False, "ast": None, "errors": [str(exc)]}
+    return {"success": True, "ast": to_json_safe(ast), "errors": []}
+
+
+@router.post("/tokenize", response_model=TokenizeResponse, status_code=status.HTTP_200_OK)
+async def tokenize_code(request: TokenizeRequest) -> Response:
+    """Expose the OptiLang lexer output."""
+    try:
+        return await _cached_body("tokens", request.code, _tokenize_body)
     except Exception as exc:
         logger.error("Unexpected tokenize error: %s", exc, exc_info=True)
         raise HTTPException(
@@ -47,25 +87,10 @@ async def tokenize_code(request: TokenizeRequest) -> TokenizeResponse:
 
 
 @router.post("/parse", response_model=ParseResponse, status_code=status.HTTP_200_OK)
-async def parse_code(request: ParseRequest) -> ParseResponse:
+async def parse_code(request: ParseRequest) -> Response:
     """Expose tokenization plus AST generation for OptiLang source."""
     try:
-        tokens = tokenize(request.code)
-        ast = parse(tokens)
-        return ParseResponse(
-            success=True,
-            ast=to_json_safe(ast),
-            errors=[],
-            timestamp=datetime.now(timezone.utc),
-        )
-    except OptiLangError as exc:
-        logger.info("Parse error: %s", exc)
-        return ParseResponse(
-            success=False,
-            ast=None,
-            errors=[str(exc)],
-            timestamp=datetime.now(timezone.utc),
-        )
+        return await _cached_body("ast", request.code, _parse_body)
     except Exception as exc:
         logger.error("Unexpected parse error: %s", exc, exc_info=True)
         raise HTTPException(
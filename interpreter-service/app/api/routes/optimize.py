@@ -2,23 +2,22 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 import logging
+from typing import Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
-import optilang
-from app.core.serialization import serialize_suggestions
-from app.schemas.requests import ExecuteRequest
+from app.core.responses import encoded
+from app.schemas.requests import ExecuteRequest, StaticOptimizeRequest
 from app.schemas.responses import OptimizeResponse
-from optilang.lexer import tokenize
-from optilang.parser import parse
-from optilang.utils.errors import OptiLangError
+from app.services.results import run_stages
+from app.services.static import RUNTIME_ONLY_PATTERNS, static_report
 
 router = APIRouter(tags=["optimization"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/optimize", response_model=OptimizeResponse, status_code=status.HTTP_200_OK)
-async def optimize_code(request: ExecuteRequest) -> OptimizeResponse:
+async def optimize_code(request: ExecuteRequest) -> Union[OptimizeResponse, Response]:
     """
     Run OptiLang code and return suggestions only.
     No output, no profiling, no score.
@@ -26,30 +25,56 @@ async def optimize_code(request: ExecuteRequest) -> OptimizeResponse:
     """
     logger.info("Optimize | user=%s code_len=%s", request.user_id, len(request.code))
     try:
-        result = optilang.execute(
+        stages = await run_stages(
             request.code,
-            timeout_seconds=request.timeout or 5,
-            enable_profiling=True,
+            request.timeout or 5,
+            True,
+            ("execution", "suggestions"),
         )
-
-        suggestions: list = []
-        try:
-            ast = parse(tokenize(request.code))
-            report = optilang.analyze(ast, result.profiling, result.symbol_table)
-            suggestions = serialize_suggestions(report)
-        except OptiLangError as exc:
-            logger.info("Optimize — analysis skipped: %s", exc)
-
-        return OptimizeResponse(
-            success=len(result.errors) == 0,
-            errors=result.errors,
-            suggestions=suggestions,
-            suggestion_count=len(suggestions),
-            timestamp=datetime.now(timezone.utc),
+        execution = stages["execution"]
+        return encoded(
+            OptimizeResponse(
+                success=execution["success"],
+                errors=execution["errors"],
+                suggestions=stages["suggestions"],
+                suggestion_count=len(stages["suggestions"]),
+                timestamp=datetime.now(timezone.utc),
+            )
         )
     except Exception as exc:
         logger.error("Optimize error: %s", exc, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Optimize error: {exc}",
-        ) from exc
\ No newline at end of file
+        ) from exc
+
+
+@router.post("/optimize/static", response_model=OptimizeResponse, status_code=status.HTTP_200_OK)
+async def optimize_static(request: StaticOptimizeRequest) -> Union[OptimizeResponse, Response]:
+    """
+    Suggestions from the AST alone, without running the code.
+    Costs a parse on a repeat of a known program (see app.services.static),
+    so it suits lint-on-type. Suggestions a run could re-rate or drop are
+    marked ``requires_runtime``; patterns that need profiling are listed in
+    ``skipped_patterns``.
+    """
+    logger.info("Optimize static | user=%s code_len=%s", request.user_id, len(request.code))
+    try:
+        report = await static_report(request.code)
+        return encoded(
+            OptimizeResponse(
+                success=report["success"],
+                errors=report["errors"],
+                suggestions=report["suggestions"],
+                suggestion_count=len(report["suggestions"]),
+                mode="static",
+                skipped_patterns=list(RUNTIME_ONLY_PATTERNS),
+                timestamp=datetime.now(timezone.utc),
+            )
+        )
+    except Exception as exc:
+        logger.error("Static optimize error: %s", exc, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Optimize error: {exc}",
+        ) from exc
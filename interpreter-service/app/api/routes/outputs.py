@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.output import read_spill
+
+router = APIRouter(tags=["execution"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/outputs/{output_id}", response_class=Response)
+async def fetch_output(
+    output_id: str,
+    offset: int = Query(0, ge=0),
+    length: Optional[int] = Query(None, ge=1),
+) -> Response:
+    """
+    A byte range of output that was too large to return inline. Responses
+    that truncated their ``output`` name it in ``output_id``; ``Content-Range``
+    gives the range served and the total size.
+    """
+    length = min(length or settings.output_fetch_max_bytes, settings.output_fetch_max_bytes)
+    spilled = await run_in_threadpool(read_spill, output_id, offset, length)
+    if spilled is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown or expired output",
+        )
+    data, total = spilled
+    end = offset + len(data) - 1 if data else offset
+    return Response(
+        content=data,
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "Content-Range": f"bytes {offset}-{end}/{total}",
+            "X-Output-Total-Bytes": str(total),
+        },
+    )
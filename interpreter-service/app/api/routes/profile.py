@@ -2,20 +2,22 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 import logging
+from typing import Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
-import optilang
-from app.core.serialization import serialize_profiling
+from app.core.responses import encoded
+from app.core.serialization import shape_profiling
 from app.schemas.requests import ExecuteRequest
 from app.schemas.responses import ProfileResponse
+from app.services.results import run_stages
 
 router = APIRouter(tags=["profiling"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/profile", response_model=ProfileResponse, status_code=status.HTTP_200_OK)
-async def profile_code(request: ExecuteRequest) -> ProfileResponse:
+async def profile_code(request: ExecuteRequest) -> Union[ProfileResponse, Response]:
     """
     Run OptiLang code and return profiling data only.
     No output, no suggestions, no score.
@@ -23,17 +25,22 @@ async def profile_code(request: ExecuteRequest) -> ProfileResponse:
     """
     logger.info("Profile | user=%s code_len=%s", request.user_id, len(request.code))
     try:
-        result = optilang.execute(
+        stages = await run_stages(
             request.code,
-            timeout_seconds=request.timeout or 5,
-            enable_profiling=True,  # always on — pointless otherwise
+            request.timeout or 5,
+            True,  # always on — pointless otherwise
+            ("execution",),
+            profiling_tier=request.profiling_tier if request.profiling_tier != "off" else None,
         )
-        return ProfileResponse(
-            success=len(result.errors) == 0,
-            errors=result.errors,
-            execution_time=result.execution_time,
-            profiling=serialize_profiling(result.profiling),
-            timestamp=datetime.now(timezone.utc),
+        execution = stages["execution"]
+        return encoded(
+            ProfileResponse(
+                success=execution["success"],
+                errors=execution["errors"],
+                execution_time=execution["execution_time"],
+                profiling=shape_profiling(execution["profiling"], request.profiling_format),
+                timestamp=datetime.now(timezone.utc),
+            )
         )
     except Exception as exc:
         logger.error("Profile error: %s", exc, exc_info=True)
@@ -1,24 +1,25 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+import json
 import logging
+from typing import Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 
-import optilang
-from app.core.serialization import serialize_score_report, serialize_suggestions
-from app.schemas.requests import ExecuteRequest
-from app.schemas.responses import ScoreResponse
-from optilang.lexer import tokenize
-from optilang.parser import parse
-from optilang.utils.errors import OptiLangError
+from app.core.responses import encoded
+from app.schemas.requests import ExecuteRequest, RescoreRequest
+from app.schemas.responses import RescoreItemResult, ScoreResponse
+from app.services.rescore import rescore_batch
+from app.services.results import run_stages
 
 router = APIRouter(tags=["scoring"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("/score", response_model=ScoreResponse, status_code=status.HTTP_200_OK)
-async def score_code(request: ExecuteRequest) -> ScoreResponse:
+async def score_code(request: ExecuteRequest) -> Union[ScoreResponse, Response]:
     """
     Run OptiLang code and return score report only.
     No output, no profiling, no suggestions.
@@ -26,35 +27,61 @@ async def score_code(request: ExecuteRequest) -> ScoreResponse:
     """
     logger.info("Score | user=%s code_len=%s", request.user_id, len(request.code))
     try:
-        result = optilang.execute(
+        stages = await run_stages(
             request.code,
-            timeout_seconds=request.timeout or 5,
-            enable_profiling=True,
+            request.timeout or 5,
+            True,
+            ("execution", "score_report"),
         )
-
-        optimization_report = None
-        try:
-            ast = parse(tokenize(request.code))
-            optimization_report = optilang.analyze(ast, result.profiling, result.symbol_table)
-        except OptiLangError as exc:
-            logger.info("Score — analysis skipped: %s", exc)
-
-        score_report = optilang.calculate_score(
-            profiling_data=result.profiling.to_dict() if result.profiling else None,
-            optimizer_report=optimization_report,
-            source_lines=max(1, len(request.code.splitlines())),
-            errors=result.errors,
-        )
-
-        return ScoreResponse(
-            success=len(result.errors) == 0,
-            errors=result.errors,
-            score_report=serialize_score_report(score_report),
-            timestamp=datetime.now(timezone.utc),
+        execution = stages["execution"]
+        return encoded(
+            ScoreResponse(
+                success=execution["success"],
+                errors=execution["errors"],
+                score_report=stages["score_report"],
+                timestamp=datetime.now(timezone.utc),
+            )
         )
     except Exception as exc:
         logger.error("Score error: %s", exc, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Score error: {exc}",
-        ) from exc
\ No newline at end of file
+        ) from exc
+
+
+@router.post(
+    "/rescore",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def rescore(request: RescoreRequest) -> StreamingResponse:
+    """
+    Score stored results again without running them and stream
+    newline-delimited JSON.
+
+    Each item carries what a run produced: its profiling, suggestions,
+    errors and source line count. One ``item`` line (``RescoreItemResult``)
+    is written per item as its chunk finishes, then a single ``summary``
+    line (``RescoreSummary``). Useful after the scoring weights change.
+    """
+    logger.info("Rescore | user=%s items=%s", request.user_id, len(request.items))
+    results = rescore_batch(request)
+
+    async def lines():
+        try:
+            async for result in results:
+                if result["type"] == "item":
+                    line = RescoreItemResult.model_validate(result).model_dump_json(exclude_none=True)
+                else:
+                    line = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+                yield line.encode("utf-8") + b"\n"
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
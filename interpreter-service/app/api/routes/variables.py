@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import logging
+from typing import Union
+
+from fastapi import APIRouter, HTTPException, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.responses import encoded
+from app.core.symbols import read_variable
+from app.schemas.requests import VariableRequest
+from app.schemas.responses import VariableResponse
+
+router = APIRouter(tags=["execution"])
+logger = logging.getLogger(__name__)
+
+
+@router.post(
+    "/variables/{name}",
+    response_model=VariableResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def fetch_variable(name: str, request: VariableRequest) -> Union[VariableResponse, Response]:
+    """
+    Full value of one variable whose ``symbol_table`` entry was only a
+    preview, read from the symbol table the run stored under
+    ``symbol_table_id``. Nothing is executed again.
+    """
+    logger.info(
+        "Variable | user=%s name=%s symbol_table=%s",
+        request.user_id,
+        name,
+        request.symbol_table_id,
+    )
+    variable = await run_in_threadpool(read_variable, request.symbol_table_id, name)
+    if variable is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Variable {name!r} is not in the stored symbol table (unknown, expired or too large)",
+        )
+    return encoded(VariableResponse(**variable, timestamp=datetime.now(timezone.utc)))
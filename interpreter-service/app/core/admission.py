@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+PRIORITIES = ("low", "normal", "high")
+HISTORY_WEIGHT = 0.2  # weight of the newest observation in the running averages
+MIN_SCALE, MAX_SCALE = 0.25, 4.0
+
+
+@dataclass(frozen=True)
+class EndpointClass:
+    priority: str
+    executes: bool  # runs the program, so its cost is bounded by its timeout
+    default_seconds: float  # estimate before the endpoint has any history
+
+
+# Editor traffic is cheap but only useful while fresh, so it is shed first;
+# graded /analyze submissions are shed last.
+ENDPOINT_CLASSES: Dict[str, EndpointClass] = {
+    "/tokenize": EndpointClass("low", False, 0.005),
+    "/parse": EndpointClass("low", False, 0.01),
+    "/optimize/static": EndpointClass("low", False, 0.01),
+    "/documents": EndpointClass("low", False, 0.01),
+    "/documents/{document_id}/edits": EndpointClass("low", False, 0.005),
+    "/execute": EndpointClass("normal", True, 0.25),
+    "/execute/stream": EndpointClass("normal", True, 0.25),
+    "/profile": EndpointClass("normal", True, 0.25),
+    "/optimize": EndpointClass("normal", True, 0.25),
+    "/score": EndpointClass("normal", True, 0.25),
+    "/batch/analyze": EndpointClass("normal", True, 0.25),
+    "/rescore": EndpointClass("normal", False, 0.05),
+    "/jobs": EndpointClass("normal", True, 0.25),  # held until the job ends
+    "/analyze": EndpointClass("high", True, 0.25),
+}
+
+
+@dataclass
+class Ticket:
+    """An admitted request; hand it back to ``release`` once it is served."""
+
+    endpoint: str
+    priority: str
+    cost: float
+    units: int
+    code_length: int
+    started: float
+
+
+class AdmissionController:
+    """
+    Cost-based admission control in front of the execution pool.
+
+    Each request is given an estimated cost in worker-seconds from its
+    endpoint's recent history (an exponential average of how long it took),
+    scaled by its code length against the endpoint's typical length and
+    capped by its timeout when it runs code. The cost of admitted requests
+    still in progress, divided by the worker count, is the wait a new
+    request can expect. A request whose priority does not tolerate that
+    wait is shed, with the time the backlog needs to drain to its
+    tolerance as the retry hint. A request arriving at an idle service is
+    always admitted, however large.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_wait: Dict[str, float],
+        clock: Callable[[], float] = perf_counter,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_wait = max_wait
+        self.clock = clock
+        self.outstanding = 0.0
+        self.in_flight = 0
+        self.admitted = {priority: 0 for priority in PRIORITIES}
+        self.shed = {priority: 0 for priority in PRIORITIES}
+        self._seconds: Dict[str, float] = {}
+        self._lengths: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, endpoint: str, code_length: int, timeout: float, units: int = 1) -> float:
+        """Estimated worker-seconds for ``units`` programs of ``code_length`` characters in total."""
+        endpoint_class = ENDPOINT_CLASSES[endpoint]
+        seconds = self._seconds.get(endpoint, endpoint_class.default_seconds)
+        typical = self._lengths.get(endpoint)
+        per_unit_length = code_length / units
+        scale = min(MAX_SCALE, max(MIN_SCALE, per_unit_length / typical)) if typical else 1.0
+        per_unit = seconds * scale
+        if endpoint_class.executes:
+            per_unit = min(per_unit, timeout)
+        return per_unit * units
+
+    def expected_wait(self) -> float:
+        return self.outstanding / self.workers
+
+    def admit(
+        self, endpoint: str, code_length: int, timeout: float, units: int = 1
+    ) -> Tuple[Optional[Ticket], float]:
+        """
+        Return a ticket for the request, or ``None`` and the seconds after
+        which it is worth retrying. Endpoints outside ``ENDPOINT_CLASSES``
+        are not metered and always get a ticket.
+        """
+        endpoint_class = ENDPOINT_CLASSES.get(endpoint)
+        with self._lock:
+            if endpoint_class is None:
+                return Ticket(endpoint, "normal", 0.0, units, code_length, self.clock()), 0.0
+
+            priority = endpoint_class.priority
+            wait = self.expected_wait()
+            tolerance = self.max_wait.get(priority, math.inf)
+            if self.in_flight and wait > tolerance:
+                self.shed[priority] += 1
+                return None, wait - tolerance
+
+            cost = self.estimate(endpoint, code_length, timeout, units)
+            self.outstanding += cost
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            return Ticket(endpoint, priority, cost, units, code_length, self.clock()), 0.0
+
+    def release(self, ticket: Ticket) -> None:
+        """Return a ticket and learn from how long the request actually took."""
+        if ticket.endpoint not in ENDPOINT_CLASSES:
+            return
+        elapsed = self.clock() - ticket.started
+        with self._lock:
+            self.outstanding = max(0.0, self.outstanding - ticket.cost)
+            self.in_flight -= 1
+            self._observe(self._seconds, ticket.endpoint, elapsed / ticket.units)
+            self._observe(self._lengths, ticket.endpoint, max(1, ticket.code_length / ticket.units))
+
+    @staticmethod
+    def _observe(averages: Dict[str, float], endpoint: str, value: float) -> None:
+        previous = averages.get(endpoint)
+        averages[endpoint] = (
+            value if previous is None else previous + HISTORY_WEIGHT * (value - previous)
+        )
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "outstanding_seconds": round(self.outstanding, 6),
+                "expected_wait_seconds": round(self.expected_wait(), 6),
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+            }
+
+
+# Global admission controller, sized to the execution pool
+admission_controller = AdmissionController(
+    workers=settings.execution_workers,
+    max_wait=settings.admission_max_wait_seconds,
+)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+import optilang
+
+from app.core.config import settings
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe LRU cache bounded by entry count, total size and age.
+
+    Callers pass the size of each value on ``set`` (usually its encoded
+    length), so the byte budget is an estimate of what the cache retains
+    rather than an exact memory measurement. Expired entries are dropped
+    lazily when they are read or pushed out by newer ones.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[V, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        accept: Optional[Callable[[V], bool]] = None,
+    ) -> Optional[V]:
+        """
+        Return a live entry, or None. An entry rejected by ``accept`` (e.g.
+        one missing the fields the caller needs) is kept but counts as a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= monotonic():
+                self._remove(key, size)
+                self.misses += 1
+                return None
+            if accept is not None and not accept(value):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Return a live entry without touching recency or hit counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= monotonic():
+                return None
+            return entry[0]
+
+    def set(self, key: Hashable, value: V, size: int) -> None:
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size, monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, (_, old_size, _) = next(iter(self._entries.items()))
+                self._remove(old_key, old_size)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._remove(key, entry[1])
+            return True
+
+    def _remove(self, key: Hashable, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def result_cache_key(
+    code: str,
+    timeout: float,
+    enable_profiling: bool,
+    inputs: Optional[Dict[str, Any]] = None,
+    profiling_tier: Optional[str] = None,
+) -> str:
+    """Content address of a submission: same key, same interpreter result."""
+    material = json.dumps(
+        [
+            code,
+            float(timeout),
+            bool(enable_profiling),
+            optilang.__version__,
+            inputs or {},
+            profiling_tier,
+        ],
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def source_cache_key(kind: str, code: str) -> str:
+    """Content address of a source-only artifact such as its tokens or AST."""
+    material = json.dumps([kind, code, optilang.__version__], separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# Global result cache instance: key -> {"stages": {...}, "sizes": {...}}
+result_cache: LRUCache[Dict[str, Any]] = LRUCache(
+    max_entries=settings.result_cache_max_entries if settings.result_cache_enabled else 0,
+    max_bytes=settings.result_cache_max_mb * 1024 * 1024,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+)
+
+# Global syntax cache instance: source_cache_key -> encoded response body
+syntax_cache: LRUCache[bytes] = LRUCache(
+    max_entries=settings.syntax_cache_max_entries if settings.syntax_cache_enabled else 0,
+    max_bytes=settings.syntax_cache_max_mb * 1024 * 1024,
+    ttl_seconds=settings.syntax_cache_ttl_seconds,
+)
+
+# Global artifact index: (artifact kind, AST fingerprint digest) -> canonical artifact
+artifact_index: LRUCache[Dict[str, Any]] = LRUCache(
+    max_entries=settings.artifact_index_max_entries if settings.artifact_index_enabled else 0,
+    max_bytes=settings.artifact_index_max_mb * 1024 * 1024,
+    ttl_seconds=settings.artifact_index_ttl_seconds,
+)
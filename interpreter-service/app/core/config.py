@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 
@@ -21,12 +23,116 @@ class Settings(BaseSettings):
     max_execution_time: int = 5  # seconds
     max_code_length: int = 10000  # characters
     max_memory_mb: int = 128  # megabytes
+
+    # Execution Pool
+    execution_backend: str = "thread"  # "thread" | "process" | "sandbox"
+    execution_workers: int = 4
+
+    # Sandbox Workers (execution_backend = "sandbox")
+    sandbox_grace_seconds: float = 1.0
+    sandbox_max_jobs_per_worker: int = 200
+    sandbox_max_rss_growth_mb: int = 64
+
+    # Result Cache
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 1024
+    result_cache_max_mb: int = 64
+    result_cache_ttl_seconds: int = 600
+    singleflight_enabled: bool = True  # identical submissions in flight share one run
+
+    # Syntax Cache (/tokenize and /parse responses)
+    syntax_cache_enabled: bool = True
+    syntax_cache_max_entries: int = 512
+    syntax_cache_max_mb: int = 32
+    syntax_cache_ttl_seconds: int = 600
+
+    # Artifact Index (static analysis reused across programs with one AST fingerprint)
+    artifact_index_enabled: bool = True
+    artifact_index_max_entries: int = 2048
+    artifact_index_max_mb: int = 32
+    artifact_index_ttl_seconds: int = 3600
+
+    # Incremental Document Sessions
+    document_sessions_max: int = 256
+    document_sessions_max_mb: int = 16
+    document_session_ttl_seconds: int = 1800
     
+    # Output Capture (print output of /execute, /analyze and friends)
+    output_max_memory_bytes: int = 1_000_000  # returned whole up to this size
+    output_head_bytes: int = 64_000  # kept from the start of larger output
+    output_tail_bytes: int = 64_000  # kept from the end of larger output
+    output_spill_enabled: bool = True  # write larger output to a file for GET /outputs/{id}
+    output_spill_dir: str = ""  # "" = <system temp dir>/optilang-output
+    output_spill_max_bytes: int = 256 * 1024 * 1024
+    output_spill_ttl_seconds: int = 1800
+    output_fetch_max_bytes: int = 1_000_000  # per GET /outputs/{id} range
+
+    # Streaming Execution (/execute/stream)
+    stream_max_output_bytes: int = 1_000_000
+    stream_chunk_bytes: int = 4096
+    stream_flush_interval_ms: int = 50
+    stream_progress_interval_ms: int = 250
+    stream_queue_frames: int = 64
+
+    # Jobs (POST /jobs, long-poll GET /jobs/{job_id}, DELETE to cancel)
+    jobs_max: int = 1000  # jobs kept at once, running and finished
+    jobs_ttl_seconds: int = 600  # finished jobs are dropped this long after they end
+    jobs_max_wait_seconds: float = 30.0  # longest long-poll
+    jobs_cancel_poll_ms: int = 50  # how often a running job checks for cancellation
+
+    # Symbol Table Previews (full values via POST /variables/{name})
+    symbol_preview_max_items: int = 20
+    symbol_preview_max_depth: int = 3
+    symbol_preview_max_string: int = 200
+    symbol_store_enabled: bool = True  # keep full values of runs with truncated previews
+    symbol_store_max_bytes: int = 64 * 1024 * 1024  # per run; larger variables are not kept
+    symbol_store_ttl_seconds: int = 1800  # stored under the output spill dir
+
+    # Batch Analysis (/batch/analyze)
+    batch_max_items: int = 100
+    batch_max_concurrency: int = 2  # per batch, so one batch cannot hold every worker
+
+    # Re-scoring (/rescore, stored profiling and suggestions; concurrency as for batches)
+    rescore_max_items: int = 5000
+    rescore_chunk_size: int = 200  # distinct items scored per pool job
+
+    # Admission Control (shed work the pool cannot start in time)
+    admission_enabled: bool = True
+    admission_max_wait_seconds: Dict[str, float] = {"low": 0.5, "normal": 5.0, "high": 15.0}
+
+    # Tracing (W3C traceparent from the backend)
+    tracing_exporter: str = "none"  # "none" | "file" | "memory"
+    tracing_file: str = "traces.jsonl"
+
+    # Profiling Tiers (profiling_tier on /execute, /analyze, /profile, /batch/analyze)
+    profiling_sampled_line_rate: float = 0.1  # share of lines timed by "sampled_lines"
+    profiling_memory_mode: str = "shallow"  # "full_memory": "shallow" | "deep"
+
+    # Service Profiling (admin only; samples the service's own stacks)
+    service_profiling_enabled: bool = False
+    service_profiling_max_seconds: float = 60.0
+    admin_api_secret: str = ""  # X-Admin-Secret; empty keeps the admin routes off
+
+    # Responses
+    direct_json_responses: bool = False  # encode response models straight to bytes
+
     # Internal service auth
     internal_api_secret: str = "change-this-interpreter-secret-in-production"
 
-    # Rate Limiting
+    # Rate Limiting (per user and endpoint)
     rate_limit_per_minute: int = 30
+    rate_limit_burst: int = 0  # 0 = same as the per-minute rate
+    rate_limit_endpoint_overrides: Dict[str, int] = {
+        "/tokenize": 240,
+        "/parse": 240,
+        "/optimize/static": 240,  # lint-on-type
+        "/documents/{document_id}/edits": 600,
+        "/outputs/{output_id}": 240,
+        "/variables/{name}": 240,
+        "/jobs/{job_id}": 600,  # long-polls and cancels
+    }
+    rate_limit_backend: str = "memory"  # "memory" | "redis" (shared across workers)
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
     
     # Logging
     log_level: str = "INFO"
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter, time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import JOB_DURATION, QUEUE_WAIT, TIMEOUTS
+from app.core.sampler import sampled_call, service_profiler
+from app.core.sandbox import SandboxPool, SandboxTimeout
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EXECUTION_BACKENDS = ("thread", "process", "sandbox")
+
+
+class StreamChannel:
+    """
+    Bounded queue of frames from a running job to the request streaming
+    them, plus a flag the request raises when its client goes away.
+
+    Producers block in ``put`` while the queue is full, which throttles a
+    job to the pace of its reader. Built with thread primitives for the
+    thread backend and with manager proxies (which survive pickling) for
+    the process and sandbox backends.
+    """
+
+    def __init__(self, frames: Any, cancelled: Any) -> None:
+        self._frames = frames
+        self._cancelled = cancelled
+
+    def put(self, frame: Dict[str, Any], timeout: float) -> bool:
+        try:
+            self._frames.put(frame, timeout=timeout)
+        except queue.Full:
+            return False
+        return True
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self._frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+
+def _warm_worker() -> None:
+    """Import the interpreter once per worker process instead of per job."""
+    import optilang  # noqa: F401
+
+
+class ExecutionPool:
+    """
+    Run blocking OptiLang work (lexing, parsing, execution, analysis) off the
+    event loop.
+
+    ``thread`` runs jobs in this process, ``process`` in a plain process pool,
+    and ``sandbox`` in pre-forked, resource-limited workers (see
+    ``SandboxPool``).
+
+    Callers wait on a semaphore sized to the worker count before handing work
+    to the underlying executor, so ``queued`` is the number of submissions
+    waiting for a worker and ``in_flight`` the number currently running.
+    """
+
+    def __init__(self, backend: str = "thread", workers: int = 4) -> None:
+        if backend not in EXECUTION_BACKENDS:
+            raise ValueError(
+                f"Unknown execution backend {backend!r}; "
+                f"expected one of {', '.join(EXECUTION_BACKENDS)}"
+            )
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self._executor: Optional[Executor] = None
+        self._manager: Optional[Any] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.backend == "sandbox":
+                sandbox = SandboxPool(
+                    workers=self.workers,
+                    memory_mb=settings.max_memory_mb,
+                    cpu_seconds=settings.max_execution_time,
+                    grace_seconds=settings.sandbox_grace_seconds,
+                    max_jobs_per_worker=settings.sandbox_max_jobs_per_worker,
+                    max_rss_growth_mb=settings.sandbox_max_rss_growth_mb,
+                )
+                sandbox.start()
+                self._executor = sandbox
+            elif self.backend == "process":
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_warm_worker,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="optilang-exec",
+                )
+            logger.info(
+                "Execution pool started: backend=%s workers=%s",
+                self.backend,
+                self.workers,
+            )
+        return self._executor
+
+    def _get_manager(self) -> Any:
+        if self._manager is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            self._manager = context.Manager()
+        return self._manager
+
+    def open_channel(self, maxsize: int) -> StreamChannel:
+        """Create a frame channel that jobs on this pool can write to."""
+        if self.backend == "thread":
+            return StreamChannel(queue.Queue(maxsize), threading.Event())
+        manager = self._get_manager()
+        return StreamChannel(manager.Queue(maxsize), manager.Event())
+
+    def open_flag(self) -> Any:
+        """Create an event that this process can set and jobs on this pool can poll."""
+        if self.backend == "thread":
+            return threading.Event()
+        return self._get_manager().Event()
+
+    def _get_slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # A semaphore belongs to the loop it first waits on; the test client
+        # spins up a fresh loop per request, so rebuild it when the loop changes.
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    def start(self) -> None:
+        """Create the executor eagerly so sandbox workers are forked before traffic."""
+        self._get_executor()
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        time_limit: Optional[float] = None,
+    ) -> T:
+        """
+        Run ``fn(*args)`` on a pool worker and await its result.
+
+        With the process and sandbox backends ``fn`` and its arguments must be
+        picklable, so pass module-level functions and plain data.
+        ``time_limit`` is the job's execution budget in seconds; only the
+        sandbox backend enforces it (the interpreter's own timeout applies
+        everywhere).
+        """
+        loop = asyncio.get_running_loop()
+        slots = self._get_slots(loop)
+
+        self.queued += 1
+        queued_at = perf_counter()
+        try:
+            await slots.acquire()
+        finally:
+            self.queued -= 1
+        started = perf_counter()
+        QUEUE_WAIT.observe(started - queued_at)
+        if tracer.enabled:
+            now = time()
+            tracer.record("execution_pool.wait", now - (started - queued_at), now)
+
+        # During a service profiling window, jobs on other processes sample
+        # themselves and hand their stacks back with the result
+        interval = service_profiler.interval if self.backend != "thread" else None
+        if interval is not None:
+            fn, args = sampled_call, (interval, fn, *args)
+
+        self.in_flight += 1
+        try:
+            executor = self._get_executor()
+            if isinstance(executor, SandboxPool):
+                future = asyncio.wrap_future(
+                    executor.submit_limited(time_limit, fn, *args), loop=loop
+                )
+                result = await future
+            else:
+                result = await loop.run_in_executor(executor, partial(fn, *args))
+        except BaseException as exc:
+            self.failed += 1
+            if isinstance(exc, SandboxTimeout):
+                TIMEOUTS.inc("sandbox")
+            raise
+        else:
+            self.completed += 1
+            if interval is not None:
+                result, stacks = result
+                service_profiler.add_worker_stacks(stacks)
+            return result
+        finally:
+            self.in_flight -= 1
+            slots.release()
+            JOB_DURATION.observe(perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "backend": self.backend,
+            "workers": self.workers,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+        if isinstance(self._executor, SandboxPool):
+            stats["sandbox"] = self._executor.stats()
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+# Global execution pool instance
+execution_pool = ExecutionPool(
+    backend=settings.execution_backend,
+    workers=settings.execution_workers,
+)
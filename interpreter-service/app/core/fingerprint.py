@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import optilang
+from optilang.core.ast_nodes import (
+    AssignmentNode,
+    ASTNode,
+    AugmentedAssignmentNode,
+    ForNode,
+    FunctionDefNode,
+    IdentifierNode,
+    ProgramNode,
+    TupleAssignmentNode,
+)
+
+from app.core.serialization import to_json_safe
+
+# Names Executor._install_builtins defines. They keep their spelling even
+# when a program rebinds them, since detectors single out calls to some.
+BUILTIN_NAMES = frozenset({"print", "range", "len", "str", "int", "float", "bool", "list", "dict"})
+
+# Canonical names use private-use characters, which no source identifier
+# or detector message contains, so they can be found again in report text.
+NAME_OPEN, NAME_CLOSE = "\ue000", "\ue001"
+CANONICAL_NAME = re.compile(f"{NAME_OPEN}(\\d+){NAME_CLOSE}")
+LINE_REFERENCE = re.compile(r"\b([Ll]ine) (\d+)\b")
+
+
+def canonical_name(index: int) -> str:
+    return f"{NAME_OPEN}{index}{NAME_CLOSE}"
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Content address of a program up to trivia and local names.
+
+    ``names[i]`` is the program's spelling of canonical name ``i`` and
+    ``lines[i]`` its line for canonical line ``i + 1``, so an artifact
+    computed on the canonical AST can be mapped back onto the program.
+    """
+
+    digest: str
+    names: Tuple[str, ...]
+    lines: Tuple[int, ...]
+
+
+def _children(node: ASTNode) -> List[ASTNode]:
+    children: List[ASTNode] = []
+    pending: List[Any] = [
+        getattr(node, f.name) for f in reversed(fields(node)) if f.name not in ("line", "column")
+    ]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, ASTNode):
+            children.append(value)
+        elif isinstance(value, (list, tuple)):
+            pending.extend(reversed(value))
+    return children
+
+
+def walk(program: ASTNode) -> Iterator[ASTNode]:
+    """Every node of ``program`` once, in source order (pre-order, fields in declaration order)."""
+    seen: Set[int] = set()
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        stack.extend(reversed(_children(node)))
+
+
+def bound_names(nodes: List[ASTNode]) -> Set[str]:
+    """Names the program itself binds: assignment and loop targets, functions and parameters."""
+    targets: List[Any] = []
+    for node in nodes:
+        if isinstance(node, (AssignmentNode, AugmentedAssignmentNode)):
+            targets.append(node.target)
+        elif isinstance(node, TupleAssignmentNode):
+            targets.extend(node.targets)
+        elif isinstance(node, ForNode):
+            targets.append(node.iterator)
+        elif isinstance(node, FunctionDefNode):
+            targets.append(node.name)
+            targets.extend(node.parameters)
+    return {
+        target.name
+        for target in targets
+        if isinstance(target, IdentifierNode) and target.name not in BUILTIN_NAMES
+    }
+
+
+def canonicalize(program: ProgramNode) -> Fingerprint:
+    """
+    Rewrite ``program`` in place into its canonical form and fingerprint it.
+
+    Bound names are renamed in order of first appearance; free names
+    (builtins, ``inputs``) and method names keep their spelling. Columns
+    are zeroed and each line number becomes the rank of that line among the
+    lines holding code, so blank lines, comments and indentation drop out
+    while statements that share a line still do. Two programs with the same
+    digest get the same analysis, up to the names and lines it mentions.
+    """
+    # The program node sits at line 1 whatever comes first, so it is left out
+    nodes = list(walk(program))[1:]
+    bound = bound_names(nodes)
+    lines = sorted({node.line for node in nodes})
+    rank = {line: index + 1 for index, line in enumerate(lines)}
+    names: Dict[str, str] = {}
+    program.line = program.column = 0
+    for node in nodes:
+        node.line = rank[node.line]
+        node.column = 0
+        if isinstance(node, IdentifierNode) and node.name in bound:
+            if node.name not in names:
+                names[node.name] = canonical_name(len(names))
+            node.name = names[node.name]
+    material = json.dumps(
+        [optilang.__version__, to_json_safe(program)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return Fingerprint(
+        digest=hashlib.sha256(material.encode("utf-8")).hexdigest(),
+        names=tuple(names),
+        lines=tuple(lines),
+    )
+
+
+def localize_line(line: int, fingerprint: Fingerprint) -> int:
+    """The program's line for canonical line ``line`` (out-of-range lines pass through)."""
+    if 1 <= line <= len(fingerprint.lines):
+        return fingerprint.lines[line - 1]
+    return line
+
+
+def localize(text: str, fingerprint: Fingerprint) -> str:
+    """Rewrite canonical names and ``line N`` references in ``text`` for the program."""
+    text = LINE_REFERENCE.sub(
+        lambda m: f"{m.group(1)} {localize_line(int(m.group(2)), fingerprint)}", text
+    )
+    if NAME_OPEN in text:
+        text = CANONICAL_NAME.sub(lambda m: fingerprint.names[int(m.group(1))], text)
+    return text
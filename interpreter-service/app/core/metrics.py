@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple, TypeVar
+
+# Seconds, from a cached /tokenize hit to a program that runs into its timeout
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+MEMORY_BUCKETS = tuple(float(2 ** power) for power in range(10, 31, 2))  # 1 KiB .. 1 GiB
+WAITER_BUCKETS = (0.0, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)  # callers sharing one run
+
+LabelValues = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("+Inf" if value > 0 else "-Inf")
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, value: float, *labels: str) -> None:
+        """Mirror a total that is already counted elsewhere (e.g. cache stats)."""
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Gauge(Counter):
+    """A value that is set rather than accumulated, e.g. read from stats at scrape time."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self.set_total(value, *labels)
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram. An observation is one bisect and two
+    additions under a lock; buckets are only accumulated when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: observation count per bucket (plus +Inf), sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            snapshot = sorted(
+                (labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()
+            )
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "optilang_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("route", "method", "status"),
+))
+STAGE_LATENCY = registry.register(Histogram(
+    "optilang_pipeline_stage_duration_seconds",
+    "Time spent in each analysis pipeline stage, excluding the stages it reuses.",
+    ("stage",),
+))
+QUEUE_WAIT = registry.register(Histogram(
+    "optilang_execution_queue_wait_seconds",
+    "Time a job waited for an execution pool worker.",
+))
+JOB_DURATION = registry.register(Histogram(
+    "optilang_execution_job_duration_seconds",
+    "Time a job held an execution pool worker.",
+))
+TIMEOUTS = registry.register(Counter(
+    "optilang_execution_timeouts_total",
+    "Programs stopped by the interpreter timeout or killed by the sandbox time limit.",
+    ("kind",),
+))
+PEAK_MEMORY = registry.register(Histogram(
+    "optilang_program_peak_memory_bytes",
+    "Peak memory of profiled programs (ProfilingData.peak_memory_bytes).",
+    buckets=MEMORY_BUCKETS,
+))
+POOL_WORKERS = registry.register(Gauge(
+    "optilang_execution_pool_workers", "Execution pool worker count.",
+))
+POOL_IN_FLIGHT = registry.register(Gauge(
+    "optilang_execution_pool_in_flight", "Jobs running on the execution pool.",
+))
+POOL_QUEUED = registry.register(Gauge(
+    "optilang_execution_pool_queued", "Jobs waiting for an execution pool worker.",
+))
+POOL_UTILISATION = registry.register(Gauge(
+    "optilang_execution_pool_utilisation", "Share of execution pool workers running a job.",
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    "optilang_cache_lookups_total", "Cache lookups by result.", ("cache", "result"),
+))
+CACHE_HIT_RATIO = registry.register(Gauge(
+    "optilang_cache_hit_ratio", "Share of cache lookups that were hits.", ("cache",),
+))
+CACHE_BYTES = registry.register(Gauge(
+    "optilang_cache_bytes", "Estimated size of cached entries.", ("cache",),
+))
+ADMISSION_SHED = registry.register(Counter(
+    "optilang_admission_shed_total", "Requests shed by admission control.", ("priority",),
+))
+SINGLEFLIGHT_REQUESTS = registry.register(Counter(
+    "optilang_singleflight_requests_total",
+    "Pipeline runs requested, by whether they started a run (leader) or joined one (follower).",
+    ("role",),
+))
+SINGLEFLIGHT_WAITERS = registry.register(Histogram(
+    "optilang_singleflight_waiters",
+    "Followers that joined each coalesced pipeline run.",
+    buckets=WAITER_BUCKETS,
+))
+SINGLEFLIGHT_RATIO = registry.register(Gauge(
+    "optilang_singleflight_coalesce_ratio",
+    "Share of pipeline runs served by joining an identical run already in flight.",
+))
+ADMISSION_EXPECTED_WAIT = registry.register(Gauge(
+    "optilang_admission_expected_wait_seconds",
+    "Wait for a worker that admission control expects a new request to see.",
+))
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import tempfile
+import uuid
+from collections import deque
+from time import time
+from typing import Any, BinaryIO, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_ID = re.compile(r"^[0-9a-f]{32}$")
+SPILL_SUFFIX = ".out"
+TRUNCATION_MARKER = "\n… [{omitted} bytes omitted; {total} bytes total] …\n"
+
+
+def spill_dir() -> str:
+    return settings.output_spill_dir or os.path.join(tempfile.gettempdir(), "optilang-output")
+
+
+def spill_path(output_id: str) -> Optional[str]:
+    """Path of a spilled output, or None for an id that is not one of ours."""
+    if not OUTPUT_ID.match(output_id):
+        return None
+    return os.path.join(spill_dir(), output_id + SPILL_SUFFIX)
+
+
+def sweep_spills(
+    ttl_seconds: float,
+    now: Optional[float] = None,
+    suffix: str = SPILL_SUFFIX,
+) -> int:
+    """Delete spilled files older than ``ttl_seconds``; returns how many went."""
+    directory = spill_dir()
+    cutoff = (now if now is not None else time()) - ttl_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.name.endswith(suffix):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            pass  # already swept by another worker
+    return removed
+
+
+def read_spill(output_id: str, offset: int, length: int) -> Optional[Tuple[bytes, int]]:
+    """``length`` bytes of a spilled output from ``offset``, with its total size."""
+    path = spill_path(output_id)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as spilled:
+            total = os.fstat(spilled.fileno()).st_size
+            spilled.seek(offset)
+            return spilled.read(length), total
+    except OSError:
+        return None
+
+
+class OutputCapture:
+    """
+    Program output with bounded memory.
+
+    Output is kept whole until it passes ``max_memory_bytes``. From then on
+    only the first ``head_bytes`` and a rolling last ``tail_bytes`` stay in
+    memory, and (with ``spill``) everything is written to a temp file that
+    ``read_spill`` serves in ranges, up to ``max_spill_bytes``. ``render``
+    gives the whole output or head + truncation marker + tail.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        head_bytes: int,
+        tail_bytes: int,
+        spill: bool = True,
+        max_spill_bytes: int = 0,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill = spill
+        self.max_spill_bytes = max_spill_bytes
+        self.total_bytes = 0
+        self.spilled_bytes = 0
+        self.output_id: Optional[str] = None
+        self._chunks: list = []  # whole output while it fits in memory
+        self._head = b""
+        self._tail: Deque[bytes] = deque()
+        self._tail_size = 0
+        self._file: Optional[BinaryIO] = None
+        self._overflowed = False
+
+    @classmethod
+    def from_settings(cls) -> "OutputCapture":
+        return cls(
+            max_memory_bytes=settings.output_max_memory_bytes,
+            head_bytes=settings.output_head_bytes,
+            tail_bytes=settings.output_tail_bytes,
+            spill=settings.output_spill_enabled,
+            max_spill_bytes=settings.output_spill_max_bytes,
+        )
+
+    @property
+    def truncated(self) -> bool:
+        return self._overflowed
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.total_bytes += len(data)
+        if not self._overflowed:
+            self._chunks.append(data)
+            if self.total_bytes <= self.max_memory_bytes:
+                return
+            self._overflow()
+            return
+        self._keep_tail(data)
+        self._spill(data)
+
+    def _overflow(self) -> None:
+        whole = b"".join(self._chunks)
+        self._chunks = []
+        self._overflowed = True
+        self._head = whole[: self.head_bytes]
+        self._keep_tail(whole[self.head_bytes:])
+        if self.spill:
+            self._open_spill()
+        self._spill(whole)
+
+    def _keep_tail(self, data: bytes) -> None:
+        if self.tail_bytes <= 0:
+            return
+        self._tail.append(data[-self.tail_bytes:])
+        self._tail_size += len(self._tail[-1])
+        while self._tail and self._tail_size - len(self._tail[0]) >= self.tail_bytes:
+            self._tail_size -= len(self._tail.popleft())
+
+    def _open_spill(self) -> None:
+        directory = spill_dir()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            sweep_spills(settings.output_spill_ttl_seconds)
+            output_id = uuid.uuid4().hex
+            self._file = open(os.path.join(directory, output_id + SPILL_SUFFIX), "wb")  # noqa: SIM115
+            self.output_id = output_id
+        except OSError as exc:
+            logger.warning("Output spill unavailable: %s", exc)
+            self._file = None
+
+    def _spill(self, data: bytes) -> None:
+        if self._file is None:
+            return
+        room = self.max_spill_bytes - self.spilled_bytes if self.max_spill_bytes > 0 else len(data)
+        if room <= 0:
+            self.close()
+            return
+        chunk = data[:room]
+        try:
+            self._file.write(chunk)
+        except OSError as exc:
+            logger.warning("Output spill failed: %s", exc)
+            self.close()
+            return
+        self.spilled_bytes += len(chunk)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def render(self) -> str:
+        """The output as a route returns it, without the trailing newline."""
+        if not self._overflowed:
+            return b"".join(self._chunks).decode("utf-8", "ignore").rstrip("\n")
+        tail = b"".join(self._tail)[-self.tail_bytes:] if self.tail_bytes > 0 else b""
+        omitted = self.total_bytes - len(self._head) - len(tail)
+        marker = TRUNCATION_MARKER.format(omitted=omitted, total=self.total_bytes)
+        return (
+            self._head.decode("utf-8", "ignore")
+            + marker
+            + tail.decode("utf-8", "ignore").rstrip("\n")
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Fields the routes add next to ``output``."""
+        return {
+            "output_bytes": self.total_bytes,
+            "output_truncated": self._overflowed,
+            "output_id": self.output_id if self.spilled_bytes else None,
+        }
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Literal, Optional
+
+from app.core.config import settings
+from optilang.runtime.profiler import Profiler, ProfilerConfig
+
+ProfilingTier = Literal["off", "functions", "sampled_lines", "full_lines", "full_memory"]
+
+# Cheapest first. Memory estimation walks the variables on every profiled
+# line and dominates the cost on programs holding large lists, so only the
+# top tier pays for it; see benchmarks/bench_profiling.py for the numbers.
+PROFILING_TIERS = ("off", "functions", "sampled_lines", "full_lines", "full_memory")
+
+
+def default_tier(enable_profiling: bool) -> str:
+    """Tier of a request that only sets ``enable_profiling`` (the engine defaults)."""
+    return "full_memory" if enable_profiling else "off"
+
+
+def profiler_config(tier: str) -> Optional[ProfilerConfig]:
+    """
+    Engine settings for ``tier``, or None for ``off``.
+
+    ``functions`` still counts line executions (the engine has no switch for
+    its line hooks) but times none of them. ``sampled_lines`` times a seeded
+    share of lines, so a resubmission samples the same ones.
+    """
+    options: Dict[str, Any]
+    if tier == "off":
+        return None
+    if tier == "functions":
+        options = {"line_sampling_rate": 0.0, "memory_mode": "off"}
+    elif tier == "sampled_lines":
+        options = {
+            "line_sampling_rate": settings.profiling_sampled_line_rate,
+            "memory_mode": "off",
+            "random_seed": 0,
+        }
+    elif tier == "full_lines":
+        options = {"line_sampling_rate": 1.0, "memory_mode": "off"}
+    elif tier == "full_memory":
+        options = {"line_sampling_rate": 1.0, "memory_mode": settings.profiling_memory_mode}
+    else:
+        raise ValueError(f"Unknown profiling tier {tier!r}")
+    return ProfilerConfig(**options)
+
+
+def make_profiler(tier: str) -> Optional[Profiler]:
+    config = profiler_config(tier)
+    return Profiler(config) if config is not None else None
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKENDS = ("memory", "redis")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``rate`` requests per ``period`` seconds, of which ``burst`` may arrive at once."""
+
+    rate: int
+    burst: int
+    period: float = 60.0
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        return self.interval * self.burst
+
+
+@dataclass(frozen=True)
+class RateDecision:
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the request would be allowed, 0 when it was
+    reset_after: float  # seconds until the key is back to a full burst
+
+
+def gcra(
+    tat: Optional[float], now: float, limit: RateLimit, cost: int = 1
+) -> Tuple[float, RateDecision]:
+    """
+    Generic cell rate algorithm: check ``cost`` requests against ``limit``.
+
+    The whole state of a key is its theoretical arrival time ``tat``, the
+    moment its bucket would be full again. Returns the ``tat`` to store and
+    the decision; a rejected request leaves ``tat`` unchanged.
+    """
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + limit.interval * cost
+    allow_at = new_tat - limit.tolerance
+    if allow_at > now:
+        return tat, RateDecision(False, 0, allow_at - now, tat - now)
+    remaining = int((now - allow_at) / limit.interval)
+    return new_tat, RateDecision(True, remaining, 0.0, new_tat - now)
+
+
+class MemoryStore:
+    """
+    GCRA state in this process. Used on its own when the service runs as a
+    single worker, and as the local stand-in for ``RedisStore`` in tests.
+
+    Keys whose bucket has refilled carry no information, so they are pruned
+    whenever the table doubles past ``max_keys``.
+    """
+
+    def __init__(self, max_keys: int = 10_000, clock: Callable[[], float] = monotonic) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        self._tats: Dict[str, float] = {}
+        self._prune_at = max_keys
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        with self._lock:
+            now = self.clock()
+            tat, decision = gcra(self._tats.get(key), now, limit, cost)
+            if decision.allowed:
+                self._tats[key] = tat
+                if len(self._tats) >= self._prune_at:
+                    self._prune(now)
+            return decision
+
+    def _prune(self, now: float) -> None:
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        self._prune_at = max(self.max_keys, 2 * len(self._tats))
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def close(self) -> None:
+        self._tats.clear()
+
+
+# Same arithmetic as ``gcra``, run atomically next to the data. The clock is
+# the Redis server's, so workers on different hosts agree on ``now``.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval * tonumber(ARGV[3])
+local allow_at = new_tat - tolerance
+if allow_at > now then
+  return {0, 0, tostring(allow_at - now), tostring(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, math.floor((now - allow_at) / interval), '0', tostring(new_tat - now)}
+"""
+
+
+class RedisStore:
+    """
+    GCRA state in Redis, shared by every worker and host pointing at ``url``.
+
+    Needs the optional ``redis`` package. Each key expires once its bucket
+    has refilled.
+    """
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "rate_limit_backend='redis' requires the 'redis' package"
+            ) from exc
+        self._client: Any = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        allowed, remaining, retry_after, reset_after = await self._script(
+            keys=[key], args=[limit.interval, limit.tolerance, cost]
+        )
+        return RateDecision(bool(allowed), int(remaining), float(retry_after), float(reset_after))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class RateLimiter:
+    """
+    Per-key rate limiting over a ``MemoryStore`` or a ``RedisStore``.
+
+    A store that fails (e.g. Redis is unreachable) lets the request through:
+    the limiter protects capacity, and refusing all traffic would not.
+    """
+
+    def __init__(self, store: Any, prefix: str = "optilang:ratelimit:") -> None:
+        self.store = store
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        try:
+            return await self.store.hit(self.prefix + key, limit, cost)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.warning("Rate limit store failed, allowing request: %s", exc)
+            return RateDecision(True, limit.burst, 0.0, 0.0)
+
+    async def close(self) -> None:
+        await self.store.close()
+
+
+def create_rate_limiter(backend: str, redis_url: str) -> RateLimiter:
+    if backend not in RATE_LIMIT_BACKENDS:
+        raise ValueError(
+            f"Unknown rate limit backend {backend!r}; "
+            f"expected one of {', '.join(RATE_LIMIT_BACKENDS)}"
+        )
+    store = RedisStore(redis_url) if backend == "redis" else MemoryStore()
+    return RateLimiter(store)
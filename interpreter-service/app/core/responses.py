@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import TypeVar, Union
+
+from fastapi import Response, status
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def encoded(model: M, status_code: int = status.HTTP_200_OK) -> Union[M, Response]:
+    """
+    Return a validated response model, pre-encoded when enabled.
+
+    By default the model is handed back to FastAPI, which validates it
+    against ``response_model`` a second time and runs it through
+    ``jsonable_encoder`` before encoding. With ``direct_json_responses``
+    the model, already validated when it was built, is encoded by
+    pydantic-core straight to bytes. The body and the OpenAPI schema are
+    the same either way.
+    """
+    if not settings.direct_json_responses:
+        return model
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+    )
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import Counter
+from time import perf_counter, sleep
+from types import FrameType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+MAX_STACK_DEPTH = 128
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _short_path(filename: str) -> str:
+    # Keep frames readable: repo files relative to the service, libraries
+    # from their site-packages / stdlib directory onwards
+    if filename.startswith(_ROOT):
+        return os.path.relpath(filename, _ROOT)
+    for marker in ("site-packages" + os.sep, "lib" + os.sep + "python"):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):].split(os.sep, 1)[-1]
+    return filename
+
+
+def collapse(frame: Optional[FrameType], prefix: Tuple[str, ...] = ()) -> str:
+    """
+    One line of the collapsed-stack format: frames from root to leaf joined
+    by ``;``, each ``qualname (file:first line)`` so samples anywhere in a
+    function merge into one flamegraph box.
+    """
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        names.append(f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(prefix + tuple(names))
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread in this process.
+
+    Each sample walks ``sys._current_frames()``, so it only sees a thread
+    between bytecodes; a thread blocked in C code shows up at the call
+    that entered it. The sampling thread leaves itself out.
+    """
+
+    def __init__(self, interval: float, label: str = "") -> None:
+        self.interval = interval
+        self.label = label
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if ident == own:
+                continue
+            thread = names.get(ident, str(ident))
+            prefix = (self.label, thread) if self.label else (thread,)
+            self.counts[collapse(frame, prefix)] += 1
+        self.samples += 1
+
+    def _loop(self) -> None:
+        next_at = perf_counter()
+        while not self._stop.is_set():
+            self.sample()
+            next_at += self.interval
+            delay = next_at - perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_at = perf_counter()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="optilang-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.counts
+
+    def run(self, seconds: float) -> Counter:
+        """Sample for ``seconds`` on the calling thread."""
+        deadline = perf_counter() + seconds
+        while perf_counter() < deadline:
+            self.sample()
+            sleep(self.interval)
+        return self.counts
+
+
+def sampled_call(
+    interval: float, fn: Callable[..., Any], *args: Any
+) -> Tuple[Any, Dict[str, int]]:
+    """
+    Run ``fn(*args)`` in a worker process while sampling it; returns the
+    result and the collapsed stacks. Used by the execution pool during a
+    profiling window, since the service's own sampler cannot see into
+    other processes.
+    """
+    sampler = StackSampler(interval, label="worker")
+    sampler.start()
+    try:
+        result = fn(*args)
+    finally:
+        counts = sampler.stop()
+    return result, dict(counts)
+
+
+class ServiceProfiler:
+    """
+    One sampling window at a time over the service process, plus the stacks
+    of jobs its process or sandbox workers run during that window.
+    """
+
+    def __init__(self) -> None:
+        self.interval: Optional[float] = None
+        self._worker_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.interval is not None
+
+    def add_worker_stacks(self, counts: Dict[str, int]) -> None:
+        with self._lock:
+            self._worker_counts.update(counts)
+
+    def profile(self, seconds: float, interval: float) -> Optional[Dict[str, Any]]:
+        """
+        Sample for ``seconds`` and return the merged collapsed stacks, or
+        ``None`` if another window is already open. Blocks; run it off the
+        event loop.
+        """
+        if not self._running.acquire(blocking=False):
+            return None
+        try:
+            with self._lock:
+                self._worker_counts = Counter()
+            self.interval = interval
+            started = perf_counter()
+            sampler = StackSampler(interval, label="service")
+            try:
+                counts = sampler.run(seconds)
+            finally:
+                self.interval = None
+            with self._lock:
+                worker_counts, self._worker_counts = self._worker_counts, Counter()
+            counts.update(worker_counts)
+            return {
+                "seconds": round(perf_counter() - started, 3),
+                "samples": sampler.samples,
+                "interval_ms": interval * 1000,
+                "stacks": counts,
+            }
+        finally:
+            self._running.release()
+
+
+def render_collapsed(stacks: Dict[str, int]) -> str:
+    """``stack count`` lines, heaviest first, as flamegraph.pl and speedscope read them."""
+    lines = sorted(stacks.items(), key=lambda item: (-item[1], item[0]))
+    return "".join(f"{stack} {count}\n" for stack, count in lines)
+
+
+# Global profiler for the admin endpoint
+service_profiler = ServiceProfiler()
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:  # POSIX only; limits are skipped where unavailable
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+WORKER_PRELOAD = ["optilang", "app.api.routes"]
+READY_TIMEOUT_SECONDS = 30.0
+
+
+class SandboxError(RuntimeError):
+    """Raised when a sandbox worker is killed or dies while running a job."""
+
+
+class SandboxTimeout(SandboxError):
+    """Raised when a sandbox worker is killed for overrunning its time limit."""
+
+
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        # ru_maxrss is the peak, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_memory_limit(memory_mb: int) -> None:
+    # RLIMIT_AS covers the whole address space, so the budget is added on top
+    # of what the warm interpreter already maps rather than replacing it.
+    if resource is None or memory_mb <= 0:
+        return
+    limit = _address_space_bytes() + memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _apply_cpu_limit(cpu_seconds: float) -> None:
+    # RLIMIT_CPU counts CPU time over the process lifetime, so each job gets a
+    # soft limit relative to what the worker has already used.
+    if resource is None or cpu_seconds <= 0:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn: Connection, memory_mb: int) -> None:
+    """Entry point of a sandbox worker process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _apply_memory_limit(memory_mb)
+    conn.send(("ready", None, _current_rss_bytes(), False))
+
+    while True:
+        exit_after = False
+        try:
+            message = conn.recv()
+            if message is None:
+                break
+            fn, args, kwargs, cpu_seconds = message
+            _apply_cpu_limit(cpu_seconds)
+            reply: Tuple[str, Any] = ("ok", fn(*args, **kwargs))
+        except (EOFError, OSError):
+            break
+        except MemoryError:
+            reply = ("error", SandboxError("Sandbox worker exceeded its memory limit"))
+            exit_after = True
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            reply = ("error", exc)
+
+        rss = _current_rss_bytes()
+        try:
+            conn.send((reply[0], reply[1], rss, exit_after))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            conn.send(("error", SandboxError(f"Unpicklable job result: {exc}"), rss, exit_after))
+        if exit_after:
+            break
+
+    conn.close()
+
+
+@dataclass
+class _Worker:
+    process: Any
+    conn: Connection
+    baseline_rss: int
+    jobs: int = 0
+
+
+@dataclass
+class _Job:
+    future: Future
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    time_limit: Optional[float]
+
+
+class SandboxPool(Executor):
+    """
+    Pool of pre-forked, warm worker processes that run jobs under resource
+    limits.
+
+    Workers are forked from a forkserver that has already imported
+    ``optilang``, so starting or recycling one does not pay interpreter
+    import cost. Jobs are handed over a pipe; each worker runs one job at a
+    time with an address-space limit of ``memory_mb`` on top of its warm
+    baseline and a per-job CPU limit. A worker is replaced after
+    ``max_jobs_per_worker`` jobs, when its RSS grows by more than
+    ``max_rss_growth_mb``, or when it is killed for exceeding a limit.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        memory_mb: int = 128,
+        cpu_seconds: float = 5.0,
+        grace_seconds: float = 1.0,
+        max_jobs_per_worker: int = 200,
+        max_rss_growth_mb: int = 64,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.grace_seconds = grace_seconds
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_growth_bytes = max_rss_growth_mb * 1024 * 1024
+        self.recycled = 0
+        self.killed = 0
+
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" in methods:
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload(WORKER_PRELOAD)
+        else:
+            self._context = multiprocessing.get_context("spawn")
+
+        self._jobs: "queue.SimpleQueue[Optional[_Job]]" = queue.SimpleQueue()
+        self._slots: List[Optional[_Worker]] = [None] * self.workers
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    # ── Lifecycle ──
+
+    def start(self) -> None:
+        """Fork every worker up front and start one dispatcher per worker."""
+        with self._lock:
+            if self._threads:
+                return
+            for slot in range(self.workers):
+                self._slots[slot] = self._spawn()
+                thread = threading.Thread(
+                    target=self._dispatch,
+                    args=(slot,),
+                    name=f"optilang-sandbox-{slot}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        logger.info(
+            "Sandbox pool started: workers=%s memory_mb=%s cpu_seconds=%s",
+            self.workers,
+            self.memory_mb,
+            self.cpu_seconds,
+        )
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe(duplex=True)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.memory_mb),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        try:
+            if not parent_conn.poll(READY_TIMEOUT_SECONDS):
+                raise EOFError
+            _, _, baseline_rss, _ = parent_conn.recv()
+        except (EOFError, OSError) as exc:
+            process.kill()
+            process.join(timeout=1)
+            parent_conn.close()
+            raise SandboxError("Sandbox worker failed to start") from exc
+        return _Worker(process=process, conn=parent_conn, baseline_rss=baseline_rss)
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        try:
+            if kill:
+                worker.process.kill()
+            else:
+                worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join(timeout=1)
+        worker.conn.close()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+        if cancel_futures:
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.future.cancel()
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    # ── Submission ──
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return self.submit_limited(None, fn, *args, **kwargs)
+
+    def submit_limited(
+        self,
+        time_limit: Optional[float],
+        fn: Callable[..., Any],
+        /,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Submit a job whose CPU and wall-clock budget is ``time_limit`` seconds
+        (plus grace) instead of the pool default.
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+        if not self._threads:
+            self.start()
+        future: Future = Future()
+        self._jobs.put(_Job(future, fn, args, kwargs, time_limit))
+        return future
+
+    # ── Dispatch ──
+
+    def _dispatch(self, slot: int) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self._run_job(slot, job)
+
+        worker = self._slots[slot]
+        if worker is not None:
+            self._retire(worker)
+            self._slots[slot] = None
+
+    def _run_job(self, slot: int, job: _Job) -> None:
+        worker = self._slots[slot]
+        if worker is None or not worker.process.is_alive():
+            try:
+                worker = self._slots[slot] = self._spawn()
+            except SandboxError as exc:
+                self._slots[slot] = None
+                job.future.set_exception(exc)
+                return
+
+        budget = job.time_limit if job.time_limit else self.cpu_seconds
+        message = (job.fn, job.args, job.kwargs, budget + self.grace_seconds)
+        try:
+            worker.conn.send(message)
+        except OSError:
+            # The worker died while idle; hand the job to a fresh one
+            self._replace(slot, worker, kill=True)
+            worker = self._slots[slot]
+            if worker is None:
+                job.future.set_exception(SandboxError("Sandbox worker failed to start"))
+                return
+            try:
+                worker.conn.send(message)
+            except OSError as exc:
+                # Give up on this job, but leave the slot with a worker to try next
+                self._replace(slot, worker, kill=True)
+                job.future.set_exception(
+                    SandboxError(f"Sandbox worker could not accept the job: {exc}")
+                )
+                return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # Pickling failed before anything reached the worker
+            job.future.set_exception(exc)
+            return
+
+        worker.jobs += 1
+        try:
+            if not worker.conn.poll(budget + 2 * self.grace_seconds):
+                self._replace(slot, worker, kill=True)
+                job.future.set_exception(
+                    SandboxTimeout(f"Sandbox worker exceeded its {budget:g}s time limit")
+                )
+                return
+            status, value, rss, exiting = worker.conn.recv()
+        except (EOFError, OSError):
+            exitcode = worker.process.exitcode
+            self._replace(slot, worker, kill=True)
+            job.future.set_exception(SandboxError(self._describe_exit(exitcode)))
+            return
+
+        if status == "ok":
+            job.future.set_result(value)
+        else:
+            job.future.set_exception(value)
+
+        if (
+            exiting
+            or worker.jobs >= self.max_jobs_per_worker
+            or rss - worker.baseline_rss > self.max_rss_growth_bytes
+        ):
+            self._replace(slot, worker)
+
+    def _replace(self, slot: int, worker: _Worker, kill: bool = False) -> None:
+        self._retire(worker, kill=kill)
+        if kill:
+            self.killed += 1
+        else:
+            self.recycled += 1
+        self._slots[slot] = None
+        if not self._shutdown:
+            try:
+                self._slots[slot] = self._spawn()
+            except SandboxError as exc:
+                logger.error("Sandbox worker respawn failed: %s", exc)
+
+    @staticmethod
+    def _describe_exit(exitcode: Optional[int]) -> str:
+        if exitcode == -signal.SIGXCPU:
+            return "Sandbox worker exceeded its CPU time limit"
+        if exitcode == -signal.SIGKILL:
+            return "Sandbox worker was killed"
+        return f"Sandbox worker exited unexpectedly (exit code {exitcode})"
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "alive": sum(
+                1 for worker in self._slots if worker is not None and worker.process.is_alive()
+            ),
+            "recycled": self.recycled,
+            "killed": self.killed,
+        }
@@ -2,31 +2,266 @@ from __future__ import annotations
 
 from dataclasses import fields, is_dataclass
 from enum import Enum
-from typing import Any, Dict, Iterable, List, Mapping
+from operator import attrgetter
+from heapq import nsmallest
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# How to_json_safe treats a value, decided once per concrete type
+_SCALAR, _DATACLASS, _ENUM, _MAPPING, _SEQUENCE, _SET, _REPR = range(7)
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+_plans: Dict[type, Tuple[int, Any]] = {t: (_SCALAR, None) for t in _SCALAR_TYPES}
+_EXIT = object()  # stack marker: a container's children have all been visited
+
+
+def _field_getter(names: Tuple[str, ...]) -> Callable[[Any], Tuple[Any, ...]]:
+    if not names:
+        return lambda _obj: ()
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return lambda obj: (getter(obj),)
+    return attrgetter(*names)
+
+
+def _plan_for(cls: type) -> Tuple[int, Any]:
+    """Classify ``cls`` the way the original isinstance chain did."""
+    plan = _plans.get(cls)
+    if plan is not None:
+        return plan
+    if is_dataclass(cls):
+        names = tuple(field.name for field in fields(cls))
+        plan = (_DATACLASS, (cls.__name__, names, _field_getter(names)))
+    elif issubclass(cls, Enum):
+        plan = (_ENUM, None)
+    elif issubclass(cls, Mapping):
+        plan = (_MAPPING, None)
+    elif issubclass(cls, (list, tuple)):
+        plan = (_SEQUENCE, None)
+    elif issubclass(cls, set):
+        plan = (_SET, None)
+    elif issubclass(cls, _SCALAR_TYPES):
+        plan = (_SCALAR, None)
+    else:
+        plan = (_REPR, None)
+    _plans[cls] = plan
+    return plan
+
 
 def to_json_safe(value: Any) -> Any:
-    """Recursively convert OptiLang runtime objects into JSON-safe primitives."""
-    if is_dataclass(value):
-        payload = {"node_type": type(value).__name__}
-        for field in fields(value):
-            payload[field.name] = to_json_safe(getattr(value, field.name))
-        return payload
-    if isinstance(value, Enum):
-        return value.value
-    if isinstance(value, Mapping):
-        return {str(k): to_json_safe(v) for k, v in value.items()}
-    if isinstance(value, (list, tuple)):
-        return [to_json_safe(item) for item in value]
-    if isinstance(value, set):
-        return [to_json_safe(item) for item in sorted(value, key=repr)]
-    if value is None or isinstance(value, (str, int, float, bool)):
+    """
+    Convert OptiLang runtime objects into JSON-safe primitives.
+
+    Dataclasses (AST nodes, models) become dicts tagged with ``node_type``,
+    enums their value, mappings dicts with string keys, sequences and sets
+    lists (sets ordered by ``repr``); anything else is ``repr``-ed. Each
+    concrete type is classified once and dataclass fields are read through a
+    cached getter. The walk uses an explicit stack, so deeply nested ASTs do
+    not hit the recursion limit, and a container that contains itself is
+    rendered as ``"..."``.
+    """
+    kind, info = _plans.get(type(value)) or _plan_for(type(value))
+    if kind == _SCALAR:
         return value
-    return repr(value)
+    if kind == _ENUM:
+        return value.value
+    if kind == _REPR:
+        return repr(value)
+
+    root: List[Any] = [None]
+    stack: List[Any] = [(value, root, 0)]
+    active: set = set()
+    while stack:
+        item = stack.pop()
+        if item is _EXIT:
+            active.discard(stack.pop())
+            continue
+        obj, out, slot = item
+        kind, info = _plans.get(type(obj)) or _plan_for(type(obj))
+        if kind == _SCALAR:
+            out[slot] = obj
+            continue
+        if kind == _ENUM:
+            out[slot] = obj.value
+            continue
+        if kind == _REPR:
+            out[slot] = repr(obj)
+            continue
+        if id(obj) in active:
+            out[slot] = "..."
+            continue
+
+        if kind == _DATACLASS:
+            name, names, getter = info
+            payload: Any = {"node_type": name}
+            children: Iterable[Tuple[Any, Any]] = zip(names, getter(obj))
+        elif kind == _MAPPING:
+            payload = {}
+            # Keys colliding after str() keep the first position and last value
+            children = {str(key): child for key, child in obj.items()}.items()
+        else:
+            items = sorted(obj, key=repr) if kind == _SET else obj
+            payload = [None] * len(items)
+            children = enumerate(items)
+        out[slot] = payload
+
+        active.add(id(obj))
+        stack.append(id(obj))
+        stack.append(_EXIT)
+        for key, child in children:
+            child_kind, _ = _plans.get(type(child)) or _plan_for(type(child))
+            if child_kind == _SCALAR:
+                payload[key] = child
+            elif child_kind == _ENUM:
+                payload[key] = child.value
+            elif child_kind == _REPR:
+                payload[key] = repr(child)
+            else:
+                # Placeholder keeps key order until the child is converted
+                payload[key] = None
+                stack.append((child, payload, key))
+    return root[0]
+
+
+# Size estimates below this depth, or past this many visited values, assume
+# a small scalar per remaining element instead of walking further
+_ESTIMATE_MAX_DEPTH = 32
+_ESTIMATE_MAX_NODES = 2000
+_ESTIMATE_SCALAR_BYTES = 8
+
+
+def _children_of(obj: Any, kind: int, info: Any, limit: Optional[int]) -> Tuple[List[Tuple[Any, Any]], int]:
+    """The first ``limit`` (key, child) pairs of a container, in ``to_json_safe`` order, and its length."""
+    if kind == _DATACLASS:
+        _, names, getter = info
+        pairs = list(zip(names, getter(obj)))
+        return pairs[:limit] if limit is not None else pairs, len(pairs)
+    if kind == _MAPPING:
+        items = islice(obj.items(), limit) if limit is not None else obj.items()
+        return [(str(key), child) for key, child in items], len(obj)
+    if kind == _SET:
+        ordered = nsmallest(limit, obj, key=repr) if limit is not None else sorted(obj, key=repr)
+        return list(enumerate(ordered)), len(obj)
+    items = obj[:limit] if limit is not None else obj
+    return list(enumerate(items)), len(obj)
+
+
+def _scalar_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value) + 2
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    return len(repr(value))
+
+
+def _sample(obj: Any, kind: int, info: Any, count: int) -> Tuple[List[Tuple[Any, Any]], int]:
+    # Evenly spaced elements of a sequence, so a list that grows along its
+    # length is not judged by its head; order does not matter for the size.
+    if kind in (_DATACLASS, _MAPPING):
+        return _children_of(obj, kind, info, count)
+    length = len(obj)
+    if kind == _SET:
+        return list(enumerate(islice(obj, count))), length
+    if length <= count:
+        return list(enumerate(obj)), length
+    return [(index, obj[index * length // count]) for index in range(count)], length
+
+
+def _estimate_size(obj: Any, depth: int, budget: List[int]) -> int:
+    """Approximate compact encoded length of ``to_json_safe(obj)``, sampling large containers."""
+    kind, info = _plans.get(type(obj)) or _plan_for(type(obj))
+    if kind == _SCALAR:
+        return _scalar_size(obj)
+    if kind == _ENUM:
+        return _scalar_size(obj.value)
+    if kind == _REPR:
+        return len(repr(obj)) + 2
+    budget[0] -= 1
+    count = 16 if budget[0] > 0 and depth < _ESTIMATE_MAX_DEPTH else 0
+    pairs, length = _sample(obj, kind, info, count)
+    if not length:
+        return 2
+    sampled = 0
+    for key, child in pairs:
+        sampled += _estimate_size(child, depth + 1, budget)
+        if kind in (_DATACLASS, _MAPPING):
+            sampled += len(key) + 3
+    per_child = sampled / len(pairs) if pairs else _ESTIMATE_SCALAR_BYTES
+    return int(2 + (length - 1) + per_child * length)
+
+
+def _preview(obj: Any, depth: int, active: set) -> Tuple[Any, int, bool]:
+    """Preview of one value: (json-safe preview, estimated full size, truncated)."""
+    kind, info = _plans.get(type(obj)) or _plan_for(type(obj))
+    if kind in (_SCALAR, _ENUM, _REPR):
+        value = obj if kind == _SCALAR else obj.value if kind == _ENUM else repr(obj)
+        size = _scalar_size(value)
+        if isinstance(value, str) and len(value) > settings.symbol_preview_max_string:
+            return value[: settings.symbol_preview_max_string] + "…", size, True
+        return value, size, False
+    if id(obj) in active:
+        return "...", 5, False
+    if depth >= settings.symbol_preview_max_depth:
+        size = _estimate_size(obj, depth, [_ESTIMATE_MAX_NODES])
+        return f"<{type(obj).__name__} of {len(obj) if hasattr(obj, '__len__') else '?'}>", size, True
+
+    pairs, length = _children_of(obj, kind, info, settings.symbol_preview_max_items)
+    truncated = len(pairs) < length
+    payload: Any = {"node_type": info[0]} if kind == _DATACLASS else {} if kind == _MAPPING else []
+    keyed = kind in (_DATACLASS, _MAPPING)
+    active.add(id(obj))
+    sampled = 0
+    for key, child in pairs:
+        preview, size, child_truncated = _preview(child, depth + 1, active)
+        truncated = truncated or child_truncated
+        sampled += size + (len(key) + 3 if keyed else 0)
+        if keyed:
+            payload[key] = preview
+        else:
+            payload.append(preview)
+    active.discard(id(obj))
+    if len(pairs) < length:
+        return payload, _estimate_size(obj, depth, [_ESTIMATE_MAX_NODES]), True
+    return payload, 2 + max(0, length - 1) + sampled, truncated
+
+
+def preview_json_safe(value: Any) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Bounded ``to_json_safe``: containers keep their first
+    ``symbol_preview_max_items`` elements down to ``symbol_preview_max_depth``
+    levels (deeper ones become ``"<list of N>"``) and strings their first
+    ``symbol_preview_max_string`` characters. Returns the preview and
+    ``{type, length, size_bytes, truncated}``, where ``size_bytes`` estimates
+    the encoded full value by extrapolating from the elements seen.
+    """
+    preview, size, truncated = _preview(value, 0, set())
+    info: Dict[str, Any] = {
+        "type": type(value).__name__,
+        "size_bytes": size,
+        "truncated": truncated,
+    }
+    if isinstance(value, (str, list, tuple, set, dict, Mapping)):
+        info["length"] = len(value)
+    return preview, info
+
+
+def preview_symbol_table(symbol_table: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Previews of every variable and their ``preview_json_safe`` info, by name."""
+    previews: Dict[str, Any] = {}
+    infos: Dict[str, Any] = {}
+    for name, value in symbol_table.items():
+        previews[str(name)], infos[str(name)] = preview_json_safe(value)
+    return previews, infos
+
+
 def serialize_tokens(tokens: Iterable[Any]) -> list[Dict[str, Any]]:
     return [
         {
@@ -49,6 +284,68 @@ def serialize_profiling(profiling: Any) -> Dict[str, Any] | None:
     return raw
 
 
+# Field order of the per-metric arrays in the columnar profiling format
+LINE_COLUMNS = (
+    "line",
+    "count",
+    "total_time_ms",
+    "avg_time_ms",
+    "min_time_ms",
+    "max_time_ms",
+    "memory_vars",
+    "memory_bytes",
+)
+FUNCTION_COLUMNS = (
+    "name",
+    "calls",
+    "total_time_ms",
+    "avg_time_ms",
+    "min_time_ms",
+    "max_time_ms",
+    "max_recursion_depth",
+    "callers",
+)
+
+
+def _columns(stats: Iterable[Dict[str, Any]], names: Tuple[str, ...]) -> Dict[str, List[Any]]:
+    columns: Dict[str, List[Any]] = {name: [] for name in names}
+    for stat in stats:
+        for name in names:
+            columns[name].append(stat.get(name))
+    return columns
+
+
+def columnar_profiling(profiling: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Serialized profiling with ``line_stats`` and ``function_stats`` as one
+    array per metric instead of one object per line or function; entry
+    ``i`` of every array describes the same line (ordered by line number)
+    or function. Other fields are unchanged.
+    """
+    if profiling is None:
+        return None
+    lines = sorted(
+        profiling.get("line_stats", {}).items(),
+        key=lambda item: int(item[0]) if str(item[0]).isdigit() else 0,
+    )
+    line_stats = [{**stat, "line": stat.get("line") or int(key)} for key, stat in lines]
+    functions = [
+        {**stat, "name": stat.get("name") or key}
+        for key, stat in profiling.get("function_stats", {}).items()
+    ]
+    return {
+        **profiling,
+        "format": "columnar",
+        "line_stats": _columns(line_stats, LINE_COLUMNS),
+        "function_stats": _columns(functions, FUNCTION_COLUMNS),
+    }
+
+
+def shape_profiling(profiling: Optional[Dict[str, Any]], profiling_format: str) -> Optional[Dict[str, Any]]:
+    """``profiling`` in the format a request asked for (``objects`` or ``columnar``)."""
+    return columnar_profiling(profiling) if profiling_format == "columnar" else profiling
+
+
 def serialize_suggestions(report: Any) -> List[Dict[str, Any]]:
     suggestions = getattr(report, "suggestions", [])
     return [to_json_safe(s) for s in suggestions]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from app.core.metrics import SINGLEFLIGHT_REQUESTS, SINGLEFLIGHT_WAITERS
+
+T = TypeVar("T")
+
+TOP_KEYS = 10  # busiest flights listed in stats
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: "asyncio.Task[T]"
+    loop: asyncio.AbstractEventLoop
+    covers: Any
+    waiters: int = 0  # callers attached besides the one that started it
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls with the same key into one.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs attach to that task and get its result (or exception)
+    instead of starting their own. The task is shielded from its callers,
+    so one of them going away does not fail the others. ``covers`` is
+    stored with a flight, and a caller only attaches when ``accept`` says
+    the flight covers what it needs.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight[T]] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        covers: Any = None,
+        accept: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[T, bool]:
+        """Result of ``fn()`` for ``key``, and whether it came from another caller's flight."""
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        # A task belongs to its loop; the test client runs a loop per request
+        if (
+            flight is not None
+            and flight.loop is loop
+            and not flight.task.done()
+            and (accept is None or accept(flight.covers))
+        ):
+            flight.waiters += 1
+            self.followers += 1
+            SINGLEFLIGHT_REQUESTS.inc("follower")
+            return await asyncio.shield(flight.task), True
+
+        task = asyncio.ensure_future(fn())
+        flight = _Flight(task=task, loop=loop, covers=covers)
+        self._flights[key] = flight
+        self.leaders += 1
+        SINGLEFLIGHT_REQUESTS.inc("leader")
+
+        def land(_task: "asyncio.Task[T]") -> None:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            SINGLEFLIGHT_WAITERS.observe(flight.waiters)
+            if not _task.cancelled():
+                _task.exception()  # retrieved here, so an unawaited failure is not logged
+
+        task.add_done_callback(land)
+        return await asyncio.shield(task), False
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.followers
+        busiest = sorted(self._flights.items(), key=lambda item: -item[1].waiters)[:TOP_KEYS]
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "coalesce_ratio": round(self.followers / calls, 4) if calls else 0.0,
+            "waiters": {key[:12]: flight.waiters for key, flight in busiest},
+        }
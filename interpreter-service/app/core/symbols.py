@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.config import settings
+from app.core.output import OUTPUT_ID, spill_dir, sweep_spills
+from app.core.serialization import to_json_safe
+
+logger = logging.getLogger(__name__)
+
+SYMBOLS_SUFFIX = ".symbols"
+
+
+def symbol_table_path(symbol_table_id: str) -> Optional[str]:
+    """Path of a stored symbol table, or None for an id that is not one of ours."""
+    if not OUTPUT_ID.match(symbol_table_id):
+        return None
+    return os.path.join(spill_dir(), symbol_table_id + SYMBOLS_SUFFIX)
+
+
+def store_symbol_table(
+    symbol_table: Mapping[str, Any],
+    symbol_info: Mapping[str, Dict[str, Any]],
+) -> Optional[str]:
+    """
+    Write every variable of a run in full, for ``read_variable``, and
+    return the id to read them by.
+
+    Nothing is written when no preview was truncated, since the previews
+    are then the whole table. Each line holds one variable, its name
+    first, so a read decodes only the variable asked for. Variables that
+    would take the file past ``symbol_store_max_bytes`` are left out,
+    judged by the previews' size estimates before they are serialized.
+    """
+    if not settings.symbol_store_enabled:
+        return None
+    if not any(info["truncated"] for info in symbol_info.values()):
+        return None
+    directory = spill_dir()
+    symbol_table_id = uuid.uuid4().hex
+    limit = settings.symbol_store_max_bytes
+    written = 0
+    try:
+        os.makedirs(directory, exist_ok=True)
+        sweep_spills(settings.symbol_store_ttl_seconds, suffix=SYMBOLS_SUFFIX)
+        path = os.path.join(directory, symbol_table_id + SYMBOLS_SUFFIX)
+        with open(path, "w", encoding="utf-8") as stored:
+            for name, value in symbol_table.items():
+                info = symbol_info[str(name)]
+                if limit > 0 and written + info["size_bytes"] > limit:
+                    logger.info("Symbol table %s: %r too large to store", symbol_table_id, name)
+                    continue
+                full = json.dumps(to_json_safe(value), separators=(",", ":"), default=str)
+                record = json.dumps(
+                    {
+                        "type": info["type"],
+                        "length": info.get("length"),
+                        "size_bytes": len(full),
+                    },
+                    separators=(",", ":"),
+                )
+                line = f"{json.dumps(str(name))}\t{record}\t{full}\n"
+                if limit > 0 and written + len(line) > limit:  # the estimate was low
+                    logger.info("Symbol table %s: %r too large to store", symbol_table_id, name)
+                    continue
+                stored.write(line)
+                written += len(line)
+    except OSError as exc:
+        logger.warning("Symbol table store unavailable: %s", exc)
+        return None
+    return symbol_table_id
+
+
+def read_variable(symbol_table_id: str, name: str) -> Optional[Dict[str, Any]]:
+    """Variable ``name`` of a stored symbol table, or None if it is not there."""
+    path = symbol_table_path(symbol_table_id)
+    if path is None:
+        return None
+    key = json.dumps(name) + "\t"
+    try:
+        with open(path, "r", encoding="utf-8") as stored:
+            for line in stored:
+                if not line.startswith(key):
+                    continue
+                _, record, full = line.rstrip("\n").split("\t", 2)
+                return {"name": name, **json.loads(record), "value": json.loads(full)}
+    except (OSError, ValueError):
+        return None
+    return None
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass, field
+from time import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTERS = ("none", "file", "memory")
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    service: str
+    start_time: float
+    end_time: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        end = self.end_time if self.end_time is not None else self.start_time
+        payload["duration_ms"] = round((end - self.start_time) * 1000, 3)
+        return payload
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list; for tests."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Appends finished spans to ``path``, one JSON object per line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)  # noqa: SIM115
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("optilang_current_span", default=None)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """The caller's span from a W3C ``traceparent`` header, if it is well formed."""
+    if not header:
+        return None
+    match = TRACEPARENT.match(header.strip().lower())
+    if match is None or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return SpanContext(match.group(1), match.group(2))
+
+
+class Tracer:
+    """
+    Minimal span recorder with W3C trace-context propagation.
+
+    The active span is kept in a context variable, so spans opened while
+    handling a request nest under it across awaits and threadpool calls.
+    Without an exporter every call is a no-op and returns ``None``.
+    """
+
+    def __init__(self, service: str, exporter: Any = None) -> None:
+        self.service = service
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        start_time: Optional[float] = None,
+        **attributes: Any,
+    ) -> Optional[Span]:
+        """Start a span under ``parent``, or under the active span when omitted."""
+        if self.exporter is None:
+            return None
+        if parent is None:
+            active = _current_span.get()
+            parent = active.context if active is not None else None
+        return Span(
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            service=self.service,
+            start_time=start_time if start_time is not None else time(),
+            attributes=attributes,
+        )
+
+    def end(
+        self,
+        span: Optional[Span],
+        error: Optional[BaseException] = None,
+        end_time: Optional[float] = None,
+    ) -> None:
+        if span is None or self.exporter is None:
+            return
+        span.end_time = end_time if end_time is not None else time()
+        if error is not None:
+            span.status = "error"
+            span.attributes["error"] = f"{type(error).__name__}: {error}"
+        try:
+            self.exporter.export(span)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.warning("Span export failed: %s", exc)
+
+    def activate(self, span: Optional[Span]) -> Token:
+        return _current_span.set(span)
+
+    def deactivate(self, token: Token) -> None:
+        _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Record the enclosed block as a child of the active span."""
+        span = self.start(name, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end(span, error=exc)
+            raise
+        else:
+            self.end(span)
+        finally:
+            _current_span.reset(token)
+
+    def record(self, name: str, start_time: float, end_time: float, **attributes: Any) -> None:
+        """Record a span that already happened, e.g. a stage timed in a pool worker."""
+        self.end(self.start(name, start_time=start_time, **attributes), end_time=end_time)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def create_exporter(kind: str, path: str) -> Any:
+    if kind not in TRACE_EXPORTERS:
+        raise ValueError(
+            f"Unknown trace exporter {kind!r}; expected one of {', '.join(TRACE_EXPORTERS)}"
+        )
+    if kind == "file":
+        return FileExporter(path)
+    if kind == "memory":
+        return InMemoryExporter()
+    return None
+
+
+# Global tracer; spans are only recorded when an exporter is configured
+tracer = Tracer(
+    service="interpreter-service",
+    exporter=create_exporter(settings.tracing_exporter, settings.tracing_file),
+)
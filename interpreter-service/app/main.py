@@ -1,21 +1,35 @@
+import json
 import logging
-from asyncio import Lock
-from collections import deque
-from time import monotonic
+import math
+from time import perf_counter
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
 
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
+from starlette.routing import Match
 
 from app.api.routes import (
+    admin_router,
     analysis_router,
+    batch_router,
+    documents_router,
     execution_router,
     health_router,
+    jobs_router,
     language_router,
     optimization_router,
+    outputs_router,
     profile_router,
     score_router,
+    variables_router,
 )
+from app.core.admission import admission_controller
 from app.core.config import settings
+from app.core.execution import execution_pool
+from app.core.metrics import REQUEST_LATENCY
+from app.core.ratelimit import RateLimit, create_rate_limiter
+from app.core.tracing import parse_traceparent, tracer
+from app.services.jobs import job_store
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +41,73 @@ logger = logging.getLogger(__name__)
 
 UNPROTECTED_PATHS = {"/health"}
 DOCS_PATH_PREFIXES = ("/docs", "/redoc", "/openapi.json")
+MAX_USER_KEY_LENGTH = 128
+
+
+def _endpoint(app: FastAPI, request: Request) -> str:
+    """Route template for the request, so path parameters share one limit."""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+async def _json_body(request: Request) -> Dict[str, Any]:
+    """The request's JSON object body, or an empty dict when it has none."""
+    if request.method != "POST" or "json" not in request.headers.get("content-type", ""):
+        return {}
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _request_user(request: Request, body: Dict[str, Any]) -> str:
+    """
+    User a request counts against: the ``X-User-Id`` header, else the
+    ``user_id`` field of the body, else ``anonymous``.
+    """
+    user = request.headers.get("X-User-Id")
+    if not user and isinstance(body.get("user_id"), str):
+        user = body["user_id"]
+    return (user or "anonymous")[:MAX_USER_KEY_LENGTH]
+
+
+def _request_size(body: Dict[str, Any]) -> Tuple[int, float, int]:
+    """Code length, timeout and number of programs of a request, for its cost estimate."""
+    items = body.get("items")
+    programs = items if isinstance(items, list) and items else [body]
+    programs = [program for program in programs if isinstance(program, dict)] or [{}]
+    length = sum(len(str(program.get("code") or program.get("text") or "")) for program in programs)
+    timeout = body.get("timeout")
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        timeout = settings.max_execution_time
+    return length, float(timeout), len(programs)
+
+
+async def _on_finish(body: AsyncIterator[bytes], callback: Callable[[], None]) -> AsyncIterator[bytes]:
+    # Streamed responses are only done once their last chunk is sent
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        callback()
+
+
+def _release_ticket(request: Request) -> None:
+    # A route whose work outlives the request (POST /jobs) takes the ticket over
+    ticket = getattr(request.state, "admission_ticket", None)
+    if ticket is not None:
+        request.state.admission_ticket = None
+        admission_controller.release(ticket)
+
+
+def _rate_limit(endpoint: str) -> RateLimit:
+    rate = settings.rate_limit_endpoint_overrides.get(endpoint, settings.rate_limit_per_minute)
+    burst = settings.rate_limit_burst or rate
+    return RateLimit(rate=rate, burst=burst)
 
 
 def create_app() -> FastAPI:
@@ -46,9 +127,9 @@ def create_app() -> FastAPI:
         openapi_url="/openapi.json"
     )
 
-    app.state.request_timestamps = deque()
-    app.state.rate_limit_lock = Lock()
-    app.state.rate_limit_window_seconds = 60
+    app.state.rate_limiter = create_rate_limiter(
+        settings.rate_limit_backend, settings.rate_limit_redis_url
+    )
 
     @app.middleware("http")
     async def protect_interpreter_service(request: Request, call_next):
@@ -57,46 +138,111 @@ def create_app() -> FastAPI:
         if path in UNPROTECTED_PATHS or path.startswith(DOCS_PATH_PREFIXES):
             return await call_next(request)
 
-        shared_secret = request.headers.get("X-Internal-Service-Secret")
+        with tracer.span("auth"):
+            shared_secret = request.headers.get("X-Internal-Service-Secret")
         if shared_secret != settings.internal_api_secret:
             return JSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={"detail": "Forbidden"},
             )
 
-        now = monotonic()
-        timestamps = app.state.request_timestamps
-        rate_limit_lock = app.state.rate_limit_lock
-        window = app.state.rate_limit_window_seconds
-
-        async with rate_limit_lock:
-            while timestamps and now - timestamps[0] >= window:
-                timestamps.popleft()
-
-            if len(timestamps) >= settings.rate_limit_per_minute:
-                retry_after = max(1, int(window - (now - timestamps[0])))
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    headers={"Retry-After": str(retry_after)},
-                    content={
-                        "detail": (
-                            "Interpreter rate limit exceeded. "
-                            "Please retry shortly."
-                        )
-                    },
-                )
-
-            timestamps.append(now)
-        return await call_next(request)
+        endpoint = request.state.endpoint
+        body = await _json_body(request)
+        user = _request_user(request, body)
+        with tracer.span("rate_limit", user=user) as span:
+            decision = await app.state.rate_limiter.hit(
+                f"{user}:{endpoint}", _rate_limit(endpoint)
+            )
+            if span is not None:
+                span.attributes["allowed"] = decision.allowed
+        if not decision.allowed:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))},
+                content={
+                    "detail": (
+                        "Interpreter rate limit exceeded. "
+                        "Please retry shortly."
+                    )
+                },
+            )
+
+        if not settings.admission_enabled:
+            return await call_next(request)
+        with tracer.span("admission") as span:
+            ticket, retry_after = admission_controller.admit(endpoint, *_request_size(body))
+            if span is not None:
+                span.attributes["admitted"] = ticket is not None
+        if ticket is None:
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                content={
+                    "detail": (
+                        "Interpreter is at capacity. "
+                        "Please retry shortly."
+                    )
+                },
+            )
+        request.state.admission_ticket = ticket
+        try:
+            response = await call_next(request)
+        except BaseException:
+            _release_ticket(request)
+            raise
+        response.body_iterator = _on_finish(response.body_iterator, lambda: _release_ticket(request))
+        return response
+
+    @app.middleware("http")
+    async def observe_request(request: Request, call_next):
+        # Registered last, so it wraps the protection middleware and also
+        # times and traces the requests that middleware rejects.
+        started = perf_counter()
+        request.state.endpoint = endpoint = _endpoint(app, request)
+        span = tracer.start(
+            f"{request.method} {endpoint}",
+            parent=parse_traceparent(request.headers.get("traceparent")),
+            route=endpoint,
+            method=request.method,
+        )
+
+        def observe(status_code: int, error: Optional[BaseException] = None) -> None:
+            REQUEST_LATENCY.observe(
+                perf_counter() - started, endpoint, request.method, str(status_code)
+            )
+            if span is not None:
+                span.attributes["status"] = status_code
+                tracer.end(span, error=error)
+
+        token = tracer.activate(span)
+        try:
+            response = await call_next(request)
+        except BaseException as exc:
+            observe(status.HTTP_500_INTERNAL_SERVER_ERROR, exc)
+            raise
+        finally:
+            tracer.deactivate(token)
+        if span is not None:
+            response.headers["traceparent"] = span.traceparent
+        response.body_iterator = _on_finish(
+            response.body_iterator, lambda: observe(response.status_code)
+        )
+        return response
     
     # Include routers
+    app.include_router(admin_router)
     app.include_router(analysis_router)
+    app.include_router(batch_router)
+    app.include_router(documents_router)
     app.include_router(execution_router)
     app.include_router(health_router)
+    app.include_router(jobs_router)
     app.include_router(language_router)
     app.include_router(optimization_router)
+    app.include_router(outputs_router)
     app.include_router(profile_router)
     app.include_router(score_router)
+    app.include_router(variables_router)
     
     @app.on_event("startup")
     async def startup_event():
@@ -104,14 +250,20 @@ def create_app() -> FastAPI:
         logger.info(f"{settings.app_name} v{settings.version} starting up...")
         logger.info(f"Debug mode: {settings.debug}")
         logger.info(
-            "Global interpreter rate limit: %s requests/minute",
+            "Interpreter rate limit: %s requests/minute per user and endpoint (%s backend)",
             settings.rate_limit_per_minute,
+            settings.rate_limit_backend,
         )
+        execution_pool.start()
     
     @app.on_event("shutdown")
     async def shutdown_event():
         """Actions to perform on application shutdown."""
         logger.info(f"{settings.app_name} shutting down...")
+        job_store.shutdown()
+        execution_pool.shutdown()
+        await app.state.rate_limiter.close()
+        tracer.close()
     
     return app
 
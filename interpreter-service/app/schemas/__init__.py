@@ -1,31 +1,71 @@
 from app.schemas.requests import (
     ExecuteRequest,
+    ExecuteStreamRequest,
     CodeRequest,
     TokenizeRequest,
     ParseRequest,
+    StaticOptimizeRequest,
+    DocumentOpenRequest,
+    DocumentEditRequest,
+    BatchItem,
+    BatchAnalyzeRequest,
+    JobRequest,
+    VariableRequest,
+    RescoreItem,
+    RescoreRequest,
 )
 from app.schemas.responses import (
     ExecuteResponse,
+    ExecuteStreamResult,
     ProfileResponse,
     OptimizeResponse,
     ScoreResponse,
     AnalyzeResponse,
     TokenizeResponse,
     ParseResponse,
-    HealthResponse
+    DocumentDeltaResponse,
+    BatchItemResult,
+    BatchSummary,
+    RescoreItemResult,
+    RescoreSummary,
+    JobResponse,
+    VariableInfo,
+    VariableResponse,
+    HealthResponse,
+    StatsResponse,
 )
 
 __all__ = [
     "CodeRequest",
     "ExecuteRequest",
+    "ExecuteStreamRequest",
     "TokenizeRequest",
     "ParseRequest",
+    "StaticOptimizeRequest",
+    "DocumentOpenRequest",
+    "DocumentEditRequest",
+    "BatchItem",
+    "BatchAnalyzeRequest",
+    "JobRequest",
+    "VariableRequest",
+    "RescoreItem",
+    "RescoreRequest",
     "ExecuteResponse",
+    "ExecuteStreamResult",
     "ProfileResponse",
     "OptimizeResponse",
     "ScoreResponse",
     "AnalyzeResponse",
     "TokenizeResponse",
     "ParseResponse",
+    "DocumentDeltaResponse",
+    "BatchItemResult",
+    "BatchSummary",
+    "RescoreItemResult",
+    "RescoreSummary",
+    "JobResponse",
+    "VariableInfo",
+    "VariableResponse",
     "HealthResponse",
+    "StatsResponse",
 ]
@@ -1,6 +1,11 @@
-from typing import Optional
+import keyword
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 
+from app.core.config import settings
+from app.core.profiling import ProfilingTier
+from app.schemas.responses import Suggestion
+
 class CodeRequest(BaseModel):
     """Base request for all code-related endpoints."""
 
@@ -35,9 +40,166 @@ class ExecuteRequest(CodeRequest):
         default=True,
         description="Whether to collect profiling data",
     )
+    profiling_tier: Optional[ProfilingTier] = Field(
+        default=None,
+        description=(
+            "How much to profile, cheapest first: off, functions, sampled_lines, "
+            "full_lines, full_memory. Overrides enable_profiling; when omitted, "
+            "enable_profiling picks full_memory or off"
+        ),
+    )
+    profiling_format: Literal["objects", "columnar"] = Field(
+        default="objects",
+        description="Profiling stats as one object per line/function, or one array per metric",
+    )
+
+class ExecuteStreamRequest(ExecuteRequest):
+    """Request for /execute/stream."""
+
+    include_score: bool = Field(
+        default=True,
+        description="Add suggestions and the score report to the final result frame",
+    )
+
+class JobRequest(ExecuteRequest):
+    """Request for POST /jobs — run a submission in the background."""
+
+    kind: Literal["execute", "profile", "analyze"] = Field(
+        default="analyze",
+        description="Route whose response becomes the job's result",
+    )
+
+class VariableRequest(BaseModel):
+    """Request for POST /variables/{name} — the run whose variable to fetch."""
+
+    symbol_table_id: str = Field(
+        ...,
+        pattern=r"^[0-9a-f]{32}$",
+        description="``symbol_table_id`` of the response that previewed the variable",
+    )
+    user_id: Optional[str] = Field(
+        default=None,
+        description="Optional user ID for tracking",
+    )
 
 class TokenizeRequest(CodeRequest):
     """Request for /tokenize endpoint."""
 
 class ParseRequest(CodeRequest):
-    """Request for /parse endpoint."""
\ No newline at end of file
+    """Request for /parse endpoint."""
+
+class StaticOptimizeRequest(CodeRequest):
+    """Request for /optimize/static endpoint."""
+class DocumentOpenRequest(CodeRequest):
+    """Request for POST /documents — start an incremental editing session."""
+
+class DocumentEditRequest(BaseModel):
+    """Request for POST /documents/{document_id}/edits — one range edit."""
+
+    version: int = Field(..., ge=0, description="Document version the edit is based on")
+    start_line: int = Field(..., ge=1)
+    start_column: int = Field(..., ge=1)
+    end_line: int = Field(..., ge=1, description="Exclusive end position of the replaced range")
+    end_column: int = Field(..., ge=1)
+    text: str = Field(default="", max_length=10000, description="Replacement text")
+
+def _check_input_names(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    for name in inputs:
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"Input name {name!r} is not a valid identifier")
+    return inputs
+
+class BatchItem(BaseModel):
+    """One program of a /batch/analyze request."""
+
+    id: Optional[str] = Field(
+        default=None,
+        max_length=128,
+        description="Client id echoed in the item's result; defaults to its index",
+    )
+    code: str = Field(..., min_length=1, max_length=10000, description="OptiLang source code")
+    timeout: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=30,
+        description="Execution timeout for this item; defaults to the batch timeout",
+    )
+    inputs: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Globals for this item, overriding the batch inputs of the same name",
+    )
+
+    @field_validator("code")
+    @classmethod
+    def code_not_empty(cls, value: str) -> str:
+        return CodeRequest.code_not_empty(value)
+
+    @field_validator("inputs")
+    @classmethod
+    def input_names_valid(cls, value: Dict[str, Any]) -> Dict[str, Any]:
+        return _check_input_names(value)
+
+class BatchAnalyzeRequest(BaseModel):
+    """Request for POST /batch/analyze."""
+
+    items: List[BatchItem] = Field(..., min_length=1)
+    timeout: float = Field(default=5, gt=0, le=30, description="Default per-item timeout")
+    enable_profiling: bool = Field(default=True)
+    profiling_tier: Optional[ProfilingTier] = Field(
+        default=None,
+        description="Profiling tier for every item; overrides enable_profiling",
+    )
+    profiling_format: Literal["objects", "columnar"] = Field(default="objects")
+    inputs: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Test inputs bound as global variables before every program runs",
+    )
+    include_details: bool = Field(
+        default=False,
+        description="Add profiling and symbol tables to each item result",
+    )
+    user_id: Optional[str] = Field(default=None)
+
+    @field_validator("inputs")
+    @classmethod
+    def input_names_valid(cls, value: Dict[str, Any]) -> Dict[str, Any]:
+        return _check_input_names(value)
+
+    @field_validator("items")
+    @classmethod
+    def items_within_limit(cls, value: List[BatchItem]) -> List[BatchItem]:
+        if len(value) > settings.batch_max_items:
+            raise ValueError(f"A batch holds at most {settings.batch_max_items} items")
+        return value
+
+class RescoreItem(BaseModel):
+    """One stored result of a /rescore request."""
+
+    id: Optional[str] = Field(
+        default=None,
+        max_length=128,
+        description="Client id echoed in the item's result; defaults to its index",
+    )
+    profiling: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Profiling as /execute returned it (objects format); omitted scores with partial credit",
+    )
+    suggestions: Optional[List[Suggestion]] = Field(
+        default=None,
+        description="Suggestions as /analyze returned them; omitted when the optimizer did not run",
+    )
+    source_lines: int = Field(default=1, ge=1, description="Lines in the submitted source")
+    errors: List[str] = Field(default_factory=list)
+
+class RescoreRequest(BaseModel):
+    """Request for POST /rescore."""
+
+    items: List[RescoreItem] = Field(..., min_length=1)
+    user_id: Optional[str] = Field(default=None)
+
+    @field_validator("items")
+    @classmethod
+    def items_within_limit(cls, value: List[RescoreItem]) -> List[RescoreItem]:
+        if len(value) > settings.rescore_max_items:
+            raise ValueError(f"A rescore request holds at most {settings.rescore_max_items} items")
+        return value
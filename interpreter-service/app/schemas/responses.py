@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 class TokenResponseItem(BaseModel):
@@ -43,6 +43,38 @@ class ProfilingData(BaseModel):
     skipped_lines: int
     line_sampling_rate: float
     memory_mode: str
+    cached: bool = False
+
+class LineStatsColumns(BaseModel):
+    """``line_stats`` of the columnar format: entry i of each array is one line."""
+    line: List[int] = Field(default_factory=list)
+    count: List[int] = Field(default_factory=list)
+    total_time_ms: List[float] = Field(default_factory=list)
+    avg_time_ms: List[float] = Field(default_factory=list)
+    min_time_ms: List[float] = Field(default_factory=list)
+    max_time_ms: List[float] = Field(default_factory=list)
+    memory_vars: List[int] = Field(default_factory=list)
+    memory_bytes: List[int] = Field(default_factory=list)
+
+class FunctionStatsColumns(BaseModel):
+    """``function_stats`` of the columnar format: entry i of each array is one function."""
+    name: List[str] = Field(default_factory=list)
+    calls: List[int] = Field(default_factory=list)
+    total_time_ms: List[float] = Field(default_factory=list)
+    avg_time_ms: List[float] = Field(default_factory=list)
+    min_time_ms: List[float] = Field(default_factory=list)
+    max_time_ms: List[float] = Field(default_factory=list)
+    max_recursion_depth: List[int] = Field(default_factory=list)
+    callers: List[Dict[str, int]] = Field(default_factory=list)
+
+class ColumnarProfilingData(ProfilingData):
+    """``ProfilingData`` with per-metric arrays, for ``profiling_format="columnar"``."""
+    format: Literal["columnar"]
+    line_stats: LineStatsColumns = Field(default_factory=LineStatsColumns)  # type: ignore[assignment]
+    function_stats: FunctionStatsColumns = Field(default_factory=FunctionStatsColumns)  # type: ignore[assignment]
+
+# Columnar first: it only matches payloads tagged ``format="columnar"``
+AnyProfilingData = Union[ColumnarProfilingData, ProfilingData]
 
 class Suggestion(BaseModel):
     line: int
@@ -51,6 +83,10 @@ class Suggestion(BaseModel):
     description: str
     suggestion: str
     impact_score: float
+    requires_runtime: bool = Field(
+        default=False,
+        description="Found without running the code; a run may re-rate or drop it",
+    )
 
 class DimensionScores(BaseModel):
     correctness: float
@@ -72,14 +108,35 @@ class ScoreReport(BaseModel):
     lines_profiled: int
     cv: float
 
+class VariableInfo(BaseModel):
+    """What a ``symbol_table`` preview leaves out of the full value."""
+    type: str
+    size_bytes: int = Field(description="Estimated length of the full value as compact JSON")
+    truncated: bool = False
+    length: Optional[int] = None
+
+class VariableResponse(BaseModel):
+    """Response for POST /variables/{name} — one variable in full."""
+    name: str
+    value: Any = None
+    type: str
+    length: Optional[int] = None
+    size_bytes: int
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
 class ExecuteResponse(BaseModel):
     """Response for POST /execute — raw execution only."""
     success: bool
     output: str
+    output_bytes: int = 0
+    output_truncated: bool = False
+    output_id: Optional[str] = Field(default=None, description="Fetch the full output from GET /outputs/{output_id}")
     errors: List[str] = Field(default_factory=list)
     execution_time: float
-    profiling: Optional[ProfilingData] = None
+    profiling: Optional[AnyProfilingData] = None
     symbol_table: Dict[str, Any] = Field(default_factory=dict)
+    symbol_info: Dict[str, VariableInfo] = Field(default_factory=dict)
+    symbol_table_id: Optional[str] = Field(default=None, description="Fetch full variables from POST /variables/{name}")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class ProfileResponse(BaseModel):
@@ -87,15 +144,20 @@ class ProfileResponse(BaseModel):
     success: bool
     errors: List[str] = Field(default_factory=list)
     execution_time: float
-    profiling: Optional[ProfilingData] = None
+    profiling: Optional[AnyProfilingData] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class OptimizeResponse(BaseModel):
-    """Response for POST /optimize — suggestions only."""
+    """Response for POST /optimize and /optimize/static — suggestions only."""
     success: bool
     errors: List[str] = Field(default_factory=list)
     suggestions: List[Suggestion] = Field(default_factory=list)
     suggestion_count: int
+    mode: Literal["runtime", "static"] = "runtime"
+    skipped_patterns: List[str] = Field(
+        default_factory=list,
+        description="Patterns that need profiling data and were not checked",
+    )
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class ScoreResponse(BaseModel):
@@ -109,14 +171,111 @@ class AnalyzeResponse(BaseModel):
     """Response for POST /analyze — full pipeline, everything in one shot."""
     success: bool
     output: str
+    output_bytes: int = 0
+    output_truncated: bool = False
+    output_id: Optional[str] = Field(default=None, description="Fetch the full output from GET /outputs/{output_id}")
     errors: List[str] = Field(default_factory=list)
     execution_time: float
-    profiling: Optional[ProfilingData] = None
+    profiling: Optional[AnyProfilingData] = None
     symbol_table: Dict[str, Any] = Field(default_factory=dict)
+    symbol_info: Dict[str, VariableInfo] = Field(default_factory=dict)
+    symbol_table_id: Optional[str] = Field(default=None, description="Fetch full variables from POST /variables/{name}")
     suggestions: List[Suggestion] = Field(default_factory=list)
     score_report: ScoreReport
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class JobResponse(BaseModel):
+    """Response for POST /jobs and GET/DELETE /jobs/{job_id}."""
+    job_id: str
+    kind: str
+    status: Literal["running", "succeeded", "failed", "cancelled"]
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[Union[AnalyzeResponse, ExecuteResponse, ProfileResponse]] = Field(
+        default=None,
+        description="Response of the route ``kind`` names, once the job has succeeded",
+    )
+    error: Optional[str] = None
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class ExecuteStreamResult(BaseModel):
+    """Final ``result`` event of POST /execute/stream."""
+    success: bool
+    errors: List[str] = Field(default_factory=list)
+    execution_time: float
+    output_bytes: int
+    truncated: bool = False
+    profiling: Optional[AnyProfilingData] = None
+    symbol_table: Dict[str, Any] = Field(default_factory=dict)
+    symbol_info: Dict[str, VariableInfo] = Field(default_factory=dict)
+    symbol_table_id: Optional[str] = Field(default=None, description="Fetch full variables from POST /variables/{name}")
+    suggestions: Optional[List[Suggestion]] = None
+    score_report: Optional[ScoreReport] = None
+
+class BatchItemResult(BaseModel):
+    """One ``item`` line of POST /batch/analyze, emitted as the item finishes."""
+    type: str = "item"
+    index: int
+    id: str
+    success: bool
+    timed_out: bool = False
+    cached: bool = False
+    output: str = ""
+    output_bytes: int = 0
+    output_truncated: bool = False
+    output_id: Optional[str] = None
+    errors: List[str] = Field(default_factory=list)
+    execution_time: float = 0.0
+    cpu_time: float = 0.0
+    suggestions: List[Suggestion] = Field(default_factory=list)
+    score_report: Optional[ScoreReport] = None
+    profiling: Optional[AnyProfilingData] = None
+    symbol_table: Optional[Dict[str, Any]] = None
+    symbol_info: Optional[Dict[str, VariableInfo]] = None
+    symbol_table_id: Optional[str] = None
+
+class ScoreDistribution(BaseModel):
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    stdev: Optional[float] = None
+    grades: Dict[str, int] = Field(default_factory=dict)
+
+class BatchSummary(BaseModel):
+    """Final ``summary`` line of POST /batch/analyze."""
+    type: str = "summary"
+    count: int
+    succeeded: int
+    failed: int
+    timed_out: int
+    errored: int
+    cached: int
+    scores: ScoreDistribution
+    total_execution_time: float
+    total_cpu_time: float
+    wall_time: float
+
+class RescoreItemResult(BaseModel):
+    """One ``item`` line of POST /rescore."""
+    type: str = "item"
+    index: int
+    id: str
+    success: bool
+    score_report: Optional[ScoreReport] = None
+    error: Optional[str] = None
+    deduplicated: bool = Field(default=False, description="Scored once with an identical earlier item")
+
+class RescoreSummary(BaseModel):
+    """Final ``summary`` line of POST /rescore."""
+    type: str = "summary"
+    count: int
+    distinct: int
+    failed: int
+    scores: ScoreDistribution
+    wall_time: float
+
 class TokenizeResponse(BaseModel):
     success: bool = Field
     tokens: List[TokenResponseItem] = Field(default_factory=list)
@@ -130,7 +289,77 @@ class ParseResponse(BaseModel):
     errors: List[str] = Field(default_factory=list)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class DocumentBlock(BaseModel):
+    """One top-level statement block of an incremental document."""
+    start_line: int
+    end_line: int
+    tokens: List[TokenResponseItem] = Field(default_factory=list)
+    statements: List[Dict[str, Any]] = Field(default_factory=list)
+    errors: List[str] = Field(default_factory=list)
+
+class DocumentDeltaResponse(BaseModel):
+    """
+    Response for /documents — replace ``removed_blocks`` blocks starting at
+    ``first_block`` with ``blocks`` and shift the line numbers of every later
+    block (its tokens and AST nodes included) by ``line_delta``.
+    """
+    document_id: str
+    version: int
+    success: bool
+    errors: List[str] = Field(default_factory=list)
+    first_block: int
+    removed_blocks: int
+    line_delta: int
+    blocks: List[DocumentBlock] = Field(default_factory=list)
+    block_count: int
+    line_count: int
+    token_count: int
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
 class HealthResponse(BaseModel):
     status: str
     version: str
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class ExecutionPoolStats(BaseModel):
+    backend: str
+    workers: int
+    queued: int
+    in_flight: int
+    completed: int
+    failed: int
+    sandbox: Optional[Dict[str, int]] = None
+
+class CacheStats(BaseModel):
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+class SingleFlightStats(BaseModel):
+    in_flight: int
+    leaders: int
+    followers: int
+    coalesce_ratio: float
+    waiters: Dict[str, int] = Field(default_factory=dict, description="Followers of the busiest runs in flight, by key prefix")
+
+class AdmissionStats(BaseModel):
+    in_flight: int
+    outstanding_seconds: float
+    expected_wait_seconds: float
+    admitted: Dict[str, int]
+    shed: Dict[str, int]
+
+class StatsResponse(BaseModel):
+    """Response for GET /stats — runtime counters for the service."""
+    execution_pool: ExecutionPoolStats
+    result_cache: CacheStats
+    syntax_cache: CacheStats
+    artifact_index: Optional[CacheStats] = None
+    document_sessions: CacheStats
+    admission: AdmissionStats
+    jobs: Dict[str, int] = Field(default_factory=dict, description="Jobs held, by status")
+    singleflight: Optional[SingleFlightStats] = None
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
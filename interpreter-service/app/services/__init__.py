@@ -0,0 +1,4 @@
+from app.services.pipeline import AnalysisPipeline, run_pipeline
+from app.services.results import run_stages
+
+__all__ = ["AnalysisPipeline", "run_pipeline", "run_stages"]
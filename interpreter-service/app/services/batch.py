@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.serialization import shape_profiling
+from app.schemas.requests import BatchAnalyzeRequest, BatchItem
+from app.services.results import run_stages
+
+logger = logging.getLogger(__name__)
+
+BATCH_STAGES = ("execution", "suggestions", "score_report")
+
+
+def score_distribution(scores: List[float], grades: Dict[str, int]) -> Dict[str, Any]:
+    """Summary statistics of ``scores``, with the count of each grade."""
+    return {
+        "count": len(scores),
+        "min": min(scores) if scores else None,
+        "max": max(scores) if scores else None,
+        "mean": round(statistics.fmean(scores), 3) if scores else None,
+        "median": round(statistics.median(scores), 3) if scores else None,
+        "stdev": round(statistics.pstdev(scores), 3) if scores else None,
+        "grades": dict(sorted(grades.items())),
+    }
+
+
+class BatchTotals:
+    """Running totals over the item results of one batch."""
+
+    def __init__(self) -> None:
+        self.started = perf_counter()
+        self.count = 0
+        self.succeeded = 0
+        self.timed_out = 0
+        self.errored = 0
+        self.cached = 0
+        self.execution_time = 0.0
+        self.cpu_time = 0.0
+        self.scores: List[float] = []
+        self.grades: Dict[str, int] = {}
+
+    def add(self, item: Dict[str, Any]) -> None:
+        self.count += 1
+        self.succeeded += item["success"]
+        self.timed_out += item["timed_out"]
+        self.cached += item["cached"]
+        self.execution_time += item["execution_time"]
+        self.cpu_time += item["cpu_time"]
+        report = item.get("score_report")
+        if report is None:
+            self.errored += 1
+            return
+        self.scores.append(report["score"])
+        self.grades[report["grade"]] = self.grades.get(report["grade"], 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "summary",
+            "count": self.count,
+            "succeeded": self.succeeded,
+            "failed": self.count - self.succeeded,
+            "timed_out": self.timed_out,
+            "errored": self.errored,
+            "cached": self.cached,
+            "scores": score_distribution(self.scores, self.grades),
+            "total_execution_time": round(self.execution_time, 6),
+            "total_cpu_time": round(self.cpu_time, 6),
+            "wall_time": round(perf_counter() - self.started, 6),
+        }
+
+
+def _item_result(
+    index: int,
+    item: BatchItem,
+    timeout: float,
+    stages: Optional[Dict[str, Any]],
+    error: Optional[BaseException],
+    include_details: bool,
+    profiling_format: str = "objects",
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "type": "item",
+        "index": index,
+        "id": item.id if item.id is not None else str(index),
+    }
+    if stages is None:
+        # The job itself failed (e.g. its sandbox worker was killed)
+        result.update(
+            success=False,
+            errors=[f"Execution error: {error}"],
+            timed_out=False,
+            cached=False,
+            execution_time=0.0,
+            cpu_time=0.0,
+        )
+        return result
+
+    execution = stages["execution"]
+    result.update(
+        success=execution["success"],
+        timed_out=execution["execution_time"] >= timeout,
+        cached=execution.get("cached", False),
+        output=execution["output"],
+        output_bytes=execution["output_bytes"],
+        output_truncated=execution["output_truncated"],
+        output_id=execution["output_id"],
+        errors=execution["errors"],
+        execution_time=execution["execution_time"],
+        cpu_time=execution["cpu_time"],
+        suggestions=stages["suggestions"],
+        score_report=stages["score_report"],
+    )
+    if include_details:
+        result.update(
+            profiling=shape_profiling(execution.get("profiling"), profiling_format),
+            symbol_table=execution["symbol_table"],
+            symbol_info=execution["symbol_info"],
+            symbol_table_id=execution["symbol_table_id"],
+        )
+    return result
+
+
+async def analyze_batch(request: BatchAnalyzeRequest) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run every item of ``request`` through the analysis pipeline on the
+    execution pool and yield one ``item`` result per program as it
+    finishes, followed by a ``summary``.
+
+    At most ``batch_max_concurrency`` items of a batch hold pool workers at
+    once, leaving the rest of the pool to other requests. Closing the
+    iterator early cancels the items that have not started yet.
+    """
+    limit = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+
+    async def run_item(
+        index: int, item: BatchItem
+    ) -> Tuple[int, BatchItem, float, Optional[Dict[str, Any]], Optional[BaseException]]:
+        timeout = item.timeout or request.timeout
+        inputs = {**request.inputs, **item.inputs}
+        async with limit:
+            try:
+                stages = await run_stages(
+                    item.code,
+                    timeout,
+                    request.enable_profiling,
+                    BATCH_STAGES,
+                    inputs or None,
+                    request.profiling_tier,
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                logger.error("Batch item %s failed: %s", index, exc, exc_info=True)
+                return index, item, timeout, None, exc
+        return index, item, timeout, stages, None
+
+    tasks = [asyncio.ensure_future(run_item(index, item)) for index, item in enumerate(request.items)]
+    summary = BatchTotals()
+    try:
+        for finished in asyncio.as_completed(tasks):
+            index, item, timeout, stages, error = await finished
+            result = _item_result(
+                index,
+                item,
+                timeout,
+                stages,
+                error,
+                request.include_details,
+                request.profiling_format,
+            )
+            summary.add(result)
+            yield result
+        yield summary.to_dict()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import re
+import threading
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.serialization import serialize_tokens, to_json_safe
+from optilang.core.token import Token
+from optilang.lexer import Lexer
+from optilang.parser import parse
+from optilang.utils.errors import LexerError, OptiLangError
+
+# Zero-indent lines that continue the previous statement instead of starting one
+CONTINUATION = re.compile(r"(elif|else|except|finally)\b")
+OPEN_BRACKETS = "([{"
+CLOSE_BRACKETS = ")]}"
+
+
+class DocumentError(ValueError):
+    """Raised for edits that cannot be applied to a document."""
+
+
+class VersionConflict(DocumentError):
+    """Raised when an edit is based on a version other than the current one."""
+
+
+def _starts_statement(line: str) -> bool:
+    if not line or line[0] in " \t\r\n#":
+        return False
+    return CONTINUATION.match(line) is None
+
+
+def _scan(line: str, quote: Optional[str], depth: int) -> Tuple[Optional[str], int]:
+    """Carry string and bracket state across ``line`` the way the lexer does."""
+    index = 0
+    while index < len(line):
+        ch = line[index]
+        if quote is not None:
+            if ch == "\\":
+                index += 1
+            elif ch == quote:
+                quote = None
+        elif ch == "#":
+            break
+        elif ch in "\"'":
+            quote = ch
+        elif ch in OPEN_BRACKETS:
+            depth += 1
+        elif ch in CLOSE_BRACKETS:
+            depth = max(0, depth - 1)
+        index += 1
+    return quote, depth
+
+
+def split_blocks(lines: List[str]) -> Tuple[List[List[str]], bool]:
+    """
+    Split source lines into top-level statement blocks.
+
+    A block starts at a zero-indent code line that is not inside a string or
+    bracket and is not an ``elif``/``else``/``except``/``finally`` clause;
+    blank and comment lines stay with the block above them. Returns the
+    blocks and whether the last one ends outside any string or bracket.
+    """
+    blocks: List[List[str]] = []
+    current: List[str] = []
+    quote: Optional[str] = None
+    depth = 0
+    for line in lines:
+        if current and quote is None and depth == 0 and _starts_statement(line):
+            blocks.append(current)
+            current = []
+        current.append(line)
+        quote, depth = _scan(line, quote, depth)
+    if current:
+        blocks.append(current)
+    return blocks, quote is None and depth == 0
+
+
+@dataclass
+class _Block:
+    text: str
+    start: int  # 0-based index of the block's first line in the document
+    line_count: int
+    origin: int  # value of ``start`` when the block was lexed
+    tokens: List[Token] = field(default_factory=list)
+    eof: Optional[Token] = None  # the block's own EOF, where its parse runs out
+    payload: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[OptiLangError] = None
+
+    def error_message(self) -> Optional[str]:
+        if self.error is None:
+            return None
+        shift = self.start - self.origin
+        if shift == 0 or self.error.line is None:
+            return str(self.error)
+        return str(OptiLangError(self.error.message, self.error.line + shift, self.error.column))
+
+    def ran_off_end(self) -> bool:
+        """Whether parsing failed at the block's EOF, i.e. it needs what follows."""
+        return (
+            self.eof is not None
+            and self.error is not None
+            and not isinstance(self.error, LexerError)
+            and (self.error.line, self.error.column) == (self.eof.line, self.eof.column)
+        )
+
+    def current_tokens(self) -> List[Token]:
+        """Tokens with the lines the block sits on now."""
+        shift = self.start - self.origin
+        if shift == 0:
+            return self.tokens
+        return [replace(token, line=token.line + shift) for token in self.tokens]
+
+
+def _build_block(lines: List[str], start: int) -> _Block:
+    """Lex and parse one top-level block with line numbers relative to the document."""
+    text = "".join(lines)
+    block = _Block(text=text, start=start, line_count=len(lines), origin=start)
+    statements: List[Any] = []
+    try:
+        lexer = Lexer(text)
+        lexer.line = start + 1
+        tokens = lexer.tokenize()
+        block.tokens = tokens[:-1]  # the document has a single trailing EOF
+        block.eof = tokens[-1]
+        statements = parse(tokens).statements
+    except OptiLangError as exc:
+        block.error = exc
+
+    block.payload = {
+        "start_line": start + 1,
+        "end_line": start + len(lines),
+        "tokens": serialize_tokens(block.tokens),
+        "statements": [to_json_safe(statement) for statement in statements],
+        "errors": [str(block.error)] if block.error else [],
+    }
+    return block
+
+
+class DocumentSession:
+    """
+    Server-side copy of an editor buffer, kept as top-level statement blocks.
+
+    Each block is lexed and parsed on its own, with its tokens and AST
+    already serialized. An edit re-splits only the blocks it touches (plus
+    the one above it, which an edit can merge into), lexes and parses the
+    blocks whose text actually changed, and reports them as a delta:
+    ``removed_blocks`` blocks starting at ``first_block`` are replaced by
+    ``blocks``, and every later block moves by ``line_delta`` lines.
+
+    Because blocks only break at zero-indent lines outside strings and
+    brackets, the blocks' tokens followed by an EOF token are exactly what
+    ``tokenize`` returns for the whole buffer, and their statements are the
+    statements of ``parse``.
+    """
+
+    def __init__(self, document_id: str, code: str) -> None:
+        self.document_id = document_id
+        self.version = 0
+        self.lines: List[str] = code.splitlines(keepends=True)
+        self.length = len(code)
+        self.lock = threading.Lock()
+        block_lines, _ = split_blocks(self.lines)
+        self.blocks: List[_Block] = []
+        start = 0
+        for lines in block_lines:
+            self.blocks.append(_build_block(lines, start))
+            start += len(lines)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.lines)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Delta that replaces nothing with every block of the document."""
+        return self._delta(0, 0, self.blocks, 0)
+
+    def apply_edit(
+        self,
+        version: int,
+        start_line: int,
+        start_column: int,
+        end_line: int,
+        end_column: int,
+        text: str,
+    ) -> Dict[str, Any]:
+        """
+        Replace the text between two 1-based (line, column) positions, the
+        end being exclusive, and return the resulting delta.
+        """
+        if version != self.version:
+            raise VersionConflict(
+                f"Edit is based on version {version}, document is at version {self.version}"
+            )
+        first = self._offset(start_line, start_column)
+        last = self._offset(end_line, end_column)
+        if (end_line, end_column) < (start_line, start_column):
+            raise DocumentError("Edit range ends before it starts")
+
+        prefix = self._line(start_line - 1)[: first]
+        suffix = self._line(end_line - 1)[last:]
+        removed_chars = (
+            sum(len(self._line(index)) for index in range(start_line - 1, end_line))
+            - len(prefix)
+            - len(suffix)
+        )
+        length = self.length - removed_chars + len(text)
+        if length > settings.max_code_length:
+            raise DocumentError(
+                f"Document would exceed {settings.max_code_length} characters"
+            )
+
+        old_lo, old_hi = start_line - 1, min(end_line, len(self.lines))
+        new_lines = (prefix + text + suffix).splitlines(keepends=True)
+        self.lines[old_lo:old_hi] = new_lines
+        self.length = length
+        line_delta = len(new_lines) - (old_hi - old_lo)
+
+        first_block, removed, replacement = self._reblock(old_lo, old_hi, line_delta)
+        self.version += 1
+        return self._delta(first_block, removed, replacement, line_delta)
+
+    # ── Internals ──
+
+    def _line(self, index: int) -> str:
+        # One past the last line is the empty line after a trailing newline
+        return self.lines[index] if index < len(self.lines) else ""
+
+    def _offset(self, line: int, column: int) -> int:
+        # The line after the last one exists only once the buffer ends in a newline
+        last = len(self.lines) + (not self.lines or self.lines[-1].endswith("\n"))
+        if line < 1 or line > last:
+            raise DocumentError(f"Line {line} is outside the document")
+        content = self._line(line - 1).rstrip("\r\n")
+        if column < 1 or column > len(content) + 1:
+            raise DocumentError(f"Column {column} is outside line {line}")
+        return column - 1
+
+    def _reblock(
+        self, old_lo: int, old_hi: int, line_delta: int
+    ) -> Tuple[int, int, List[_Block]]:
+        blocks = self.blocks
+        touched = [
+            index
+            for index, block in enumerate(blocks)
+            if block.start < max(old_hi, old_lo + 1) and block.start + block.line_count > old_lo
+        ]
+        if touched:
+            lo, hi = max(0, touched[0] - 1), touched[-1]
+        elif blocks:
+            # Appending after the last line touches the last block only
+            lo = hi = len(blocks) - 1
+        else:
+            lo, hi = 0, -1
+
+        while True:
+            region_start = blocks[lo].start if hi >= 0 else 0
+            region_end = (blocks[hi].start + blocks[hi].line_count if hi >= 0 else 0) + line_delta
+            block_lines, clean = split_blocks(self.lines[region_start:region_end])
+            if lo > 0 and block_lines and not _starts_statement(block_lines[0][0]):
+                lo -= 1
+                continue
+            if not clean and hi < len(blocks) - 1:
+                hi += 1
+                continue
+            break
+
+        old = blocks[lo : hi + 1]
+        texts = ["".join(lines) for lines in block_lines]
+
+        # Blocks whose text is unchanged keep their tokens and AST
+        keep_head = 0
+        while keep_head < min(len(old), len(texts)) and old[keep_head].text == texts[keep_head]:
+            keep_head += 1
+        keep_tail = 0
+        while (
+            keep_tail < min(len(old), len(texts)) - keep_head
+            and old[-1 - keep_tail].text == texts[-1 - keep_tail]
+        ):
+            keep_tail += 1
+
+        replacement: List[_Block] = []
+        start = region_start + sum(len(lines) for lines in block_lines[:keep_head])
+        for lines in block_lines[keep_head : len(block_lines) - keep_tail]:
+            replacement.append(_build_block(lines, start))
+            start += len(lines)
+
+        first = lo + keep_head
+        removed = len(old) - keep_head - keep_tail
+        self.blocks[first : first + removed] = replacement
+        for block in self.blocks[first + len(replacement) :]:
+            block.start += line_delta
+        return first, removed, replacement
+
+    def _delta(
+        self,
+        first_block: int,
+        removed: int,
+        replacement: List[_Block],
+        line_delta: int,
+    ) -> Dict[str, Any]:
+        # The whole buffer fails to lex before it fails to parse
+        failed = [block for block in self.blocks if block.error is not None]
+        failed.sort(key=lambda block: not isinstance(block.error, LexerError))
+        error = self._error_message(failed[0]) if failed else None
+        return {
+            "document_id": self.document_id,
+            "version": self.version,
+            "success": error is None,
+            "errors": [error] if error else [],
+            "first_block": first_block,
+            "removed_blocks": removed,
+            "line_delta": line_delta,
+            "blocks": [block.payload for block in replacement],
+            "block_count": len(self.blocks),
+            "line_count": len(self.lines),
+            "token_count": sum(len(block.tokens) for block in self.blocks) + 1,
+        }
+
+
+    def _error_message(self, block: _Block) -> Optional[str]:
+        """
+        ``block``'s error as a parse of the whole buffer reports it.
+
+        A parse that runs out at the block's own EOF would, over the whole
+        buffer, have gone on into the next block, so the blocks from this
+        one on are parsed again together, from their cached tokens.
+        """
+        index = self.blocks.index(block)
+        if not block.ran_off_end() or index == len(self.blocks) - 1:
+            return block.error_message()
+        last = self.blocks[-1]
+        eof = replace(last.eof, line=last.eof.line + last.start - last.origin)
+        tokens = [token for later in self.blocks[index:] for token in later.current_tokens()]
+        try:
+            parse(tokens + [eof])
+        except OptiLangError as exc:
+            return str(exc)
+        return block.error_message()
+
+
+class DocumentStore:
+    """Bounded set of open document sessions, dropped when idle or evicted."""
+
+    def __init__(self, max_sessions: int, max_bytes: int, ttl_seconds: float) -> None:
+        self._sessions: LRUCache[DocumentSession] = LRUCache(
+            max_entries=max_sessions,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+        )
+
+    def open(self, code: str) -> Dict[str, Any]:
+        # Ids are always generated: a client-chosen one could replace
+        # another client's session
+        session = DocumentSession(uuid.uuid4().hex, code)
+        self._sessions.set(session.document_id, session, size=session.length)
+        return session.snapshot()
+
+    def edit(self, document_id: str, **edit: Any) -> Dict[str, Any]:
+        session = self._sessions.get(document_id)
+        if session is None:
+            raise KeyError(document_id)
+        with session.lock:
+            delta = session.apply_edit(**edit)
+        # Re-inserting refreshes the idle timeout and the size estimate
+        self._sessions.set(document_id, session, size=session.length)
+        return delta
+
+    def close(self, document_id: str) -> bool:
+        return self._sessions.delete(document_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._sessions.stats()
+
+
+# Global document session store
+document_store = DocumentStore(
+    max_sessions=settings.document_sessions_max,
+    max_bytes=settings.document_sessions_max_mb * 1024 * 1024,
+    ttl_seconds=settings.document_session_ttl_seconds,
+)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.execution import execution_pool
+from app.core.serialization import shape_profiling
+from app.schemas.requests import JobRequest
+from app.schemas.responses import AnalyzeResponse, ExecuteResponse, ProfileResponse
+from app.services.pipeline import JobCancelled
+from app.services.results import run_stages
+
+logger = logging.getLogger(__name__)
+
+# Job kind → pipeline stages its route runs
+JOB_STAGES: Dict[str, Tuple[str, ...]] = {
+    "execute": ("execution",),
+    "profile": ("execution",),
+    "analyze": ("execution", "suggestions", "score_report"),
+}
+CANCEL_WAIT_SECONDS = 1.0
+
+
+class JobTableFull(Exception):
+    """Raised when the job table holds ``jobs_max`` jobs that have not expired."""
+
+
+def _timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def build_result(
+    request: JobRequest, stages: Dict[str, Any]
+) -> Union[AnalyzeResponse, ExecuteResponse, ProfileResponse]:
+    """The response the route ``request.kind`` names would have sent."""
+    execution = stages["execution"]
+    profiling = shape_profiling(execution["profiling"], request.profiling_format)
+    now = datetime.now(timezone.utc)
+    if request.kind == "profile":
+        return ProfileResponse(
+            success=execution["success"],
+            errors=execution["errors"],
+            execution_time=execution["execution_time"],
+            profiling=profiling,
+            timestamp=now,
+        )
+    if request.kind == "analyze":
+        return AnalyzeResponse(
+            **{**execution, "profiling": profiling},
+            suggestions=stages["suggestions"],
+            score_report=stages["score_report"],
+            timestamp=now,
+        )
+    return ExecuteResponse(**{**execution, "profiling": profiling}, timestamp=now)
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    created_at: float
+    cancel: Any  # event from execution_pool.open_flag
+    status: str = "running"
+    finished_at: Optional[float] = None
+    result: Optional[Union[AnalyzeResponse, ExecuteResponse, ProfileResponse]] = None
+    error: Optional[str] = None
+    task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": _timestamp(self.created_at),
+            "finished_at": _timestamp(self.finished_at) if self.finished_at is not None else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobStore:
+    """
+    In-memory table of background runs for the job API.
+
+    A submitted job runs as a task on this process's event loop, so its
+    connection is released at once; ``wait`` lets a request long-poll for
+    the outcome. Cancelling sets the job's flag, which the run polls
+    between statements (every ``jobs_cancel_poll_ms``), so the worker is
+    freed rather than left running for an answer nobody wants. Finished
+    jobs are swept ``ttl_seconds`` after they end.
+    """
+
+    def __init__(self, max_jobs: int, ttl_seconds: float) -> None:
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop jobs that finished more than ``ttl_seconds`` ago; returns how many went."""
+        cutoff = (now if now is not None else time()) - self.ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    def submit(self, request: JobRequest, on_done: Optional[Callable[[], None]] = None) -> Job:
+        """Start ``request`` in the background; ``on_done`` runs once it has ended."""
+        self.sweep()
+        if len(self._jobs) >= self.max_jobs:
+            raise JobTableFull()
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=request.kind,
+            created_at=time(),
+            cancel=execution_pool.open_flag(),
+        )
+        self._jobs[job.job_id] = job
+        job.task = asyncio.ensure_future(self._run(job, request))
+        if on_done is not None:
+            job.task.add_done_callback(lambda _task: on_done())
+        return job
+
+    async def _run(self, job: Job, request: JobRequest) -> None:
+        profile = request.kind == "profile"
+        tier = request.profiling_tier
+        try:
+            stages = await run_stages(
+                request.code,
+                request.timeout or 5,
+                True if profile else request.enable_profiling,
+                JOB_STAGES[request.kind],
+                profiling_tier=None if profile and tier == "off" else tier,
+                cancel=job.cancel,
+            )
+            job.result = build_result(request, stages)
+            job.status = "succeeded"
+        except (JobCancelled, asyncio.CancelledError):
+            job.status = "cancelled"
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.error("Job %s failed: %s", job.job_id, exc, exc_info=True)
+            job.status = "failed"
+            job.error = f"{request.kind.capitalize()} error: {exc}"
+        finally:
+            job.finished_at = time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.sweep()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, seconds: float) -> Job:
+        """Return ``job`` once it has finished or ``seconds`` have passed."""
+        if job.task is not None and not job.done and seconds > 0:
+            await asyncio.wait({job.task}, timeout=seconds)
+        return job
+
+    async def cancel(self, job: Job) -> Job:
+        """Stop ``job`` and give it a moment to release its worker."""
+        if not job.done:
+            job.cancel.set()
+            await self.wait(job, CANCEL_WAIT_SECONDS)
+        return job
+
+    def shutdown(self) -> None:
+        for job in self._jobs.values():
+            if not job.done:
+                job.cancel.set()
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"jobs": len(self._jobs)}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+
+# Global job table
+job_store = JobStore(max_jobs=settings.jobs_max, ttl_seconds=settings.jobs_ttl_seconds)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import copy
+import json
+import logging
+from functools import partial
+from time import perf_counter, thread_time, time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import optilang
+from app.core.output import OutputCapture
+from app.core.profiling import make_profiler
+from app.core.serialization import (
+    preview_symbol_table,
+    serialize_profiling,
+    serialize_score_report,
+    serialize_suggestions,
+)
+from app.core.symbols import store_symbol_table
+from optilang.analysis.semantic_analyzer import SemanticAnalyzer
+from optilang.core.ast_nodes import ProgramNode
+from optilang.core.token import Token
+from optilang.lexer import tokenize
+from optilang.parser import parse
+from optilang.runtime.executor import Executor
+from optilang.types.models import ExecutionResult, OptimizationReport
+from optilang.utils.errors import OptiLangError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Pipeline stage → name it is timed under
+STAGE_NAMES = {
+    "tokens": "lex",
+    "ast": "parse",
+    "execution": "execute",
+    "optimization_report": "analyze",
+    "score_report": "score",
+}
+
+
+class AnalysisPipeline:
+    """
+    Run tokenize → parse → execute → analyze → score over one submission,
+    at most once per stage.
+
+    Stages are computed lazily the first time they are read and every later
+    stage reuses the artifacts of the earlier ones, so the source is lexed
+    and parsed once even when it is both executed and analyzed, and an
+    endpoint only pays for the stages it touches. OptiLang errors are cached
+    alongside results: a stage that failed re-raises the same error instead
+    of being recomputed. ``timings`` holds the seconds each computed stage
+    took on its own, and ``intervals`` its wall-clock start and end.
+    ``executor_factory`` replaces ``Executor`` for the execution stage
+    (e.g. to stream output). ``profiling_tier`` (see ``app.core.profiling``)
+    takes precedence over ``enable_profiling`` when given.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        timeout: float = 5,
+        enable_profiling: bool = True,
+        executor_factory: Optional[Callable[..., Executor]] = None,
+        profiling_tier: Optional[str] = None,
+    ) -> None:
+        self.code = code
+        self.timeout = timeout
+        self.enable_profiling = enable_profiling
+        self.executor_factory = executor_factory
+        self.profiling_tier = profiling_tier
+        self._results: Dict[str, Any] = {}
+        self._errors: Dict[str, OptiLangError] = {}
+        self.timings: Dict[str, float] = {}
+        self.intervals: Dict[str, Tuple[float, float]] = {}
+        self._nested = 0.0
+
+    def _stage(self, name: str, compute: Callable[[], T]) -> T:
+        if name in self._errors:
+            raise self._errors[name]
+        if name not in self._results:
+            # Stages computed inside this one are timed on their own and
+            # subtracted, so each timing covers only its own stage.
+            outer, self._nested = self._nested, 0.0
+            started_at = time()
+            start = perf_counter()
+            try:
+                self._results[name] = compute()
+            except OptiLangError as exc:
+                self._errors[name] = exc
+                raise
+            finally:
+                elapsed = perf_counter() - start
+                self.timings[STAGE_NAMES[name]] = elapsed - self._nested
+                self.intervals[STAGE_NAMES[name]] = (started_at, started_at + elapsed)
+                self._nested = outer + elapsed
+        return self._results[name]
+
+    @property
+    def tokens(self) -> List[Token]:
+        """Lexer output. Raises ``LexerError``."""
+        return self._stage("tokens", lambda: tokenize(self.code))
+
+    @property
+    def ast(self) -> ProgramNode:
+        """Parsed program. Raises ``LexerError`` or ``ParserError``."""
+        return self._stage("ast", lambda: parse(self.tokens))
+
+    @property
+    def execution(self) -> ExecutionResult:
+        """Execution result; OptiLang errors are reported in ``errors``."""
+        return self._stage("execution", self._execute)
+
+    @property
+    def optimization_report(self) -> Optional[OptimizationReport]:
+        """Optimizer report, or None when the source does not parse."""
+        return self._stage("optimization_report", self._analyze)
+
+    @property
+    def score_report(self) -> Any:
+        """``ScoreReport`` built from the execution and optimizer stages."""
+        return self._stage("score_report", self._score)
+
+    def _execute(self) -> ExecutionResult:
+        # Same phases as optilang.execute(), but on the shared AST
+        start = perf_counter()
+        try:
+            program = self.ast
+            SemanticAnalyzer().analyze(program)
+            factory = self.executor_factory or Executor
+            if self.profiling_tier is None:
+                return factory(
+                    timeout_seconds=self.timeout,
+                    enable_profiling=self.enable_profiling,
+                ).run(program)
+            profiler = make_profiler(self.profiling_tier)
+            return factory(
+                timeout_seconds=self.timeout,
+                profiler=profiler,
+                enable_profiling=profiler is not None,
+            ).run(program)
+        except OptiLangError as exc:
+            return ExecutionResult(
+                output="",
+                errors=[str(exc)],
+                execution_time=perf_counter() - start,
+                profiling=None,
+                symbol_table={},
+            )
+
+    def _analyze(self) -> Optional[OptimizationReport]:
+        execution = self.execution
+        try:
+            return optilang.analyze(self.ast, execution.profiling, execution.symbol_table)
+        except OptiLangError as exc:
+            logger.info("Optimization skipped: %s", exc)
+            return None
+
+    def _score(self) -> Any:
+        execution = self.execution
+        return optilang.calculate_score(
+            profiling_data=execution.profiling.to_dict() if execution.profiling else None,
+            optimizer_report=self.optimization_report,
+            source_lines=max(1, len(self.code.splitlines())),
+            errors=execution.errors,
+        )
+
+
+class JobCancelled(Exception):
+    """Raised by ``run_pipeline`` when its cancel flag was set during the run."""
+
+
+class CapturingExecutor(Executor):
+    """
+    Executor that writes ``print`` output to an ``OutputCapture``, so a
+    program that prints in a loop cannot grow the worker without bound,
+    and binds ``inputs`` as globals before the program runs.
+
+    With a ``cancel`` event (see ``ExecutionPool.open_flag``) the run stops
+    within ``cancel_poll`` seconds of it being set.
+    """
+
+    def __init__(
+        self,
+        capture: OutputCapture,
+        inputs: Optional[Dict[str, Any]] = None,
+        cancel: Optional[Any] = None,
+        cancel_poll: float = 0.05,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.capture = capture
+        self.cancel = cancel
+        self.cancel_poll = cancel_poll
+        self._next_cancel_check = 0.0
+        for name, value in (inputs or {}).items():
+            # Copied so one program cannot change another's inputs
+            self.globals.define(name, copy.deepcopy(value))
+
+    def _builtin_print(self, *args: Any) -> None:
+        self.capture.write(" ".join(str(arg) for arg in args) + "\n")
+
+    def _execute_statement(self, node: Any, env: Any) -> None:
+        if self.cancel is not None:
+            # A manager event costs a round trip to read, so poll it on a clock
+            now = perf_counter()
+            if now >= self._next_cancel_check:
+                self._next_cancel_check = now + self.cancel_poll
+                if self.cancel.is_set():
+                    # Not an OptiLang error, so the program's try blocks cannot catch it
+                    raise JobCancelled()
+        super()._execute_statement(node, env)
+
+    def run(self, program: ProgramNode) -> ExecutionResult:
+        try:
+            result = super().run(program)
+        finally:
+            self.capture.close()
+        result.output = self.capture.render()
+        return result
+
+
+def run_pipeline(
+    code: str,
+    timeout: float,
+    enable_profiling: bool,
+    stages: Iterable[str],
+    inputs: Optional[Dict[str, Any]] = None,
+    profiling_tier: Optional[str] = None,
+    cancel: Optional[Any] = None,
+    cancel_poll: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Pool job: run the pipeline for ``stages`` and return them serialized.
+
+    ``execution`` is always included. Asking for ``score_report`` also
+    returns ``suggestions``, since the optimizer report is computed anyway.
+    ``inputs`` are bound as global variables before the program runs, and
+    ``profiling_tier`` picks how much the profiler records. Setting the
+    ``cancel`` event stops the run and raises ``JobCancelled``.
+    Output beyond ``output_max_memory_bytes`` is returned as head and tail
+    around a truncation marker, with the whole of it spilled to a file
+    ``output_id`` names (see ``app.core.output``).
+    ``sizes`` holds the encoded length of each stage for the result cache,
+    ``timings`` the seconds spent per pipeline stage and in serialization,
+    ``intervals`` when each of those started and ended, and ``cacheable``
+    is False when the run hit its timeout, whose outcome depends on
+    machine load rather than on the source. The symbol table is
+    returned as bounded previews; when one is truncated, the full table is
+    stored under ``symbol_table_id`` for ``/variables/{name}`` to read.
+    """
+    if cancel is not None and cancel.is_set():
+        raise JobCancelled()  # cancelled while queued for a worker
+    cpu_start = thread_time()
+    stages = set(stages)
+    capture = OutputCapture.from_settings()
+    factory = partial(CapturingExecutor, capture, inputs, cancel, cancel_poll)
+    pipeline = AnalysisPipeline(
+        code,
+        timeout,
+        enable_profiling,
+        executor_factory=factory,
+        profiling_tier=profiling_tier,
+    )
+    result = pipeline.execution
+    if cancel is not None and cancel.is_set():
+        raise JobCancelled()
+    wants_report = bool(stages & {"suggestions", "score_report"})
+    report = pipeline.optimization_report if wants_report else None
+    score = pipeline.score_report if "score_report" in stages else None
+
+    serialize_started_at = time()
+    serialize_start = perf_counter()
+    symbol_table, symbol_info = preview_symbol_table(result.symbol_table)
+    payload: Dict[str, Any] = {
+        "execution": {
+            "success": len(result.errors) == 0,
+            "output": result.output,
+            **capture.summary(),
+            "errors": result.errors,
+            "execution_time": result.execution_time,
+            "profiling": serialize_profiling(result.profiling),
+            "symbol_table": symbol_table,
+            "symbol_info": symbol_info,
+            "symbol_table_id": store_symbol_table(result.symbol_table, symbol_info),
+        }
+    }
+    if wants_report:
+        payload["suggestions"] = serialize_suggestions(report)
+    if "score_report" in stages:
+        payload["score_report"] = serialize_score_report(score)
+    sizes = {
+        name: len(json.dumps(value, separators=(",", ":"), default=str))
+        for name, value in payload.items()
+    }
+    serialize_seconds = perf_counter() - serialize_start
+    timings = {**pipeline.timings, "serialize": serialize_seconds}
+    intervals = {
+        **pipeline.intervals,
+        "serialize": (serialize_started_at, serialize_started_at + serialize_seconds),
+    }
+    # CPU time this run cost, for accounting; cache hits report zero
+    payload["execution"]["cpu_time"] = thread_time() - cpu_start
+
+    return {
+        "stages": payload,
+        "sizes": sizes,
+        "timings": timings,
+        "intervals": intervals,
+        "cacheable": result.execution_time < timeout,
+    }
+
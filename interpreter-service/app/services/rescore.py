@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import fields
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import optilang
+
+from app.core.config import settings
+from app.core.execution import execution_pool
+from app.core.serialization import serialize_score_report
+from app.schemas.requests import RescoreRequest
+from app.services.batch import score_distribution
+
+logger = logging.getLogger(__name__)
+
+# Fields the engine's Suggestion takes; stored ones may carry more
+SUGGESTION_FIELDS = tuple(f.name for f in fields(optilang.Suggestion))
+
+ChunkResult = List[Tuple[Optional[Dict[str, Any]], Optional[str]]]
+
+
+def score_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialized score report of one stored result, as ``AnalysisPipeline`` would score it."""
+    suggestions = item["suggestions"]
+    report = None
+    if suggestions is not None:
+        report = optilang.OptimizationReport(
+            suggestions=[
+                optilang.Suggestion(**{name: s[name] for name in SUGGESTION_FIELDS})
+                for s in suggestions
+            ]
+        )
+    return serialize_score_report(
+        optilang.calculate_score(
+            profiling_data=item["profiling"],
+            optimizer_report=report,
+            source_lines=item["source_lines"],
+            errors=item["errors"],
+        )
+    )
+
+
+def rescore_chunk(items: List[Dict[str, Any]]) -> ChunkResult:
+    """Score ``items`` in one pool job; an item the scorer rejects fails alone."""
+    results: ChunkResult = []
+    for item in items:
+        try:
+            results.append((score_item(item), None))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            results.append((None, f"Score error: {exc}"))
+    return results
+
+
+async def rescore_batch(request: RescoreRequest) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Score stored results again with the installed engine and yield one
+    ``item`` result per request item, followed by a ``summary``.
+
+    Identical items (a resubmitted program yields the same profiling and
+    suggestions) are scored once. The distinct ones are scored
+    ``rescore_chunk_size`` to a pool job, since a score takes far less
+    time than a round trip to a worker; at most ``batch_max_concurrency``
+    chunks hold workers at once. Results stream as chunks finish.
+    """
+    started = perf_counter()
+    payloads: List[Dict[str, Any]] = []
+    groups: List[List[int]] = []  # request indices sharing each payload
+    positions: Dict[str, int] = {}
+    for index, item in enumerate(request.items):
+        payload = item.model_dump(exclude={"id"})
+        key = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        if key not in positions:
+            positions[key] = len(payloads)
+            payloads.append(payload)
+            groups.append([])
+        groups[positions[key]].append(index)
+
+    size = max(1, settings.rescore_chunk_size)
+    limit = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+
+    async def run_chunk(start: int) -> Tuple[int, ChunkResult]:
+        chunk = payloads[start : start + size]
+        async with limit:
+            try:
+                return start, await execution_pool.run(rescore_chunk, chunk)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                logger.error("Rescore chunk at %s failed: %s", start, exc, exc_info=True)
+                return start, [(None, f"Score error: {exc}")] * len(chunk)
+
+    tasks = [asyncio.ensure_future(run_chunk(start)) for start in range(0, len(payloads), size)]
+    scores: List[float] = []
+    grades: Dict[str, int] = {}
+    failed = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            start, results = await finished
+            for offset, (report, error) in enumerate(results):
+                for rank, index in enumerate(groups[start + offset]):
+                    item = request.items[index]
+                    if report is None:
+                        failed += 1
+                    else:
+                        scores.append(report["score"])
+                        grades[report["grade"]] = grades.get(report["grade"], 0) + 1
+                    yield {
+                        "type": "item",
+                        "index": index,
+                        "id": item.id if item.id is not None else str(index),
+                        "success": report is not None,
+                        "score_report": report,
+                        "error": error,
+                        "deduplicated": rank > 0,
+                    }
+        yield {
+            "type": "summary",
+            "count": len(request.items),
+            "distinct": len(payloads),
+            "failed": failed,
+            "scores": score_distribution(scores, grades),
+            "wall_time": round(perf_counter() - started, 6),
+        }
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+from app.core.cache import result_cache, result_cache_key
+from app.core.config import settings
+from app.core.execution import execution_pool
+from app.core.metrics import PEAK_MEMORY, STAGE_LATENCY, TIMEOUTS
+from app.core.profiling import default_tier
+from app.core.singleflight import SingleFlight
+from app.core.tracing import tracer
+from app.services.pipeline import run_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Identical submissions in flight at once share one pipeline run
+pipeline_flights: SingleFlight[Dict[str, Any]] = SingleFlight()
+
+
+def _mark_cached(stages: Dict[str, Any]) -> Dict[str, Any]:
+    # Cached timings describe the original run, not this request
+    served = dict(stages)
+    execution = served.get("execution")
+    if execution is not None:
+        served["execution"] = {**execution, "cpu_time": 0.0, "cached": True}
+        if execution.get("profiling") is not None:
+            served["execution"]["profiling"] = {**execution["profiling"], "cached": True}
+    return served
+
+
+def _record(outcome: Dict[str, Any]) -> None:
+    for stage, seconds in outcome["timings"].items():
+        STAGE_LATENCY.observe(seconds, stage)
+    # Stages ran in a pool worker; replay them as spans of this request
+    for stage, (start, end) in outcome["intervals"].items():
+        tracer.record(f"pipeline.{stage}", start, end)
+    if not outcome["cacheable"]:
+        TIMEOUTS.inc("interpreter")
+    profiling = outcome["stages"]["execution"]["profiling"]
+    if profiling is not None:
+        PEAK_MEMORY.observe(profiling["peak_memory_bytes"])
+
+
+async def run_stages(
+    code: str,
+    timeout: float,
+    enable_profiling: bool,
+    stages: Sequence[str],
+    inputs: Optional[Dict[str, Any]] = None,
+    profiling_tier: Optional[str] = None,
+    cancel: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Return the serialized pipeline ``stages`` for a submission, serving them
+    from the result cache when an identical submission already produced them
+    and running the pipeline on the execution pool otherwise. Concurrent
+    identical submissions share one run (see ``pipeline_flights``); those
+    that joined another's run are marked like cache hits.
+    ``profiling_tier``, when given, overrides ``enable_profiling``.
+    Setting ``cancel`` (from ``execution_pool.open_flag``) stops the run
+    and raises ``JobCancelled``.
+    """
+    if profiling_tier is not None:
+        enable_profiling = profiling_tier != "off"
+    # The engine defaults are a tier too; both spellings share cache entries
+    profiling_tier = profiling_tier or default_tier(enable_profiling)
+    with tracer.span("pipeline", stages=",".join(stages)) as span:
+        key = result_cache_key(code, timeout, enable_profiling, inputs, profiling_tier)
+        entry = result_cache.get(
+            key, accept=lambda cached: all(stage in cached["stages"] for stage in stages)
+        )
+        if span is not None:
+            span.attributes["cached"] = entry is not None
+        if entry is not None:
+            logger.debug("Result cache hit: %s", key[:12])
+            return _mark_cached(entry["stages"])
+
+        async def run() -> Dict[str, Any]:
+            outcome = await execution_pool.run(
+                run_pipeline,
+                code,
+                timeout,
+                enable_profiling,
+                tuple(stages),
+                inputs,
+                profiling_tier,
+                cancel,
+                settings.jobs_cancel_poll_ms / 1000,
+                time_limit=timeout,
+            )
+
+            _record(outcome)
+            if outcome["cacheable"]:
+                previous = result_cache.peek(key) or {"stages": {}, "sizes": {}}
+                merged = {
+                    "stages": {**previous["stages"], **outcome["stages"]},
+                    "sizes": {**previous["sizes"], **outcome["sizes"]},
+                }
+                result_cache.set(key, merged, size=sum(merged["sizes"].values()))
+            return outcome["stages"]
+
+        # A cancellable run is not shared: cancelling it would fail the others
+        if cancel is not None or not settings.singleflight_enabled:
+            return await run()
+        wanted = set(stages)
+        served, joined = await pipeline_flights.do(
+            key, run, covers=wanted, accept=lambda covered: wanted <= covered
+        )
+        if span is not None:
+            span.attributes["coalesced"] = joined
+        if joined:
+            logger.debug("Joined in-flight run: %s", key[:12])
+            return _mark_cached(served)
+        return served
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import optilang
+from optilang.analysis.semantic_analyzer import SemanticAnalyzer
+from optilang.core.ast_nodes import ProgramNode
+from optilang.utils.errors import OptiLangError
+
+from app.core.cache import artifact_index
+from app.core.execution import execution_pool
+from app.core.fingerprint import Fingerprint, canonicalize, localize, localize_line
+from app.core.serialization import serialize_suggestions
+from app.services.pipeline import AnalysisPipeline
+
+logger = logging.getLogger(__name__)
+
+STATIC_REPORT = "static_report"  # artifact kind: semantic errors plus profiling-free suggestions
+
+# Detectors that only report from measured line counts and function times
+RUNTIME_ONLY_PATTERNS = ("hot_loop", "expensive_calls")
+# Detectors that also run without profiling but use it, when present, to
+# drop cold findings or rate severity by execution count
+RUNTIME_DEPENDENT_PATTERNS = frozenset(
+    {"loop_invariant", "string_concat_loop", "nested_loops", "repeated_computation"}
+)
+
+
+def fingerprint_job(
+    code: str,
+) -> Tuple[Optional[Fingerprint], Optional[ProgramNode], List[str]]:
+    """
+    Fingerprint of ``code`` and its canonical program, or None, None and
+    the lexer/parser error.
+    """
+    try:
+        program = AnalysisPipeline(code).ast
+    except OptiLangError as exc:
+        return None, None, [str(exc)]
+    return canonicalize(program), program, []
+
+
+def static_report_job(program: ProgramNode) -> Dict[str, Any]:
+    """
+    Static analysis of a canonical program from ``fingerprint_job``: names
+    and lines are the fingerprint's, so the artifact holds for every
+    program sharing it.
+    """
+    errors: List[str] = []
+    try:
+        SemanticAnalyzer().analyze(program)
+    except OptiLangError as exc:
+        errors.append(str(exc))
+    # No symbol table rather than an empty one: detectors then fall back to
+    # scanning the AST instead of finding no variables defined
+    try:
+        suggestions = serialize_suggestions(optilang.analyze(program, None, None))
+    except OptiLangError as exc:
+        logger.info("Optimization skipped: %s", exc)
+        suggestions = []
+    for suggestion in suggestions:
+        suggestion["requires_runtime"] = suggestion["pattern"] in RUNTIME_DEPENDENT_PATTERNS
+    return {"errors": errors, "suggestions": suggestions}
+
+
+def localize_artifact(artifact: Dict[str, Any], fingerprint: Fingerprint) -> Dict[str, Any]:
+    """``artifact`` in terms of the program behind ``fingerprint``."""
+    return {
+        "errors": [localize(error, fingerprint) for error in artifact["errors"]],
+        "suggestions": [
+            {
+                **suggestion,
+                "line": localize_line(suggestion["line"], fingerprint),
+                "description": localize(suggestion["description"], fingerprint),
+                "suggestion": localize(suggestion["suggestion"], fingerprint),
+            }
+            for suggestion in artifact["suggestions"]
+        ],
+    }
+
+
+async def static_report(code: str) -> Dict[str, Any]:
+    """
+    Semantic errors and optimizer suggestions for ``code`` without running it.
+
+    The report is looked up in the artifact index by AST fingerprint, so
+    resubmissions differing only in whitespace, comments or local names
+    reuse one analysis; ``reused`` says whether this one did. Only static
+    reports are indexed: a runtime report depends on the run's timings.
+    The source is parsed once; on a miss the analysis job is handed the
+    canonical program the fingerprint was taken from.
+    """
+    fingerprint, program, errors = await execution_pool.run(fingerprint_job, code)
+    if fingerprint is None:
+        return {
+            "success": False,
+            "errors": errors,
+            "suggestions": [],
+            "fingerprint": None,
+            "reused": False,
+        }
+    key = (STATIC_REPORT, fingerprint.digest)
+    artifact = artifact_index.get(key)
+    reused = artifact is not None
+    if artifact is None:
+        artifact = await execution_pool.run(static_report_job, program)
+        artifact_index.set(key, artifact, size=len(json.dumps(artifact)))
+    report = localize_artifact(artifact, fingerprint)
+    return {
+        "success": not report["errors"],
+        **report,
+        "fingerprint": fingerprint.digest,
+        "reused": reused,
+    }
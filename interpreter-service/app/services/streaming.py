@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.execution import StreamChannel, execution_pool
+from app.core.serialization import (
+    preview_symbol_table,
+    serialize_profiling,
+    serialize_score_report,
+    serialize_suggestions,
+)
+from app.core.symbols import store_symbol_table
+from app.services.pipeline import AnalysisPipeline
+from optilang.runtime.executor import Executor
+
+logger = logging.getLogger(__name__)
+
+FINAL_EVENTS = ("result", "error")
+PUT_POLL_SECONDS = 0.1
+GET_POLL_SECONDS = 0.1
+HOT_LINES = 5
+
+
+class StreamCancelled(Exception):
+    """Raised inside a streaming run once its reader has gone away."""
+
+
+class OutputLimitExceeded(Exception):
+    """
+    Raised inside a streaming run whose output passed its cap. Not an
+    OptiLang error, so the program's try blocks cannot catch it.
+    """
+
+
+class StreamingExecutor(Executor):
+    """
+    Executor that forwards ``print`` output to a ``StreamChannel`` instead of
+    accumulating it.
+
+    Output is coalesced into ``stdout`` frames of about ``chunk_bytes`` or
+    every ``flush_interval`` seconds, and a ``progress`` frame with the
+    statement count and hottest lines so far is sent every
+    ``progress_interval`` seconds. Sending blocks while the channel is full,
+    so a slow reader slows the program down (and may run it into its
+    timeout) rather than growing a buffer. Output beyond
+    ``max_output_bytes`` stops the run with ``OutputLimitExceeded``.
+    """
+
+    def __init__(
+        self,
+        channel: StreamChannel,
+        max_output_bytes: int,
+        chunk_bytes: int,
+        flush_interval: float,
+        progress_interval: float,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.channel = channel
+        self.max_output_bytes = max_output_bytes
+        self.chunk_bytes = chunk_bytes
+        self.flush_interval = flush_interval
+        self.progress_interval = progress_interval
+        self.output_bytes = 0
+        self.truncated = False
+        self.statements = 0
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._next_flush = 0.0
+        self._next_progress = 0.0
+        self._line: Optional[int] = None
+
+    # ── Executor hooks ──
+
+    def _builtin_print(self, *args: Any) -> None:
+        text = " ".join(str(arg) for arg in args) + "\n"
+        size = len(text.encode("utf-8"))
+        if self.output_bytes + size > self.max_output_bytes:
+            room = self.max_output_bytes - self.output_bytes
+            if room > 0:
+                self._pending.append(text.encode("utf-8")[:room].decode("utf-8", "ignore"))
+                self.output_bytes += room
+            self.truncated = True
+            self.flush()
+            raise OutputLimitExceeded(f"Output limit of {self.max_output_bytes} bytes exceeded")
+
+        self.output_bytes += size
+        self._pending.append(text)
+        self._pending_bytes += size
+        if self._pending_bytes >= self.chunk_bytes:
+            self.flush()
+
+    def _execute_statement(self, node: Any, env: Any) -> None:
+        self.statements += 1
+        self._line = getattr(node, "line", self._line)
+        now = perf_counter()
+        if now >= self._next_flush:
+            self._next_flush = now + self.flush_interval
+            if self.channel.cancelled:
+                raise StreamCancelled()
+            self.flush()
+        if now >= self._next_progress:
+            self._next_progress = now + self.progress_interval
+            self.send({"event": "progress", "data": self._progress(now)})
+        super()._execute_statement(node, env)
+
+    # ── Frames ──
+
+    def _progress(self, now: float) -> Dict[str, Any]:
+        progress: Dict[str, Any] = {
+            "elapsed_ms": round((now - self._start_time) * 1000, 3),
+            "statements_executed": self.statements,
+            "current_line": self._line,
+            "output_bytes": self.output_bytes,
+        }
+        if self.profiler is not None:
+            progress["hot_lines"] = [
+                {
+                    "line": stats.line_number,
+                    "count": stats.execution_count,
+                    "total_time_ms": round(stats.total_time_ms, 3),
+                }
+                for stats in self.profiler.get_hottest_lines(HOT_LINES)
+            ]
+        return progress
+
+    def drain(self) -> Optional[Dict[str, Any]]:
+        """Take the output not yet sent as a ``stdout`` frame."""
+        if not self._pending:
+            return None
+        text = "".join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        return {"event": "stdout", "data": {"text": text}}
+
+    def flush(self) -> None:
+        frame = self.drain()
+        if frame is not None:
+            self.send(frame)
+
+    def send(self, frame: Dict[str, Any]) -> None:
+        while not self.channel.put(frame, timeout=PUT_POLL_SECONDS):
+            if self.channel.cancelled:
+                raise StreamCancelled()
+            self._check_timeout()
+
+
+def _send_final(channel: StreamChannel, frame: Dict[str, Any]) -> None:
+    # After the run the program's timeout no longer applies; only a reader
+    # that has gone away stops the send.
+    while not channel.put(frame, timeout=PUT_POLL_SECONDS):
+        if channel.cancelled:
+            return
+
+
+def stream_limits() -> Dict[str, Any]:
+    """``StreamingExecutor`` options from settings, read where the request is served."""
+    return {
+        "max_output_bytes": settings.stream_max_output_bytes,
+        "chunk_bytes": settings.stream_chunk_bytes,
+        "flush_interval": settings.stream_flush_interval_ms / 1000,
+        "progress_interval": settings.stream_progress_interval_ms / 1000,
+    }
+
+
+def run_streaming(
+    code: str,
+    timeout: float,
+    enable_profiling: bool,
+    include_score: bool,
+    channel: StreamChannel,
+    limits: Dict[str, Any],
+    profiling_tier: Optional[str] = None,
+) -> None:
+    """
+    Pool job: execute ``code`` while streaming its output to ``channel``,
+    then send a ``result`` frame (or an ``error`` frame if the job fails).
+    """
+    executors: List[StreamingExecutor] = []
+
+    def factory(**kwargs: Any) -> StreamingExecutor:
+        executor = StreamingExecutor(channel, **limits, **kwargs)
+        executors.append(executor)
+        return executor
+
+    try:
+        pipeline = AnalysisPipeline(
+            code,
+            timeout,
+            enable_profiling,
+            executor_factory=factory,
+            profiling_tier=profiling_tier,
+        )
+        result = pipeline.execution
+        streamer = executors[0] if executors else None
+        tail = streamer.drain() if streamer is not None else None
+        if tail is not None:
+            _send_final(channel, tail)
+        if channel.cancelled:
+            return
+
+        symbol_table, symbol_info = preview_symbol_table(result.symbol_table)
+        payload: Dict[str, Any] = {
+            "success": len(result.errors) == 0,
+            "errors": result.errors,
+            "execution_time": result.execution_time,
+            "output_bytes": streamer.output_bytes if streamer else 0,
+            "truncated": streamer.truncated if streamer else False,
+            "profiling": serialize_profiling(result.profiling),
+            "symbol_table": symbol_table,
+            "symbol_info": symbol_info,
+            "symbol_table_id": store_symbol_table(result.symbol_table, symbol_info),
+        }
+        if include_score:
+            payload["suggestions"] = serialize_suggestions(pipeline.optimization_report)
+            payload["score_report"] = serialize_score_report(pipeline.score_report)
+        _send_final(channel, {"event": "result", "data": payload})
+    except StreamCancelled:
+        return
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        logger.error("Streaming execution failed: %s", exc, exc_info=True)
+        _send_final(channel, {"event": "error", "data": {"detail": f"Execution error: {exc}"}})
+
+
+async def stream_execution(
+    code: str,
+    timeout: float,
+    enable_profiling: bool,
+    include_score: bool,
+    profiling_tier: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run ``code`` on the execution pool and yield its frames as they arrive,
+    ending with a ``result`` or ``error`` frame. Closing the iterator early
+    (e.g. on client disconnect) cancels the run.
+    """
+    channel = execution_pool.open_channel(settings.stream_queue_frames)
+    job = asyncio.ensure_future(
+        execution_pool.run(
+            run_streaming,
+            code,
+            timeout,
+            enable_profiling,
+            include_score,
+            channel,
+            stream_limits(),
+            profiling_tier,
+            time_limit=timeout,
+        )
+    )
+    # Failures surface as frames; keep the task from logging them again
+    job.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    try:
+        while True:
+            frame = await run_in_threadpool(channel.get, GET_POLL_SECONDS)
+            if frame is None and job.done():
+                # The result may have landed between the poll and the check
+                frame = channel.get(0) or _lost_frame(job)
+            if frame is None:
+                continue
+            yield frame
+            if frame["event"] in FINAL_EVENTS:
+                break
+    finally:
+        channel.cancel()
+
+
+def _lost_frame(job: "asyncio.Future[Any]") -> Dict[str, Any]:
+    # The job ended without a final frame, e.g. its sandbox worker was killed
+    error = job.exception() if not job.cancelled() else None
+    detail = f"Execution error: {error}" if error else "Execution ended without a result"
+    return {"event": "error", "data": {"detail": detail}}
+
+
+def encode_sse(event: str, data: str) -> bytes:
+    """Encode one Server-Sent Events message whose data is a JSON document."""
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
@@ -0,0 +1,88 @@
+"""
+Microbenchmark: execution time of each profiling tier against no profiling.
+
+Parses every program in ``benchmarks.corpus`` once and executes it under
+each tier of ``app.core.profiling``, reporting the best time per tier and
+its overhead over ``off``. Tiers are interleaved within each repeat so
+machine noise spreads evenly across them.
+
+    cd interpreter-service
+    python -m benchmarks.bench_profiling [--repeat 7] [--programs loops,big_lists]
+        [--tiers off,functions,full_memory] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from time import perf_counter
+from typing import Any, Dict, List
+
+from app.core.profiling import PROFILING_TIERS, make_profiler
+from benchmarks.corpus import CORPUS
+from optilang.lexer import tokenize
+from optilang.parser import parse
+from optilang.runtime.executor import Executor
+
+
+def run_once(program: Any, tier: str) -> float:
+    profiler = make_profiler(tier)
+    executor = Executor(timeout_seconds=0, profiler=profiler, enable_profiling=profiler is not None)
+    start = perf_counter()
+    executor.run(program)
+    return perf_counter() - start
+
+
+def run(programs: List[str], tiers: List[str], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for name in programs:
+        program = parse(tokenize(CORPUS[name]))
+        best = {tier: float("inf") for tier in tiers}
+        for _ in range(repeat):
+            for tier in tiers:
+                best[tier] = min(best[tier], run_once(program, tier))
+        baseline = best.get("off")
+        for tier in tiers:
+            results.append(
+                {
+                    "program": name,
+                    "tier": tier,
+                    "best_ms": round(best[tier] * 1000, 3),
+                    "overhead": round(best[tier] / baseline, 2) if baseline else None,
+                }
+            )
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--programs", default=",".join(CORPUS), help="comma-separated corpus entries")
+    parser.add_argument("--tiers", default=",".join(PROFILING_TIERS), help="comma-separated tiers")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    programs = args.programs.split(",")
+    tiers = args.tiers.split(",")
+    for name in programs:
+        if name not in CORPUS:
+            raise SystemExit(f"unknown program {name!r}; expected one of {', '.join(CORPUS)}")
+    for tier in tiers:
+        if tier not in PROFILING_TIERS:
+            raise SystemExit(f"unknown tier {tier!r}; expected one of {', '.join(PROFILING_TIERS)}")
+
+    results = run(programs, tiers, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'program':<14}{'tier':<15}{'best ms':>10}{'overhead':>10}")
+    for row in results:
+        overhead = f"{row['overhead']:.2f}x" if row["overhead"] is not None else "-"
+        print(f"{row['program']:<14}{row['tier']:<15}{row['best_ms']:>10.3f}{overhead:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
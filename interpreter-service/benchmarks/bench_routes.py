@@ -0,0 +1,313 @@
+"""
+Route benchmark: latency percentiles, throughput and RSS per route and concurrency.
+
+Drives every analysis route with the programs in ``benchmarks.corpus``,
+either in-process through the ASGI app or over HTTP against a running
+server, and writes the results as JSON so two commits can be compared.
+
+    cd interpreter-service
+    python -m benchmarks.bench_routes [--mode inprocess|http] [--concurrency 1,4,16]
+        [--requests 40] [--routes execute,analyze] [--output results.json]
+        [--baseline previous.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from itertools import count
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import CORPUS
+
+ROUTES = ("tokenize", "parse", "execute", "profile", "optimize", "score", "analyze")
+
+# Numbers every request in a run; with the run's start time it makes each
+# program unique so nothing is served from a previous level's (or run's) cache.
+_unique = count()
+_RUN = os.getpid() ^ int(perf_counter() * 1e6)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Linear-interpolated percentile of ``samples`` (0 <= q <= 100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _status_kb(pid: int, field: str) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid: int) -> List[int]:
+    children: List[int] = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children", encoding="ascii") as handle:
+                children += [int(child) for child in handle.read().split()]
+    except OSError:
+        pass
+    return children
+
+
+def rss_mb(pid: int) -> Dict[str, float]:
+    """Resident and peak memory of ``pid``, plus its worker processes (Linux only)."""
+    workers = _children(pid)
+    return {
+        "rss_mb": round(_status_kb(pid, "VmRSS") / 1024, 1),
+        "peak_rss_mb": round(_status_kb(pid, "VmHWM") / 1024, 1),
+        "workers_rss_mb": round(sum(_status_kb(child, "VmRSS") for child in workers) / 1024, 1),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    route: str,
+    program: str,
+    concurrency: int,
+    requests: int,
+    cache: bool,
+) -> Dict[str, Any]:
+    """Send ``requests`` calls to ``route`` with at most ``concurrency`` in flight."""
+    sequence = count()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def worker() -> None:
+        while True:
+            index = next(sequence)
+            if index >= requests:
+                return
+            # A unique trailing comment defeats the result cache unless asked
+            code = program if cache else f"{program}# bench {_RUN} {next(_unique)}\n"
+            payload: Dict[str, Any] = {"code": code}
+            if route in ("execute", "analyze"):
+                payload["enable_profiling"] = True
+            started = perf_counter()
+            try:
+                response = await client.post(
+                    f"/{route}",
+                    json=payload,
+                    headers={"X-User-Id": f"bench-{index}"},
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(perf_counter() - started)
+            if status != "200":
+                errors[status] = errors.get(status, 0) + 1
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - started
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run(
+    client: httpx.AsyncClient,
+    routes: List[str],
+    programs: List[str],
+    levels: List[int],
+    requests: int,
+    cache: bool,
+    pid: Optional[int],
+) -> List[Dict[str, Any]]:
+    results = []
+    for route in routes:
+        for name in programs:
+            # One untimed call warms the lexer/parser caches and pool workers
+            await client.post(f"/{route}", json={"code": CORPUS[name]})
+            for concurrency in levels:
+                row: Dict[str, Any] = {
+                    "route": route,
+                    "program": name,
+                    "concurrency": concurrency,
+                }
+                row.update(await _drive(client, route, CORPUS[name], concurrency, requests, cache))
+                if pid is not None:
+                    row.update(rss_mb(pid))
+                results.append(row)
+                print(
+                    f"{route:<10}{name:<14}{concurrency:>4}{row['p50_ms']:>10.1f}"
+                    f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+                    f"{row['throughput_rps']:>9.1f}{sum(row['errors'].values()):>6}"
+                    + (f"{row['rss_mb']:>9.1f}" if "rss_mb" in row else ""),
+                    file=sys.stderr,
+                )
+    return results
+
+
+def _inprocess_client(admission: bool) -> httpx.AsyncClient:
+    from app.core.config import settings
+    from app.core.execution import execution_pool
+    from app.main import app
+
+    # The harness is a single caller; per-user limits would only measure 429s
+    settings.rate_limit_per_minute = 1_000_000
+    settings.rate_limit_endpoint_overrides = {}
+    settings.admission_enabled = admission
+    execution_pool.start()
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        headers={"X-Internal-Service-Secret": settings.internal_api_secret},
+        timeout=120,
+    )
+
+
+def _meta(args: argparse.Namespace) -> Dict[str, Any]:
+    meta: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "mode": args.mode,
+        "requests": args.requests,
+        "cache": args.cache,
+    }
+    try:
+        import optilang
+
+        meta["optilang"] = getattr(optilang, "__version__", None)
+    except ImportError:
+        meta["optilang"] = None
+    if args.mode == "inprocess":
+        from app.core.config import settings
+
+        meta["backend"] = settings.execution_backend
+        meta["workers"] = settings.execution_workers
+        meta["admission"] = args.admission
+    else:
+        meta["url"] = args.url
+    return meta
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    """Print the p95 and throughput ratio of each row against a previous run."""
+    previous = {
+        (row["route"], row["program"], row["concurrency"]): row
+        for row in baseline.get("results", [])
+    }
+    print(f"\nagainst {baseline.get('meta', {}).get('commit')}:", file=sys.stderr)
+    for row in results:
+        old = previous.get((row["route"], row["program"], row["concurrency"]))
+        if old is None or not old["p95_ms"] or not old["throughput_rps"]:
+            continue
+        print(
+            f"{row['route']:<10}{row['program']:<14}{row['concurrency']:>4}"
+            f"  p95 x{row['p95_ms'] / old['p95_ms']:.2f}"
+            f"  rps x{row['throughput_rps'] / old['throughput_rps']:.2f}",
+            file=sys.stderr,
+        )
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    routes = args.routes.split(",")
+    programs = args.programs.split(",")
+    for route in routes:
+        if route not in ROUTES:
+            raise SystemExit(f"unknown route {route!r}; expected one of {', '.join(ROUTES)}")
+    for name in programs:
+        if name not in CORPUS:
+            raise SystemExit(f"unknown program {name!r}; expected one of {', '.join(CORPUS)}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    if args.mode == "inprocess":
+        client = _inprocess_client(args.admission)
+        pid: Optional[int] = os.getpid()
+    else:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            headers={"X-Internal-Service-Secret": args.secret},
+            timeout=120,
+            limits=httpx.Limits(max_connections=max(levels)),
+        )
+        pid = args.server_pid
+
+    print(
+        f"{'route':<10}{'program':<14}{'conc':>4}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'rps':>9}{'errs':>6}" + (f"{'rss MB':>9}" if pid else ""),
+        file=sys.stderr,
+    )
+    async with client:
+        results = await run(client, routes, programs, levels, args.requests, args.cache, pid)
+    return {"meta": _meta(args), "results": results}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("inprocess", "http"), default="inprocess")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server for --mode http")
+    parser.add_argument(
+        "--secret",
+        default=os.environ.get("INTERNAL_API_SECRET", "change-this-interpreter-secret-in-production"),
+        help="X-Internal-Service-Secret for --mode http",
+    )
+    parser.add_argument("--server-pid", type=int, help="server process to sample RSS from (http mode)")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated routes")
+    parser.add_argument("--programs", default=",".join(CORPUS), help="comma-separated corpus entries")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated in-flight levels")
+    parser.add_argument("--requests", type=int, default=40, help="requests per route/program/level")
+    parser.add_argument("--cache", action="store_true", help="repeat identical code (measure cache hits)")
+    parser.add_argument("--admission", action="store_true", help="keep admission control on (in-process)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="a previous JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    # Per-request INFO logs would dominate the in-process timings
+    logging.disable(logging.INFO)
+    report = asyncio.run(_main(args))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            compare(report["results"], json.load(handle))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
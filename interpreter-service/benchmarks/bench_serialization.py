@@ -0,0 +1,137 @@
+"""
+Microbenchmark: compiled ``to_json_safe`` against the original recursive one.
+
+Generates programs of increasing size, parses them once and times both
+serializers on the resulting AST and on a symbol table of nested values.
+
+    cd interpreter-service
+    python -m benchmarks.bench_serialization [--repeat 5] [--sizes 50,200,800]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Mapping
+
+from app.core.serialization import to_json_safe
+from optilang.lexer import tokenize
+from optilang.parser import parse
+
+
+def legacy_to_json_safe(value: Any) -> Any:
+    """The recursive implementation ``to_json_safe`` replaced."""
+    if is_dataclass(value):
+        payload = {"node_type": type(value).__name__}
+        for field in fields(value):
+            payload[field.name] = legacy_to_json_safe(getattr(value, field.name))
+        return payload
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Mapping):
+        return {str(k): legacy_to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [legacy_to_json_safe(item) for item in value]
+    if isinstance(value, set):
+        return [legacy_to_json_safe(item) for item in sorted(value, key=repr)]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def generate_program(functions: int) -> str:
+    """A program with ``functions`` functions, each with loops, branches and calls."""
+    lines: List[str] = []
+    for index in range(functions):
+        lines += [
+            f"def f{index}(n, items):",
+            "    total = 0",
+            "    for i in range(n):",
+            "        if i % 3 == 0 and i > 1:",
+            "            total += items[i % len(items)] * (i + 2) ** 2",
+            "        elif i % 3 == 1:",
+            "            total -= len([i, i + 1, i + 2])",
+            "        else:",
+            '            total += len(str(i) + "x")',
+            "    while total > 100:",
+            "        total = total // 2",
+            "    return {'n': n, 'total': total, 'items': [total, n, -1]}",
+            "",
+        ]
+    lines += [f"r{index} = f{index}({index} + 5, [1, 2, 3])" for index in range(functions)]
+    lines.append("print(r0)")
+    return "\n".join(lines) + "\n"
+
+
+def generate_symbols(count: int) -> Dict[str, Any]:
+    return {
+        f"v{index}": {
+            "numbers": list(range(20)),
+            "nested": [[index, str(index)], {"k": index * 1.5, "flag": index % 2 == 0}],
+            "tags": {"a", "b", str(index)},
+        }
+        for index in range(count)
+    }
+
+
+def best_of(fn: Callable[[Any], Any], value: Any, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn(value)
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        source = generate_program(size)
+        cases = {
+            "ast": parse(tokenize(source)),
+            "symbol_table": generate_symbols(size * 4),
+        }
+        for case, value in cases.items():
+            assert to_json_safe(value) == legacy_to_json_safe(value), case
+            legacy = best_of(legacy_to_json_safe, value, repeat)
+            compiled = best_of(to_json_safe, value, repeat)
+            results.append(
+                {
+                    "case": case,
+                    "size": size,
+                    "source_chars": len(source),
+                    "legacy_ms": round(legacy * 1000, 3),
+                    "compiled_ms": round(compiled * 1000, 3),
+                    "speedup": round(legacy / compiled, 2) if compiled else None,
+                }
+            )
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="50,200,800", help="comma-separated function counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run([int(size) for size in args.sizes.split(",")], args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'case':<14}{'size':>6}{'chars':>9}{'legacy ms':>12}{'compiled ms':>13}{'speedup':>9}")
+    for row in results:
+        print(
+            f"{row['case']:<14}{row['size']:>6}{row['source_chars']:>9}"
+            f"{row['legacy_ms']:>12.3f}{row['compiled_ms']:>13.3f}{row['speedup']:>8.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
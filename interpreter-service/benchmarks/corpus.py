@@ -0,0 +1,73 @@
+"""
+Representative OptiLang programs for the benchmarks.
+
+Each entry stresses one part of the service: the interpreter loop,
+call overhead, string handling, large values in the symbol table and
+serializers, and the parser on deeply nested source.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+
+def _deep_nesting(depth: int) -> str:
+    lines = ["total = 0"]
+    for level in range(depth):
+        lines.append("    " * level + f"if total >= {-level - 1}:")
+    lines.append("    " * depth + "total += 1")
+    expression = "1"
+    for level in range(depth):
+        expression = f"({expression} + {level})"
+    lines.append(f"value = {expression}")
+    lines.append("print(total, value)")
+    return "\n".join(lines) + "\n"
+
+
+CORPUS: Dict[str, str] = {
+    "loops": (
+        "total = 0\n"
+        "for i in range(200):\n"
+        "    for j in range(20):\n"
+        "        if (i + j) % 3 == 0:\n"
+        "            total += i * j\n"
+        "        else:\n"
+        "            total -= 1\n"
+        "print(total)\n"
+    ),
+    "recursion": (
+        "def fib(n):\n"
+        "    if n < 2:\n"
+        "        return n\n"
+        "    return fib(n - 1) + fib(n - 2)\n"
+        "\n"
+        "def depth(n):\n"
+        "    if n == 0:\n"
+        "        return 0\n"
+        "    return 1 + depth(n - 1)\n"
+        "\n"
+        "print(fib(15), depth(60))\n"
+    ),
+    "strings": (
+        "text = \"\"\n"
+        "for i in range(300):\n"
+        "    text = text + str(i) + \",\"\n"
+        "words = []\n"
+        "for i in range(100):\n"
+        "    words.append(\"w\" + str(i * i))\n"
+        "print(len(text), len(words))\n"
+    ),
+    "big_lists": (
+        "items = []\n"
+        "for i in range(2000):\n"
+        "    items.append(i * 2)\n"
+        "squares = []\n"
+        "for x in items:\n"
+        "    squares.append(x * x)\n"
+        "table = {}\n"
+        "for i in range(300):\n"
+        "    table[str(i)] = [i, i + 1, i + 2]\n"
+        "print(len(items), squares[10], len(table))\n"
+    ),
+    "deep_nesting": _deep_nesting(40),
+}
@@ -1,7 +1,11 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.core.admission import admission_controller
 from app.core.config import settings
+from app.core.tracing import InMemoryExporter, tracer
 
 client = TestClient(app)
 client.headers.update(
@@ -61,6 +65,56 @@ def test_optimize_route_returns_optimizer_suggestions_shape() -> None:
     assert payload["suggestion_count"] >= 1
 
 
+def test_static_optimize_route_analyzes_without_running() -> None:
+    # An infinite loop: only a route that never executes the code can answer
+    code = "unused = 42\nwhile True:\n    for j in range(20):\n        x = j * 2\n"
+    response = client.post("/optimize/static", json={"code": code})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["mode"] == "static"
+    assert "hot_loop" in payload["skipped_patterns"]
+    flagged = {s["pattern"]: s["requires_runtime"] for s in payload["suggestions"]}
+    assert flagged["nested_loops"] is True
+    assert flagged["unused_vars"] is False
+
+
+def test_columnar_profiling_format_matches_the_object_format() -> None:
+    code = "def f(n):\n    return n * 2\ntotal = 0\nfor i in range(4):\n    total += f(i)\n"
+    objects = client.post("/profile", json={"code": code}).json()["profiling"]
+    columnar = client.post(
+        "/profile", json={"code": code, "profiling_format": "columnar"}
+    ).json()["profiling"]
+
+    assert columnar["format"] == "columnar"
+    assert columnar["total_lines_executed"] == objects["total_lines_executed"]
+    lines = columnar["line_stats"]
+    assert lines["line"] == sorted(int(line) for line in objects["line_stats"])
+    for index, line in enumerate(lines["line"]):
+        expected = objects["line_stats"][str(line)]
+        assert lines["count"][index] == expected["count"]
+        assert lines["memory_bytes"][index] == expected["memory_bytes"]
+    functions = columnar["function_stats"]
+    assert functions["name"] == ["f"]
+    assert functions["calls"] == [objects["function_stats"]["f"]["calls"]]
+
+
+def test_profiling_tier_overrides_enable_profiling() -> None:
+    code = "total = 0\nfor i in range(20):\n    total += i\nprint(total)\n"
+    sampled = client.post(
+        "/execute",
+        json={"code": code, "enable_profiling": False, "profiling_tier": "sampled_lines"},
+    ).json()
+    off = client.post("/execute", json={"code": code, "profiling_tier": "off"}).json()
+    invalid = client.post("/execute", json={"code": code, "profiling_tier": "everything"})
+
+    assert sampled["output"] == "190"
+    assert sampled["profiling"]["line_sampling_rate"] == 0.1
+    assert sampled["profiling"]["memory_mode"] == "off"
+    assert off["profiling"] is None
+    assert invalid.status_code == 422
+
+
 def test_language_routes_expose_tokens_and_ast() -> None:
     tokenize_response = client.post("/tokenize", json={"code": "x = 1\n"})
     parse_response = client.post("/parse", json={"code": "x = 1\n"})
@@ -90,3 +144,387 @@ def test_interpreter_rejects_requests_without_internal_secret() -> None:
 
     assert response.status_code == 403
     assert response.json()["detail"] == "Forbidden"
+
+
+def test_identical_submissions_are_served_from_result_cache() -> None:
+    body = {"code": "y = 2\nprint(y * 21)\n", "timeout": 5, "enable_profiling": True}
+
+    first = client.post("/execute", json=body).json()
+    second = client.post("/analyze", json=body).json()
+    third = client.post("/execute", json=body).json()
+
+    assert first["profiling"]["cached"] is False
+    assert second["profiling"]["cached"] is False
+    assert third["profiling"]["cached"] is True
+    assert third["output"] == first["output"] == "42"
+
+
+def test_repeat_parse_is_served_from_syntax_cache(monkeypatch) -> None:
+    from app.services import pipeline as pipeline_module
+
+    source = "z = [1, 2]\nprint(len(z))\n"
+    first = client.post("/parse", json={"code": source})
+
+    def fail(_source):
+        raise AssertionError("cached source should not be lexed again")
+
+    monkeypatch.setattr(pipeline_module, "tokenize", fail)
+    second = client.post("/parse", json={"code": source})
+
+    assert second.status_code == 200
+    assert second.json()["ast"] == first.json()["ast"]
+    # Same wire format as every model-encoded timestamp
+    assert second.json()["timestamp"].endswith("Z")
+    assert client.get("/health").json()["timestamp"].endswith("Z")
+
+
+def test_non_finite_number_tokens_are_encoded_as_null() -> None:
+    # A float literal too long for a double lexes to inf
+    source = "x = " + "9" * 400 + ".5\n"
+
+    tokens = client.post("/tokenize", json={"code": source})
+    parsed = client.post("/parse", json={"code": source})
+
+    assert tokens.status_code == 200
+    assert [t["value"] for t in tokens.json()["tokens"] if t["type"] == "NUMBER"] == [None]
+    assert parsed.status_code == 200
+    assert parsed.json()["success"] is True
+
+
+def test_document_session_returns_block_deltas() -> None:
+    opened = client.post(
+        "/documents", json={"code": "a = 1\nb = 2\nprint(a + b)\n"}
+    )
+    assert opened.status_code == 201
+    document = opened.json()
+    assert document["block_count"] == 3
+
+    edit = {"version": 0, "start_line": 2, "start_column": 5, "end_line": 2, "end_column": 6, "text": "40"}
+    edited = client.post(f"/documents/{document['document_id']}/edits", json=edit)
+    stale = client.post(f"/documents/{document['document_id']}/edits", json=edit)
+    closed = client.delete(f"/documents/{document['document_id']}")
+
+    assert edited.status_code == 200
+    delta = edited.json()
+    assert (delta["version"], delta["first_block"], delta["removed_blocks"]) == (1, 1, 1)
+    assert delta["blocks"][0]["tokens"][2]["value"] == 40
+    assert stale.status_code == 409
+    assert closed.status_code == 204
+
+
+def test_document_ids_are_generated_by_the_server() -> None:
+    victim = client.post("/documents", json={"code": "a = 1\n"}).json()["document_id"]
+    other = client.post("/documents", json={"code": "b = 2\n", "document_id": victim})
+
+    assert other.json()["document_id"] != victim
+    edit = {"version": 0, "start_line": 1, "start_column": 5, "end_line": 1, "end_column": 6, "text": "3"}
+    assert client.post(f"/documents/{victim}/edits", json=edit).json()["blocks"][0]["tokens"][0]["value"] == "a"
+
+
+def test_direct_json_responses_match_the_default_encoding(monkeypatch) -> None:
+    body = {"code": "def f(n):\n    return n * 2\nprint(f(4))\n", "timeout": 5}
+    default = client.post("/analyze", json=body).json()
+
+    monkeypatch.setattr(settings, "direct_json_responses", True)
+    direct = client.post("/analyze", json=body)
+
+    assert direct.status_code == 200
+    assert direct.headers["content-type"] == "application/json"
+    payload = direct.json()
+    assert payload.pop("timestamp") and default.pop("timestamp")
+    payload["profiling"].pop("cached")
+    default["profiling"].pop("cached")
+    assert payload == default
+
+
+def test_execute_stream_sends_output_then_result_events() -> None:
+    body = {"code": "for i in range(3):\n    print(i)\n", "timeout": 5}
+
+    with client.stream("POST", "/execute/stream", json=body) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (event.split(": ", 1)[1], json.loads(data.split(": ", 1)[1]))
+            for event, data, _ in zip(*[iter(response.iter_lines())] * 3)
+        ]
+
+    names = [name for name, _ in events]
+    assert "stdout" in names
+    assert names[-1] == "result"
+    assert "".join(data["text"] for name, data in events if name == "stdout") == "0\n1\n2\n"
+    assert events[-1][1]["score_report"]["score"] >= 0
+
+
+def test_batch_analyze_streams_item_lines_then_a_summary() -> None:
+    body = {
+        "items": [
+            {"id": "slow", "code": "total = 0\nfor i in range(limit):\n    total += i\nprint(total)\n"},
+            {"id": "fast", "code": "print(limit)\n", "inputs": {"limit": 3}},
+            {"id": "broken", "code": "print(missing)\n"},
+        ],
+        "inputs": {"limit": 20},
+    }
+
+    response = client.post("/batch/analyze", json=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    items = {line["id"]: line for line in lines if line["type"] == "item"}
+    summary = lines[-1]
+
+    assert len(lines) == 4 and summary["type"] == "summary"
+    assert items["slow"]["output"] == "190"
+    assert items["fast"]["output"] == "3"
+    assert not items["broken"]["success"] and items["broken"]["errors"]
+    assert summary["count"] == 3 and summary["failed"] == 1
+    assert summary["scores"]["count"] == 3
+    assert sum(summary["scores"]["grades"].values()) == 3
+    assert summary["total_cpu_time"] >= 0
+
+
+def test_rescore_scores_stored_results_like_analyze(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "rescore_chunk_size", 1)
+    code = "total = 0\nfor i in range(30):\n    for j in range(30):\n        total += i * j\nprint(total)\n"
+    analyzed = client.post("/analyze", json={"code": code}).json()
+    stored = {
+        "profiling": analyzed["profiling"],
+        "suggestions": analyzed["suggestions"],
+        "source_lines": len(code.splitlines()),
+        "errors": analyzed["errors"],
+    }
+    body = {
+        "items": [
+            {"id": "a", **stored},
+            {"id": "b", **stored},
+            {"id": "unprofiled", "suggestions": analyzed["suggestions"], "source_lines": 5},
+            {"id": "bad", "profiling": {"line_stats": {"1": {"count": "many"}}}},
+        ]
+    }
+
+    response = client.post("/rescore", json=body)
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    items = {line["id"]: line for line in lines if line["type"] == "item"}
+    summary = lines[-1]
+    assert items["a"]["score_report"] == analyzed["score_report"]
+    assert items["b"]["score_report"] == analyzed["score_report"]
+    assert [items["a"]["deduplicated"], items["b"]["deduplicated"]] == [False, True]
+    assert items["unprofiled"]["score_report"]["dimensions"]["profiling_partial"] is True
+    assert not items["bad"]["success"] and items["bad"]["error"]
+    assert summary["count"] == 4 and summary["distinct"] == 3 and summary["failed"] == 1
+
+
+def test_rate_limit_applies_per_user_and_endpoint(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 2)
+    body = {"code": "x = 1\n", "user_id": "rate-limited-user"}
+
+    statuses = [client.post("/optimize", json=body).status_code for _ in range(3)]
+    limited = client.post("/optimize", json=body)
+    other_user = client.post("/optimize", json={**body, "user_id": "someone-else"})
+    other_endpoint = client.post("/score", json=body)
+
+    assert statuses == [200, 200, 429]
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert other_user.status_code == 200
+    assert other_endpoint.status_code == 200
+
+
+def test_saturated_service_sheds_editor_requests_with_retry_after(monkeypatch) -> None:
+    # Ten seconds of expected wait: past the editor's tolerance, within /analyze's
+    monkeypatch.setattr(admission_controller, "outstanding", 10.0 * admission_controller.workers)
+    monkeypatch.setattr(admission_controller, "in_flight", 1)
+
+    shed = client.post("/tokenize", json={"code": "x = 1\n"})
+    graded = client.post("/analyze", json={"code": "x = 1\n"})
+
+    assert shed.status_code == 503
+    assert int(shed.headers["Retry-After"]) >= 1
+    assert graded.status_code == 200
+
+
+def test_large_variables_are_previewed_and_fetched_on_demand(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    code = "big = []\nfor i in range(500):\n    big.append(i)\nsmall = 3\n"
+    response = client.post("/execute", json={"code": code})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["symbol_table"]["small"] == 3
+    assert payload["symbol_table"]["big"] == list(range(20))
+    assert payload["symbol_info"]["big"]["truncated"] is True
+    assert payload["symbol_info"]["big"]["length"] == 500
+
+    stored = {"symbol_table_id": payload["symbol_table_id"]}
+    fetched = client.post("/variables/big", json=stored)
+    assert fetched.status_code == 200
+    assert fetched.json()["value"] == list(range(500))
+    assert fetched.json()["size_bytes"] == len(json.dumps(list(range(500)), separators=(",", ":")))
+    assert client.post("/variables/small", json=stored).json()["value"] == 3
+    assert client.post("/variables/missing", json=stored).status_code == 404
+    assert client.post("/variables/big", json={"symbol_table_id": "0" * 32}).status_code == 404
+
+    # Nothing is stored when every preview is already the whole value
+    assert client.post("/execute", json={"code": "small = 3\n"}).json()["symbol_table_id"] is None
+
+
+def test_large_output_is_truncated_and_fetched_in_ranges(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "output_max_memory_bytes", 1000)
+    monkeypatch.setattr(settings, "output_head_bytes", 100)
+    monkeypatch.setattr(settings, "output_tail_bytes", 100)
+    code = "for i in range(1000):\n    print(i)\n"
+    full = "".join(f"{i}\n" for i in range(1000))
+
+    payload = client.post("/execute", json={"code": code}).json()
+
+    assert payload["output_truncated"] is True
+    assert payload["output_bytes"] == len(full)
+    assert payload["output"].startswith(full[:100])
+    assert payload["output"].endswith("998\n999")
+    assert "bytes omitted" in payload["output"]
+
+    page = client.get(f"/outputs/{payload['output_id']}", params={"offset": 10, "length": 20})
+    assert page.status_code == 200
+    assert page.text == full[10:30]
+    assert page.headers["Content-Range"] == f"bytes 10-29/{len(full)}"
+    assert client.get("/outputs/" + "0" * 32).status_code == 404
+
+
+def test_stats_route_reports_execution_pool_counters() -> None:
+    response = client.get("/stats")
+
+    assert response.status_code == 200
+    pool = response.json()["execution_pool"]
+    assert pool["backend"] == settings.execution_backend
+    assert pool["in_flight"] == 0
+    assert pool["completed"] >= 1
+    assert response.json()["result_cache"]["hits"] >= 1
+    assert response.json()["admission"]["in_flight"] == 0
+
+
+def test_metrics_route_exposes_route_and_stage_histograms() -> None:
+    client.post("/analyze", json={"code": "x = [1, 2, 3]\nprint(len(x))\n"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'optilang_http_request_duration_seconds_count{route="/analyze",method="POST",status="200"}' in text
+    for stage in ("lex", "parse", "execute", "analyze", "score", "serialize"):
+        assert f'optilang_pipeline_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert "optilang_execution_queue_wait_seconds_count" in text
+    assert "optilang_program_peak_memory_bytes_count" in text
+    assert 'optilang_cache_hit_ratio{cache="result"}' in text
+
+
+def test_trace_context_from_the_backend_parents_every_span(monkeypatch) -> None:
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    response = client.post(
+        "/analyze",
+        json={"code": "traced = [1, 4, 9]\nprint(len(traced))\n"},
+        headers={"traceparent": f"00-{trace_id}-{parent_id}-01"},
+    )
+
+    assert response.status_code == 200
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["POST /analyze"]
+    assert root.parent_id == parent_id
+    assert response.headers["traceparent"] == root.traceparent
+    assert {span.trace_id for span in exporter.spans} == {trace_id}
+    for name in ("auth", "rate_limit", "admission", "pipeline"):
+        assert spans[name].parent_id == root.span_id
+    for stage in ("execute", "analyze", "score", "serialize"):
+        assert spans[f"pipeline.{stage}"].parent_id == spans["pipeline"].span_id
+
+
+def test_service_profile_is_admin_only_and_returns_collapsed_stacks(monkeypatch) -> None:
+    assert client.post("/admin/profile", params={"seconds": 0.05}).status_code == 404
+
+    monkeypatch.setattr(settings, "service_profiling_enabled", True)
+    monkeypatch.setattr(settings, "admin_api_secret", "admin-secret")
+    forbidden = client.post(
+        "/admin/profile", params={"seconds": 0.05}, headers={"X-Admin-Secret": "wrong"}
+    )
+    assert forbidden.status_code == 403
+
+    response = client.post(
+        "/admin/profile",
+        params={"seconds": 0.05, "interval_ms": 5},
+        headers={"X-Admin-Secret": "admin-secret"},
+    )
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    lines = response.text.splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("service;")
+        assert int(count) > 0
+
+
+def test_jobs_run_in_the_background_and_can_be_cancelled() -> None:
+    with TestClient(app) as jobs_client:
+        jobs_client.headers.update({"X-Internal-Service-Secret": settings.internal_api_secret})
+
+        submitted = jobs_client.post("/jobs", json={"code": "print(6 * 7)\n", "kind": "execute"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+        finished = jobs_client.get(f"/jobs/{job_id}", params={"wait": 10}).json()
+        assert finished["status"] == "succeeded"
+        assert finished["result"]["output"] == "42"
+
+        endless = "total = 0\nwhile True:\n    total += 1\n"
+        running = jobs_client.post("/jobs", json={"code": endless, "timeout": 30}).json()
+        assert jobs_client.get(f"/jobs/{running['job_id']}", params={"wait": 0.2}).json()[
+            "status"
+        ] == "running"
+        cancelled = jobs_client.delete(f"/jobs/{running['job_id']}").json()
+        assert cancelled["status"] == "cancelled"
+        assert cancelled["result"] is None
+
+        assert jobs_client.get("/jobs/not-a-job").status_code == 404
+        assert admission_controller.stats()["in_flight"] == 0
+
+
+def test_identical_concurrent_submissions_share_one_run() -> None:
+    import asyncio
+
+    import httpx
+
+    from app.core.execution import execution_pool
+
+    code = "total = 0\nfor i in range(3000):\n    total += i\nprint(total)\n# coalesce\n"
+
+    async def submit_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(
+                *(
+                    async_client.post(
+                        "/analyze",
+                        json={"code": code},
+                        headers={
+                            "X-Internal-Service-Secret": settings.internal_api_secret,
+                            "X-User-Id": f"coalesce-{index}",
+                        },
+                    )
+                    for index in range(4)
+                )
+            )
+
+    completed = execution_pool.stats()["completed"]
+    responses = asyncio.run(submit_all())
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert {response.json()["output"] for response in responses} == {"4498500"}
+    assert execution_pool.stats()["completed"] == completed + 1
+    assert sum(response.json()["profiling"].get("cached", False) for response in responses) == 3
+    stats = client.get("/stats").json()["singleflight"]
+    assert stats["followers"] >= 3
@@ -0,0 +1,63 @@
+from app.core.admission import AdmissionController
+
+MAX_WAIT = {"low": 0.5, "normal": 5.0, "high": 15.0}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_estimates_learn_from_history_and_scale_with_code_length() -> None:
+    clock = Clock()
+    controller = AdmissionController(workers=2, max_wait=MAX_WAIT, clock=clock)
+
+    ticket, _ = controller.admit("/analyze", 100, 5)
+    clock.now += 2.0
+    controller.release(ticket)
+
+    assert controller.estimate("/analyze", 100, 5) == 2.0
+    assert controller.estimate("/analyze", 400, 5) == 5.0  # capped by the timeout
+    assert controller.estimate("/analyze", 50, 5) == 1.0
+    assert controller.estimate("/analyze", 200, 5, units=2) == 4.0
+
+
+def test_low_priority_work_is_shed_first_with_a_retry_hint() -> None:
+    controller = AdmissionController(workers=1, max_wait=MAX_WAIT, clock=Clock())
+    controller._seconds["/analyze"] = 3.0
+
+    first, _ = controller.admit("/analyze", 100, 5)
+    second, _ = controller.admit("/analyze", 100, 5)
+    tokenize, retry_after = controller.admit("/tokenize", 100, 5)
+    execute, _ = controller.admit("/execute", 100, 5)
+    analyze, _ = controller.admit("/analyze", 100, 5)
+
+    assert first and second and analyze
+    assert tokenize is None and retry_after == 5.5
+    assert execute is None
+    assert controller.stats()["shed"] == {"low": 1, "normal": 1, "high": 0}
+
+
+def test_idle_service_admits_any_request_and_release_frees_capacity() -> None:
+    controller = AdmissionController(workers=1, max_wait=MAX_WAIT, clock=Clock())
+
+    big, _ = controller.admit("/analyze", 100, 30, units=100)
+    assert big is not None
+    assert controller.admit("/tokenize", 10, 5)[0] is None
+
+    controller.release(big)
+    assert controller.stats()["in_flight"] == 0
+    assert controller.admit("/tokenize", 10, 5)[0] is not None
+
+
+def test_unmetered_endpoints_are_always_admitted() -> None:
+    controller = AdmissionController(workers=1, max_wait={"normal": 0.0}, clock=Clock())
+    controller.admit("/analyze", 100, 5)
+
+    ticket, _ = controller.admit("/stats", 0, 5)
+    controller.release(ticket)
+
+    assert ticket is not None and controller.stats()["in_flight"] == 1
@@ -0,0 +1,51 @@
+import time
+
+from app.core.cache import LRUCache, result_cache_key
+
+
+def test_least_recently_used_entry_is_evicted_first() -> None:
+    cache: LRUCache[str] = LRUCache(max_entries=2, max_bytes=1024, ttl_seconds=60)
+    cache.set("a", "A", size=1)
+    cache.set("b", "B", size=1)
+    assert cache.get("a") == "A"
+
+    cache.set("c", "C", size=1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_and_ttl_bound_the_cache() -> None:
+    cache: LRUCache[str] = LRUCache(max_entries=10, max_bytes=10, ttl_seconds=0.05)
+    cache.set("big", "x", size=11)
+    cache.set("a", "A", size=6)
+    cache.set("b", "B", size=6)
+
+    assert cache.get("big") is None
+    assert cache.get("a") is None
+    assert cache.get("b") == "B"
+
+    time.sleep(0.06)
+    assert cache.get("b") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_rejected_entries_count_as_misses() -> None:
+    cache: LRUCache[dict] = LRUCache(max_entries=10, max_bytes=100, ttl_seconds=60)
+    cache.set("k", {"execution": {}}, size=1)
+
+    assert cache.get("k", accept=lambda value: "score_report" in value) is None
+    assert cache.get("k") == {"execution": {}}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_result_cache_key_covers_every_option() -> None:
+    base = result_cache_key("print(1)\n", 5, True)
+
+    assert base == result_cache_key("print(1)\n", 5.0, True)
+    assert base != result_cache_key("print(1) \n", 5, True)
+    assert base != result_cache_key("print(1)\n", 6, True)
+    assert base != result_cache_key("print(1)\n", 5, False)
+    assert base != result_cache_key("print(1)\n", 5, True, profiling_tier="sampled_lines")
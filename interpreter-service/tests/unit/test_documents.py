@@ -0,0 +1,131 @@
+import pytest
+
+from app.core.serialization import serialize_tokens, to_json_safe
+from app.services.documents import DocumentSession, VersionConflict, split_blocks
+from optilang.lexer import tokenize
+from optilang.parser import parse
+from optilang.utils.errors import OptiLangError
+
+SOURCE = (
+    "total = 0\n"
+    "def add(a, b):\n"
+    "    return a + b\n"
+    "\n"
+    "if total > 1:\n"
+    "    print(\"big\")\n"
+    "else:\n"
+    "    print(\"small\")\n"
+    "items = [1,\n"
+    "2]\n"
+    "print(add(total, 1))\n"
+)
+
+
+def apply(blocks: list, delta: dict) -> list:
+    """Apply a delta the way an editor client would."""
+    shift = delta["line_delta"]
+    tail = blocks[delta["first_block"] + delta["removed_blocks"] :]
+    for block in tail:
+        block["tokens"] = [{**token, "line": token["line"] + shift} for token in block["tokens"]]
+    return blocks[: delta["first_block"]] + delta["blocks"] + tail
+
+
+def tokens_of(blocks: list) -> list:
+    return [token for block in blocks for token in block["tokens"]]
+
+
+def test_blocks_break_only_between_top_level_statements() -> None:
+    blocks, clean = split_blocks(SOURCE.splitlines(keepends=True))
+
+    assert [block[0] for block in blocks] == [
+        "total = 0\n",
+        "def add(a, b):\n",
+        "if total > 1:\n",
+        "items = [1,\n",
+        "print(add(total, 1))\n",
+    ]
+    assert clean
+
+
+def test_open_matches_full_tokenize_and_parse() -> None:
+    delta = DocumentSession("doc", SOURCE).snapshot()
+
+    tokens = [token for block in delta["blocks"] for token in block["tokens"]]
+    statements = [statement for block in delta["blocks"] for statement in block["statements"]]
+    assert delta["success"] is True
+    assert tokens == serialize_tokens(tokenize(SOURCE)[:-1])
+    assert statements == to_json_safe(parse(tokenize(SOURCE)))["statements"]
+    assert delta["token_count"] == len(tokenize(SOURCE))
+
+
+def test_edit_relexes_only_the_enclosing_block() -> None:
+    session = DocumentSession("doc", SOURCE)
+    blocks = session.snapshot()["blocks"]
+
+    delta = session.apply_edit(0, 3, 16, 3, 17, "a * b\n    pass")
+
+    assert delta["version"] == 1
+    assert (delta["first_block"], delta["removed_blocks"]) == (1, 1)
+    assert delta["line_delta"] == 1
+    assert delta["blocks"][0]["start_line"] == 2
+    assert tokens_of(apply(blocks, delta)) == serialize_tokens(tokenize(session.text)[:-1])
+
+
+def test_edit_opening_a_bracket_merges_following_blocks() -> None:
+    session = DocumentSession("doc", SOURCE)
+    blocks = session.snapshot()["blocks"]
+
+    delta = session.apply_edit(0, 1, 10, 1, 10, " + (1")
+    blocks = apply(blocks, delta)
+
+    assert delta["success"] is False
+    assert delta["errors"]
+    assert delta["blocks"][0]["end_line"] > 1
+
+    delta = session.apply_edit(1, 1, 14, 1, 14, ")")
+    blocks = apply(blocks, delta)
+
+    assert delta["success"] is True
+    assert len(blocks) == delta["block_count"] == 5
+    assert tokens_of(blocks) == serialize_tokens(tokenize(session.text)[:-1])
+    assert [s for block in blocks for s in block["statements"]] == (
+        to_json_safe(parse(tokenize(session.text)))["statements"]
+    )
+
+
+def test_edits_must_target_the_current_version() -> None:
+    session = DocumentSession("doc", SOURCE)
+    session.apply_edit(0, 1, 1, 1, 1, "# note\n")
+
+    with pytest.raises(VersionConflict):
+        session.apply_edit(0, 1, 1, 1, 1, "x = 1\n")
+
+
+def full_errors(code: str) -> list:
+    try:
+        parse(tokenize(code))
+    except OptiLangError as exc:
+        return [str(exc)]
+    return []
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "for i in range(3):\n\n\n)\n",
+        "x = 1\nif x:\n# comment\ny = 2\n",
+        "def f():\nreturn 1\n",
+        "x = (1 +\n",
+        "a = 1\nb = = 2\nc = 3\n",
+    ],
+)
+def test_session_errors_match_a_full_parse(code: str) -> None:
+    assert DocumentSession("doc", code).snapshot()["errors"] == full_errors(code)
+
+
+def test_errors_after_moved_blocks_match_a_full_parse() -> None:
+    session = DocumentSession("doc", "x = 1\nwhile x:\n\ny = 2\n")
+    delta = session.apply_edit(0, 1, 1, 1, 1, "# a\n# b\n")
+
+    assert delta["errors"] == full_errors(session.text)
+    assert "Line 6" in delta["errors"][0]
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.execution import ExecutionPool
+
+
+def _sleep_and_return(value: int, seconds: float) -> int:
+    time.sleep(seconds)
+    return value
+
+
+async def test_blocking_work_does_not_stall_event_loop() -> None:
+    pool = ExecutionPool(backend="thread", workers=2)
+    try:
+        job = asyncio.create_task(pool.run(_sleep_and_return, 7, 0.3))
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - started < 0.2
+        assert pool.stats()["in_flight"] == 1
+
+        assert await job == 7
+        assert pool.stats()["completed"] == 1
+    finally:
+        pool.shutdown()
+
+
+async def test_submissions_beyond_worker_count_are_queued() -> None:
+    pool = ExecutionPool(backend="thread", workers=1)
+    try:
+        jobs = [asyncio.create_task(pool.run(_sleep_and_return, i, 0.1)) for i in range(3)]
+        await asyncio.sleep(0.05)
+
+        stats = pool.stats()
+        assert stats["in_flight"] == 1
+        assert stats["queued"] == 2
+
+        assert await asyncio.gather(*jobs) == [0, 1, 2]
+        assert pool.stats()["queued"] == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_process_backend_runs_module_level_functions() -> None:
+    pool = ExecutionPool(backend="process", workers=1)
+    try:
+        assert await pool.run(_sleep_and_return, 3, 0) == 3
+    finally:
+        pool.shutdown()
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        ExecutionPool(backend="fibers")
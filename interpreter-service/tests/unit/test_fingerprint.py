@@ -0,0 +1,95 @@
+import asyncio
+
+from app.core.cache import artifact_index
+from app.core.fingerprint import canonicalize
+from app.services.static import static_report
+from optilang.lexer import tokenize
+from optilang.parser import parse
+
+SOURCE = (
+    "total = 0\n"
+    "for i in range(10):\n"
+    "    for j in range(10):\n"
+    "        total = total + i * j\n"
+    "        extra = total * 2\n"
+    "def double(n):\n"
+    "    return n * 2\n"
+    "    print(n)\n"
+    "print(total)\n"
+)
+
+# Same program: comments, blank lines, spacing and local names differ
+VARIANT = (
+    "# running sum\n"
+    "acc = 0\n"
+    "\n"
+    "for row in range(10):\n"
+    "    for col in range(10):   # inner\n"
+    "        acc = acc + row * col\n"
+    "        spare = acc * 2\n"
+    "\n"
+    "def twice(v):\n"
+    "    return v * 2\n"
+    "    print(v)\n"
+    "print(acc)\n"
+)
+
+
+def fingerprint(code: str):
+    return canonicalize(parse(tokenize(code)))
+
+
+def test_trivia_and_local_names_do_not_change_the_fingerprint() -> None:
+    original, variant = fingerprint(SOURCE), fingerprint(VARIANT)
+
+    assert original.digest == variant.digest
+    assert variant.names[:3] == ("acc", "row", "col")
+    assert variant.lines[:3] == (2, 4, 5)
+
+
+def test_structure_builtins_and_literals_change_the_fingerprint() -> None:
+    digest = fingerprint(SOURCE).digest
+
+    assert fingerprint(SOURCE.replace("i * j", "i + j")).digest != digest
+    assert fingerprint(SOURCE.replace("range(10):\n    for", "range(11):\n    for")).digest != digest
+    assert fingerprint("x = len([1])\n").digest != fingerprint("x = str([1])\n").digest
+    # Line grouping is kept: detectors compare the lines of what they find
+    assert fingerprint("a = [1,\n2]\n").digest != fingerprint("a = [1, 2]\n").digest
+
+
+def test_static_report_is_reused_and_mapped_onto_each_program() -> None:
+    artifact_index.clear()
+
+    first = asyncio.run(static_report(SOURCE))
+    second = asyncio.run(static_report(VARIANT))
+
+    assert first["reused"] is False and second["reused"] is True
+    assert first["fingerprint"] == second["fingerprint"]
+    assert [s["pattern"] for s in first["suggestions"]] == [s["pattern"] for s in second["suggestions"]]
+    unused = [s for s in second["suggestions"] if s["pattern"] == "unused_vars"]
+    assert [(s["line"], s["description"]) for s in unused] == [
+        (7, "Variable 'spare' is assigned but never used")
+    ]
+    dead = next(s for s in second["suggestions"] if s["pattern"] == "dead_code")
+    assert dead["line"] == 11
+    assert "line 11" in dead["description"] and "line 10" in dead["description"]
+
+
+def test_parse_errors_are_reported_without_a_fingerprint() -> None:
+    report = asyncio.run(static_report("x = (1 +\n"))
+
+    assert report["success"] is False
+    assert report["errors"] and report["fingerprint"] is None
+
+
+def test_a_miss_parses_the_source_once(monkeypatch) -> None:
+    from app.services import pipeline as pipeline_module
+
+    artifact_index.clear()
+    calls = []
+    monkeypatch.setattr(pipeline_module, "parse", lambda tokens: calls.append(1) or parse(tokens))
+
+    report = asyncio.run(static_report(SOURCE))
+
+    assert report["reused"] is False and report["suggestions"]
+    assert len(calls) == 1
@@ -0,0 +1,27 @@
+import threading
+
+from app.services.jobs import Job, JobStore
+
+
+def _job(job_id: str, finished_at=None) -> Job:
+    return Job(
+        job_id=job_id,
+        kind="execute",
+        created_at=0.0,
+        cancel=threading.Event(),
+        status="running" if finished_at is None else "succeeded",
+        finished_at=finished_at,
+    )
+
+
+def test_sweep_drops_only_jobs_finished_past_their_ttl() -> None:
+    store = JobStore(max_jobs=10, ttl_seconds=60)
+    store._jobs = {
+        "old": _job("old", finished_at=100.0),
+        "recent": _job("recent", finished_at=150.0),
+        "running": _job("running"),
+    }
+
+    assert store.sweep(now=200.0) == 1
+    assert sorted(store._jobs) == ["recent", "running"]
+    assert store.stats() == {"jobs": 2, "succeeded": 1, "running": 1}
@@ -0,0 +1,31 @@
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+from app.services.pipeline import AnalysisPipeline
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set() -> None:
+    registry = MetricsRegistry()
+    latency = registry.register(
+        Histogram("request_seconds", "Request latency.", ("route",), buckets=(0.1, 1.0))
+    )
+    timeouts = registry.register(Counter("timeouts_total", "Timeouts.", ("kind",)))
+
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, "/analyze")
+    timeouts.inc("sandbox")
+
+    text = registry.render()
+    assert 'request_seconds_bucket{route="/analyze",le="0.1"} 1' in text
+    assert 'request_seconds_bucket{route="/analyze",le="1"} 3' in text
+    assert 'request_seconds_bucket{route="/analyze",le="+Inf"} 4' in text
+    assert 'request_seconds_count{route="/analyze"} 4' in text
+    assert 'request_seconds_sum{route="/analyze"} 4.05' in text
+    assert "# TYPE timeouts_total counter" in text
+    assert 'timeouts_total{kind="sandbox"} 1' in text
+
+
+def test_pipeline_times_each_stage_on_its_own() -> None:
+    pipeline = AnalysisPipeline("total = 0\nfor i in range(200):\n    total += i\n")
+    pipeline.score_report
+
+    assert set(pipeline.timings) == {"lex", "parse", "execute", "analyze", "score"}
+    assert all(seconds >= 0 for seconds in pipeline.timings.values())
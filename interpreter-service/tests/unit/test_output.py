@@ -0,0 +1,49 @@
+import os
+
+from app.core.config import settings
+from app.core.output import OutputCapture, read_spill, spill_path, sweep_spills
+
+
+def test_output_under_the_cap_is_kept_whole(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    capture = OutputCapture(max_memory_bytes=100, head_bytes=10, tail_bytes=10)
+    capture.write("hello\n")
+    capture.write("world\n")
+
+    assert capture.render() == "hello\nworld"
+    assert capture.summary() == {"output_bytes": 12, "output_truncated": False, "output_id": None}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_large_output_keeps_head_and_tail_and_spills_the_rest(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    capture = OutputCapture(max_memory_bytes=50, head_bytes=8, tail_bytes=8)
+    lines = [f"{i:04d}\n" for i in range(100)]
+    for line in lines:
+        capture.write(line)
+    capture.close()
+
+    summary = capture.summary()
+    assert summary["output_bytes"] == 500
+    assert summary["output_truncated"] is True
+    assert capture.render() == "0000\n000\n… [484 bytes omitted; 500 bytes total] …\n98\n0099"
+    assert read_spill(summary["output_id"], 0, 1000) == ("".join(lines).encode(), 500)
+    assert read_spill(summary["output_id"], 495, 3) == (b"009", 500)
+
+
+def test_spill_stops_at_its_cap_and_old_spills_are_swept(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    capture = OutputCapture(max_memory_bytes=10, head_bytes=4, tail_bytes=4, max_spill_bytes=30)
+    for _ in range(20):
+        capture.write("abcdefghi\n")
+    capture.close()
+
+    assert capture.total_bytes == 200
+    assert capture.spilled_bytes == 30
+    path = spill_path(capture.output_id)
+    assert os.path.getsize(path) == 30
+
+    os.utime(path, (0, 0))
+    assert sweep_spills(ttl_seconds=60) == 1
+    assert read_spill(capture.output_id, 0, 10) is None
+    assert spill_path("../../etc/passwd") is None
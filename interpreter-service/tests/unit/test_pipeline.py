@@ -0,0 +1,97 @@
+import pytest
+
+from app.services import pipeline as pipeline_module
+from app.services.pipeline import AnalysisPipeline
+from optilang.utils.errors import OptiLangError
+
+
+@pytest.fixture
+def lexer_calls(monkeypatch: pytest.MonkeyPatch) -> list:
+    calls: list = []
+    original = pipeline_module.tokenize
+
+    def counting_tokenize(source: str):
+        calls.append(source)
+        return original(source)
+
+    monkeypatch.setattr(pipeline_module, "tokenize", counting_tokenize)
+    return calls
+
+
+def test_full_pipeline_lexes_and_parses_once(lexer_calls: list) -> None:
+    source = "total = 0\nfor i in range(3):\n    total += i\nprint(total)\n"
+    pipeline = AnalysisPipeline(source)
+
+    assert pipeline.execution.output == "3"
+    assert pipeline.optimization_report is not None
+    assert pipeline.score_report.score >= 0
+    assert len(lexer_calls) == 1
+
+
+def test_stages_are_lazy(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_args, **_kwargs):
+        raise AssertionError("execution should not run")
+
+    monkeypatch.setattr(pipeline_module, "Executor", fail)
+    pipeline = AnalysisPipeline("x = 1\n")
+
+    assert pipeline.tokens
+    assert type(pipeline.ast).__name__ == "ProgramNode"
+
+
+def test_parse_errors_are_cached_and_reported_by_later_stages(lexer_calls: list) -> None:
+    pipeline = AnalysisPipeline("x = (1\n")
+
+    with pytest.raises(OptiLangError) as first:
+        pipeline.ast
+    with pytest.raises(OptiLangError) as second:
+        pipeline.ast
+
+    assert first.value is second.value
+    assert pipeline.execution.errors
+    assert pipeline.optimization_report is None
+    assert pipeline.score_report.error_count == 1
+    assert len(lexer_calls) == 1
+
+
+def test_run_pipeline_binds_inputs_as_globals() -> None:
+    inputs = {"n": 4, "items": [1, 2]}
+    outcome = pipeline_module.run_pipeline(
+        "items.append(n)\nprint(len(items) * n)\n", 5, False, ("execution",), inputs
+    )
+
+    assert outcome["stages"]["execution"]["output"] == "12"
+    assert outcome["stages"]["execution"]["cpu_time"] >= 0
+    assert inputs["items"] == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "tier, sampling_rate, memory_mode",
+    [
+        ("functions", 0.0, "off"),
+        ("sampled_lines", 0.1, "off"),
+        ("full_lines", 1.0, "off"),
+        ("full_memory", 1.0, "shallow"),
+    ],
+)
+def test_profiling_tiers_configure_the_profiler(
+    tier: str, sampling_rate: float, memory_mode: str
+) -> None:
+    source = "def f(n):\n    return n * 2\ntotal = 0\nfor i in range(50):\n    total += f(i)\n"
+    profiling = AnalysisPipeline(source, profiling_tier=tier).execution.profiling
+
+    assert profiling.line_sampling_rate == sampling_rate
+    assert profiling.memory_mode == memory_mode
+    assert profiling.function_stats["f"].call_count == 50
+    if tier == "functions":
+        assert profiling.sampled_lines == 0
+    if tier == "full_memory":
+        assert profiling.peak_memory_bytes > 0
+    else:
+        assert profiling.peak_memory_bytes == 0
+
+
+def test_off_tier_overrides_enable_profiling() -> None:
+    execution = AnalysisPipeline("x = 1\n", enable_profiling=True, profiling_tier="off").execution
+
+    assert execution.profiling is None
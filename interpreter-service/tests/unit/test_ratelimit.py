@@ -0,0 +1,72 @@
+import asyncio
+
+from app.core.ratelimit import MemoryStore, RateLimit, RateLimiter, gcra
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def hits(limiter: RateLimiter, key: str, limit: RateLimit, count: int) -> list:
+    async def run() -> list:
+        return [await limiter.hit(key, limit) for _ in range(count)]
+
+    return asyncio.run(run())
+
+
+def test_gcra_allows_a_burst_then_one_request_per_interval() -> None:
+    limit = RateLimit(rate=60, burst=3)
+    tat = None
+    decisions = []
+    for _ in range(4):
+        tat, decision = gcra(tat, 0.0, limit)
+        decisions.append(decision)
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    assert decisions[3].retry_after == 1.0
+
+    _, later = gcra(tat, 1.0, limit)
+    assert later.allowed
+
+
+def test_keys_are_limited_independently() -> None:
+    clock = Clock()
+    limiter = RateLimiter(MemoryStore(clock=clock))
+    limit = RateLimit(rate=2, burst=2)
+
+    assert [d.allowed for d in hits(limiter, "alice:/analyze", limit, 3)] == [True, True, False]
+    assert all(d.allowed for d in hits(limiter, "bob:/analyze", limit, 2))
+    assert all(d.allowed for d in hits(limiter, "alice:/tokenize", limit, 2))
+
+    clock.now += 30
+    assert hits(limiter, "alice:/analyze", limit, 1)[0].allowed
+
+
+def test_workers_sharing_a_store_share_the_limit() -> None:
+    store = MemoryStore(clock=Clock())
+    workers = [RateLimiter(store), RateLimiter(store)]
+    limit = RateLimit(rate=4, burst=4)
+
+    allowed = [d.allowed for worker in workers for d in hits(worker, "alice:/analyze", limit, 3)]
+
+    assert allowed.count(True) == 4
+
+
+def test_refilled_keys_are_pruned() -> None:
+    clock = Clock()
+    store = MemoryStore(max_keys=4, clock=clock)
+    limiter = RateLimiter(store)
+    limit = RateLimit(rate=60, burst=5)
+
+    for index in range(4):
+        hits(limiter, f"old{index}", limit, 1)
+    clock.now += 5
+    for index in range(4):
+        hits(limiter, f"new{index}", limit, 1)
+
+    assert len(store) == 4
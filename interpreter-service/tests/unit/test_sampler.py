@@ -0,0 +1,43 @@
+import threading
+from time import perf_counter
+
+from app.core.sampler import StackSampler, render_collapsed, sampled_call
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_sampler_records_collapsed_stacks_of_other_threads() -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        counts = StackSampler(0.001, label="service").run(0.05)
+    finally:
+        stop.set()
+        worker.join()
+
+    spinner = [stack for stack in counts if stack.startswith("service;spinner;")]
+    assert spinner
+    assert any(stack.split(";")[-1].startswith("_spin (tests/unit/test_sampler.py:") for stack in spinner)
+    assert not any("StackSampler.run" in stack for stack in counts)
+
+
+def _busy(seconds: float) -> str:
+    deadline = perf_counter() + seconds
+    while perf_counter() < deadline:
+        pass
+    return "done"
+
+
+def test_sampled_call_returns_the_result_with_the_job_stacks() -> None:
+    result, stacks = sampled_call(0.001, _busy, 0.05)
+
+    assert result == "done"
+    assert any(stack.startswith("worker;") and "_busy" in stack for stack in stacks)
+
+
+def test_collapsed_output_lists_heaviest_stacks_first() -> None:
+    assert render_collapsed({"a;b": 2, "a;c": 5}) == "a;c 5\na;b 2\n"
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from app.core.sandbox import SandboxError, SandboxPool
+
+pytest.importorskip("resource")
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _run_optilang(source: str) -> str:
+    import optilang
+
+    return optilang.execute(source).output
+
+
+def _allocate(megabytes: int) -> int:
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+def _spin() -> None:
+    while True:
+        pass
+
+
+def _fail() -> None:
+    raise ValueError("boom")
+
+
+@pytest.fixture
+def sandbox():
+    pool = SandboxPool(workers=1, memory_mb=64, cpu_seconds=1, grace_seconds=0.5)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_jobs_run_in_a_separate_warm_process(sandbox: SandboxPool) -> None:
+    assert sandbox.submit(_pid).result(timeout=10) != os.getpid()
+    assert sandbox.submit(_run_optilang, "print(1 + 1)\n").result(timeout=10) == "2"
+
+
+def test_job_exceptions_propagate_without_killing_the_worker(sandbox: SandboxPool) -> None:
+    worker_pid = sandbox.submit(_pid).result(timeout=10)
+
+    with pytest.raises(ValueError, match="boom"):
+        sandbox.submit(_fail).result(timeout=10)
+
+    assert sandbox.submit(_pid).result(timeout=10) == worker_pid
+
+
+def test_memory_limit_is_enforced(sandbox: SandboxPool) -> None:
+    with pytest.raises(SandboxError, match="memory"):
+        sandbox.submit(_allocate, 512).result(timeout=10)
+
+    assert sandbox.submit(_allocate, 8).result(timeout=10) == 8 * 1024 * 1024
+
+
+def test_runaway_job_is_killed_and_worker_replaced(sandbox: SandboxPool) -> None:
+    worker_pid = sandbox.submit(_pid).result(timeout=10)
+
+    with pytest.raises(SandboxError):
+        sandbox.submit(_spin).result(timeout=10)
+
+    assert sandbox.submit(_pid).result(timeout=10) != worker_pid
+    assert sandbox.stats()["killed"] == 1
+
+
+def test_workers_are_recycled_after_max_jobs() -> None:
+    pool = SandboxPool(workers=1, max_jobs_per_worker=2)
+    try:
+        pids = [pool.submit(_pid).result(timeout=10) for _ in range(3)]
+    finally:
+        pool.shutdown()
+
+    assert pids[0] == pids[1]
+    assert pids[2] != pids[0]
+    assert pool.stats()["recycled"] >= 1
+
+
+class _ClosedConn:
+    """A worker pipe that refuses every job, as a dead worker's would."""
+
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    def send(self, message) -> None:
+        raise OSError("broken pipe")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_failed_retry_fails_the_job_and_keeps_the_slot(monkeypatch) -> None:
+    pool = SandboxPool(workers=1)
+    spawn = pool._spawn
+    spawned = []
+
+    def flaky_spawn():
+        worker = spawn()
+        spawned.append(worker)
+        if len(spawned) <= 2:  # the first worker and its replacement
+            worker.conn = _ClosedConn(worker.conn)
+        return worker
+
+    monkeypatch.setattr(pool, "_spawn", flaky_spawn)
+    try:
+        with pytest.raises(SandboxError):
+            pool.submit(_pid).result(timeout=10)
+        assert pool.submit(_pid).result(timeout=10) == spawned[2].process.pid
+    finally:
+        pool.shutdown()
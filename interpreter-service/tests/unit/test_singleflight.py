@@ -0,0 +1,55 @@
+import asyncio
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_with_one_key_share_a_single_run() -> None:
+    calls = []
+
+    async def work() -> dict:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": len(calls)}
+
+    async def run():
+        flights: SingleFlight[dict] = SingleFlight()
+        results = await asyncio.gather(*(flights.do("same", work) for _ in range(5)))
+        other = await flights.do("other", work)
+        return flights, results, other
+
+    flights, results, other = asyncio.run(run())
+
+    assert [result for result, _ in results] == [{"value": 1}] * 5
+    assert [joined for _, joined in results] == [False, True, True, True, True]
+    assert other == ({"value": 2}, False)
+    assert flights.stats()["followers"] == 4
+    assert flights.stats()["coalesce_ratio"] == round(4 / 6, 4)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_followers_only_join_a_flight_that_covers_them_and_outlive_its_leader() -> None:
+    async def work() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        flights: SingleFlight[str] = SingleFlight()
+        covers = {"execution"}
+
+        def accept(covered):
+            return covers <= covered
+
+        leader = asyncio.ensure_future(flights.do("key", work, covers={"execution"}))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", work, accept=accept))
+        wider = asyncio.ensure_future(
+            flights.do("key", work, accept=lambda covered: {"execution", "score_report"} <= covered)
+        )
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, await wider
+
+    follower, wider = asyncio.run(run())
+
+    assert follower == ("done", True)
+    assert wider == ("done", False)
@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+
+from app.core.execution import StreamChannel
+from app.services.streaming import run_streaming
+
+LIMITS = {
+    "max_output_bytes": 10_000,
+    "chunk_bytes": 64,
+    "flush_interval": 0.01,
+    "progress_interval": 0.01,
+}
+
+
+def channel(maxsize: int = 0) -> StreamChannel:
+    return StreamChannel(queue.Queue(maxsize), threading.Event())
+
+
+def drain(stream: StreamChannel) -> list:
+    frames = []
+    while True:
+        frame = stream.get(1)
+        frames.append(frame)
+        if frame is None or frame["event"] in ("result", "error"):
+            return frames
+
+
+def test_output_is_streamed_in_chunks_before_the_result() -> None:
+    stream = channel()
+    run_streaming("for i in range(50):\n    print(i)\n", 5, True, True, stream, LIMITS)
+
+    frames = drain(stream)
+    text = "".join(f["data"]["text"] for f in frames if f["event"] == "stdout")
+    result = frames[-1]
+
+    assert text == "".join(f"{i}\n" for i in range(50))
+    assert sum(f["event"] == "stdout" for f in frames) > 1
+    assert result["event"] == "result"
+    assert result["data"]["output_bytes"] == len(text)
+    assert result["data"]["score_report"]["score"] >= 0
+
+
+def test_output_beyond_the_cap_stops_the_run() -> None:
+    stream = channel()
+    run_streaming(
+        "while True:\n    print(\"spam\")\n",
+        5,
+        False,
+        False,
+        stream,
+        {**LIMITS, "max_output_bytes": 100},
+    )
+
+    frames = drain(stream)
+    text = "".join(f["data"]["text"] for f in frames if f["event"] == "stdout")
+    result = frames[-1]["data"]
+
+    assert len(text) == 100
+    assert result["truncated"] is True
+    assert "Output limit" in result["errors"][0]
+
+
+def test_a_try_block_cannot_swallow_the_output_cap() -> None:
+    stream = channel()
+    code = (
+        "n = 0\n"
+        "while n < 1000:\n"
+        "    try:\n"
+        "        print(\"spam\")\n"
+        "    except:\n"
+        "        n = n + 1\n"
+        "print(\"after\")\n"
+    )
+    run_streaming(code, 5, False, False, stream, {**LIMITS, "max_output_bytes": 100})
+
+    frames = drain(stream)
+    text = "".join(f["data"]["text"] for f in frames if f["event"] == "stdout")
+    result = frames[-1]["data"]
+
+    assert len(text) == 100 and "after" not in text
+    assert result["truncated"] is True
+    assert "Output limit" in result["errors"][0]
+    assert result["symbol_table"]["n"] == 0
+
+
+def test_a_full_channel_blocks_the_program_until_it_is_cancelled() -> None:
+    stream = channel(maxsize=1)
+    job = threading.Thread(
+        target=run_streaming,
+        args=("while True:\n    print(1)\n", 30, False, False, stream, LIMITS),
+    )
+    job.start()
+    time.sleep(0.3)
+    assert job.is_alive()
+
+    stream.cancel()
+    job.join(timeout=2)
+
+    assert not job.is_alive()
@@ -0,0 +1,53 @@
+import os
+
+from app.core import symbols
+from app.core.config import settings
+from app.core.serialization import preview_symbol_table
+from app.core.symbols import read_variable, store_symbol_table, symbol_table_path
+
+
+def test_stored_table_serves_each_variable_in_full(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    table = {"big": list(range(100)), "text": "tab\there\nand a newline", "n": 1}
+    _, info = preview_symbol_table(table)
+
+    symbol_table_id = store_symbol_table(table, info)
+
+    assert read_variable(symbol_table_id, "big") == {
+        "name": "big",
+        "type": "list",
+        "length": 100,
+        "size_bytes": len(str(list(range(100))).replace(" ", "")),
+        "value": list(range(100)),
+    }
+    assert read_variable(symbol_table_id, "text")["value"] == "tab\there\nand a newline"
+    assert read_variable(symbol_table_id, "missing") is None
+    assert read_variable("../../etc/passwd", "big") is None
+    assert symbol_table_path("../../etc/passwd") is None
+
+
+def test_nothing_is_stored_without_truncation_and_large_variables_are_left_out(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "output_spill_dir", str(tmp_path))
+    small = {"n": 1}
+    assert store_symbol_table(small, preview_symbol_table(small)[1]) is None
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.setattr(settings, "symbol_store_max_bytes", 200)
+    table = {"huge": list(range(1000)), "n": 1}
+    serialized = []
+
+    def record(value):
+        serialized.append(value)
+        return value
+
+    monkeypatch.setattr(symbols, "to_json_safe", record)
+    symbol_table_id = store_symbol_table(table, preview_symbol_table(table)[1])
+
+    # Judged by its size estimate, so the large value is never serialized
+    assert serialized == [1]
+
+    assert read_variable(symbol_table_id, "huge") is None
+    assert read_variable(symbol_table_id, "n")["value"] == 1
+    assert os.path.getsize(symbol_table_path(symbol_table_id)) <= 200
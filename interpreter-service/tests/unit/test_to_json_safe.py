@@ -0,0 +1,90 @@
+import json
+import sys
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, List
+
+from app.core.serialization import preview_json_safe, to_json_safe
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@dataclass
+class Node:
+    line: int
+    children: List[Any] = field(default_factory=list)
+    color: Color = Color.RED
+
+
+def test_dataclasses_enums_mappings_and_sets() -> None:
+    value = {1: Node(1, [Node(2), (3, None)]), "tags": {"b", "a"}, "obj": object}
+
+    assert to_json_safe(value) == {
+        "1": {
+            "node_type": "Node",
+            "line": 1,
+            "children": [
+                {"node_type": "Node", "line": 2, "children": [], "color": "red"},
+                [3, None],
+            ],
+            "color": "red",
+        },
+        "tags": ["a", "b"],
+        "obj": repr(object),
+    }
+
+
+def test_colliding_keys_keep_first_position_and_last_value() -> None:
+    assert list(to_json_safe({1: "int", "x": 0, "1": "str"}).items()) == [("1", "str"), ("x", 0)]
+
+
+def test_deep_nesting_does_not_hit_the_recursion_limit() -> None:
+    value: Any = Node(0)
+    for line in range(1, sys.getrecursionlimit() * 2):
+        value = Node(line, [value])
+
+    payload = to_json_safe(value)
+    depth = 0
+    while payload["children"]:
+        payload = payload["children"][0]
+        depth += 1
+    assert depth == sys.getrecursionlimit() * 2 - 1
+
+
+def test_self_referencing_containers_are_cut() -> None:
+    items: List[Any] = [1]
+    items.append(items)
+    shared = [2]
+
+    assert to_json_safe(items) == [1, "..."]
+    assert to_json_safe([shared, shared]) == [[2], [2]]
+
+
+def test_small_values_preview_as_their_full_encoding() -> None:
+    value = {"a": [1, 2, {"b": "c"}], "flag": True}
+
+    preview, info = preview_json_safe(value)
+
+    assert preview == to_json_safe(value)
+    assert info == {
+        "type": "dict",
+        "size_bytes": len(json.dumps(value, separators=(",", ":"))),
+        "truncated": False,
+        "length": 2,
+    }
+
+
+def test_large_values_are_cut_by_items_depth_and_string_length() -> None:
+    value = [[[["deep"]]], "x" * 1000] + list(range(100_000))
+
+    preview, info = preview_json_safe(value)
+
+    assert len(preview) == 20
+    assert preview[0] == [["<list of 1>"]]
+    assert preview[1] == "x" * 200 + "…"
+    assert info["truncated"] is True
+    assert info["length"] == 100_002
+    full = len(json.dumps(to_json_safe(value), separators=(",", ":")))
+    assert 0.5 * full < info["size_bytes"] < 2 * full
@@ -0,0 +1,49 @@
+import json
+
+from app.core.tracing import FileExporter, InMemoryExporter, Tracer, parse_traceparent
+
+
+def test_traceparent_is_parsed_and_malformed_headers_are_ignored() -> None:
+    context = parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+
+    assert context is not None
+    assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert context.span_id == "00f067aa0ba902b7"
+    assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_spans_nest_under_the_active_span_and_record_errors() -> None:
+    exporter = InMemoryExporter()
+    tracer = Tracer("test", exporter)
+
+    with tracer.span("outer") as outer:
+        with tracer.span("inner"):
+            pass
+        try:
+            with tracer.span("failing"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        tracer.record("replayed", 1.0, 2.0)
+
+    spans = {span.name: span for span in exporter.spans}
+    assert [span.name for span in exporter.spans] == ["inner", "failing", "replayed", "outer"]
+    assert spans["inner"].parent_id == outer.span_id
+    assert spans["failing"].status == "error"
+    assert spans["replayed"].to_dict()["duration_ms"] == 1000.0
+    assert len({span.trace_id for span in exporter.spans}) == 1
+    assert tracer.current() is None
+
+
+def test_disabled_tracer_records_nothing(tmp_path) -> None:
+    tracer = Tracer("test")
+    with tracer.span("ignored") as span:
+        assert span is None
+
+    exporter = FileExporter(str(tmp_path / "spans.jsonl"))
+    Tracer("test", exporter).record("written", 1.0, 1.5)
+    exporter.close()
+    lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["name"] == "written"